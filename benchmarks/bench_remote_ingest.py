@@ -0,0 +1,104 @@
+"""Benchmark: Telegramm-Durchsatz auf /ws/remote-gateway (pro CPU-Kern).
+
+Vergleicht den bisherigen Einzelpfad (json.loads → _make_telegram_from_proxy →
+_process_telegram je Telegramm) mit dem Batch-Pfad (_ingest_remote_batch).
+
+Aufruf:
+    python benchmarks/bench_remote_ingest.py [ANZAHL_TELEGRAMME]
+"""
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import server  # noqa: E402
+
+BATCH_SIZE = 200
+DPTS = [
+    ({"main": 1, "sub": 1}, "binary", lambda r: r.randint(0, 1)),
+    ({"main": 5, "sub": 1}, "array", lambda r: [r.randint(0, 255)]),
+    ({"main": 7, "sub": 1}, "array", lambda r: [r.randint(0, 255), r.randint(0, 255)]),
+    ({"main": 9, "sub": 1}, "array", lambda r: [0x0C, r.randint(0, 255)]),
+]
+
+
+def _setup_project(n_gas: int = 2000, n_devices: int = 200):
+    gas, layout = {}, []
+    for i in range(n_gas):
+        address = f"{i // 2048}/{(i // 256) % 8}/{i % 256}"
+        dpt, p_type, gen = DPTS[i % len(DPTS)]
+        gas[f"ga{i}"] = {"address": address, "name": f"GA {i}", "dpt": dpt}
+        layout.append((address, p_type, gen))
+    devices = {f"1.1.{d}": {"name": f"Gerät {d}"} for d in range(1, n_devices + 1)}
+    server.state["project_data"] = {"group_addresses": gas, "devices": devices}
+    server.state["ga_dpt_map"] = {g["address"]: g["dpt"] for g in gas.values()}
+    return layout, n_devices
+
+
+def _make_items(n: int, layout, n_devices: int) -> list[dict]:
+    rnd = random.Random(42)
+    items = []
+    for _ in range(n):
+        address, p_type, gen = rnd.choice(layout)
+        items.append({
+            "src": f"1.1.{rnd.randint(1, n_devices)}",
+            "ga": address,
+            "apci": "GroupValueWrite",
+            "payload_type": p_type,
+            "payload_value": gen(rnd),
+            "ts": "2024-01-01 00:00:00.000",
+        })
+    return items
+
+
+async def _legacy(frames: list[str]):
+    for raw in frames:
+        msg = json.loads(raw)
+        await server._process_telegram(server._make_telegram_from_proxy(msg))
+
+
+async def _batched(frames: list[str]):
+    for raw in frames:
+        await server._ingest_remote_batch(json.loads(raw)["items"])
+
+
+def _run(label: str, coro_fn, frames, n: int):
+    server.state["telegram_buffer"].clear()
+    server.state["current_values"].clear()
+    cpu, wall = time.process_time(), time.perf_counter()
+    asyncio.run(coro_fn(frames))
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    print(f"{label:<12} {n / cpu:>12,.0f} Telegramme/s (CPU)   {n / wall:>12,.0f} /s (Wall)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as tmp:
+        # Bus-Log in eine Wegwerf-Datei umleiten (Schreibkosten bleiben realistisch)
+        for h in list(server.bus_logger.handlers):
+            server.bus_logger.removeHandler(h)
+        handler = logging.FileHandler(Path(tmp) / "bench.log", encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        server.bus_logger.addHandler(handler)
+
+        layout, n_devices = _setup_project()
+        items = _make_items(n, layout, n_devices)
+        single = [json.dumps({"type": "telegram", **it}) for it in items]
+        batches = [
+            json.dumps({"type": "telegrams", "items": items[i:i + BATCH_SIZE]})
+            for i in range(0, n, BATCH_SIZE)
+        ]
+        print(f"{n:,} Telegramme, {len(layout):,} GAs, Batchgröße {BATCH_SIZE}")
+        _run("Einzeln", _legacy, single, n)
+        _run("Batch", _batched, batches, n)
+        handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Benchmark: Speicher und Laufzeit von _extract_security_data.
+
+Vergleicht die bisherige Implementierung (0.xml komplett als String dekodieren,
+ET.fromstring, verschachtelte iter()-Schleifen) mit dem Streaming-Durchlauf per
+iterparse. Jede Variante läuft in einem eigenen Prozess, damit der Peak-RSS
+(ru_maxrss) nicht von der anderen beeinflusst wird.
+
+Aufruf:
+    python benchmarks/bench_security_extract.py [ANZAHL_GERÄTE]
+"""
+import hashlib
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import server  # noqa: E402
+
+NS = "http://knx.org/xml/project/23"
+GAS_PER_DEVICE = 10
+
+
+def _write_project_xml(path: Path, n_devices: int) -> dict:
+    """Synthetic 0.xml: every device has parameters, com objects and a Security element."""
+    per_line = 250
+    gas = {}
+    with path.open("w", encoding="utf-8") as f:
+        f.write(f'<?xml version="1.0" encoding="utf-8"?>\n<KNX xmlns="{NS}"><Project Id="P-0001">')
+        f.write("<Installations><Installation><Topology>")
+        for line_no in range((n_devices + per_line - 1) // per_line):
+            area, line = line_no // 15 + 1, line_no % 15 + 1
+            if line == 1:
+                if line_no:
+                    f.write("</Area>")
+                f.write(f'<Area Id="A-{area}" Address="{area}">')
+            f.write(f'<Line Id="L-{area}-{line}" Address="{line}"><Segment Id="S-{line_no}">')
+            for dev in range(1, min(per_line, n_devices - line_no * per_line) + 1):
+                secure = dev % 3 == 0
+                f.write(f'<DeviceInstance Id="D-{line_no}-{dev}" Address="{dev}" Name="Gerät {dev}">')
+                f.write("<ParameterInstanceRefs>")
+                for p in range(20):
+                    f.write(f'<ParameterInstanceRef RefId="P-{p}" Value="{p * dev}"/>')
+                f.write("</ParameterInstanceRefs><ComObjectInstanceRefs>")
+                for c in range(GAS_PER_DEVICE):
+                    f.write(f'<ComObjectInstanceRef RefId="O-{c}" Links="GA-{c}"/>')
+                f.write("</ComObjectInstanceRefs>")
+                if secure:
+                    f.write(
+                        f'<Security ToolKey="{dev:032X}" SequenceNumber="{dev}"'
+                        f' DeviceAuthenticationCode="auth{dev}"/>'
+                    )
+                else:
+                    f.write('<Security SequenceNumber="0"/>')
+                f.write("</DeviceInstance>")
+            f.write("</Segment></Line>")
+        f.write("</Area></Topology><GroupAddresses><GroupRanges>")
+        for i in range(n_devices * GAS_PER_DEVICE):
+            raw = i + 1
+            address = f"{raw >> 11}/{(raw >> 8) & 7}/{raw & 0xFF}"
+            gas[f"GA-{i}"] = {"raw_address": raw, "address": address}
+            key = f' Key="{raw:032x}"' if i % 4 == 0 else ""
+            f.write(f'<GroupAddress Id="GA-{i}" Address="{raw}" Name="GA {i}"{key}/>')
+        f.write("</GroupRanges></GroupAddresses></Installation></Installations></Project></KNX>")
+    return {"group_addresses": gas, "devices": {}}
+
+
+def _legacy_extract(tmp_path: str, password: str, project: dict) -> dict:
+    """The implementation before the iterparse rewrite (kept for comparison)."""
+    import re
+    import xml.etree.ElementTree as ET
+
+    result: dict = {"devices": [], "ga_keys": {}, "ets_certificates": []}
+    with server.knxproj_extract(tmp_path, password or None) as content:
+        f = content.open_project_0()
+        xml_str = f.read().decode("utf-8")
+    ns_match = re.search(r'xmlns="([^"]+)"', xml_str)
+    ns = ns_match.group(1) if ns_match else "http://knx.org/xml/project/21"
+    root = ET.fromstring(xml_str)
+    raw_to_addr = {
+        ga["raw_address"]: ga["address"] for ga in project.get("group_addresses", {}).values()
+    }
+    for area in root.iter(f"{{{ns}}}Area"):
+        area_addr = area.get("Address", "0")
+        for line in area.iter(f"{{{ns}}}Line"):
+            line_addr = line.get("Address", "0")
+            for dev in line.iter(f"{{{ns}}}DeviceInstance"):
+                sec = dev.find(f"{{{ns}}}Security")
+                if sec is None:
+                    continue
+                ia = f"{area_addr}.{line_addr}.{dev.get('Address', '0')}"
+                ip_cfg = dev.find(f"{{{ns}}}IPConfig")
+                bus_ifaces = [
+                    {"ref_id": bi.get("RefId", ""), "password": bi.get("Password")}
+                    for bi in dev.iter(f"{{{ns}}}BusInterface")
+                    if bi.get("Password")
+                ]
+                seq = sec.get("SequenceNumber")
+                has_keys = (
+                    sec.get("ToolKey") or sec.get("DeviceAuthenticationCode")
+                    or sec.get("DeviceManagementPassword") or bus_ifaces
+                )
+                if not has_keys and seq in (None, "0"):
+                    continue
+                result["devices"].append({
+                    "address": ia,
+                    "name": project.get("devices", {}).get(ia, {}).get("name") or dev.get("Name") or "",
+                    "ip_address": ip_cfg.get("IPAddress") if ip_cfg is not None else None,
+                    "mac_address": ip_cfg.get("MACAddress") if ip_cfg is not None else None,
+                    "tool_key": sec.get("ToolKey"),
+                    "device_auth_code": sec.get("DeviceAuthenticationCode"),
+                    "device_mgmt_password": sec.get("DeviceManagementPassword"),
+                    "sequence_number": seq,
+                    "bus_interfaces": bus_ifaces or None,
+                })
+    for ga_el in root.iter(f"{{{ns}}}GroupAddress"):
+        key = ga_el.get("Key")
+        if key:
+            raw = ga_el.get("Address")
+            result["ga_keys"][raw_to_addr.get(int(raw), raw)] = key
+    return result
+
+
+def _child(variant: str, workdir: Path):
+    xml_path = workdir / "0.xml"
+    project = json.loads((workdir / "project.json").read_text())
+
+    class _Contents:
+        root = zipfile.ZipFile(workdir / "dummy.knxproj")
+
+        def open_project_0(self):
+            return xml_path.open("rb")
+
+    @contextmanager
+    def fake_extract(path, password=None):
+        yield _Contents()
+
+    server.knxproj_extract = fake_extract
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if variant == "legacy":
+        result = _legacy_extract(str(workdir / "dummy.knxproj"), "", project)
+    else:
+        result = server._extract_security_data(_Contents(), project)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    digest = hashlib.sha256(
+        json.dumps({k: result[k] for k in ("devices", "ga_keys")}, sort_keys=True).encode()
+    ).hexdigest()
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_mb": peak / 1024,
+        "delta_mb": (peak - before) / 1024,
+        "devices": len(result["devices"]),
+        "ga_keys": len(result["ga_keys"]),
+        "digest": digest,
+    }))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        project = _write_project_xml(workdir / "0.xml", n)
+        (workdir / "project.json").write_text(json.dumps(project))
+        with zipfile.ZipFile(workdir / "dummy.knxproj", "w") as zf:
+            zf.writestr("knx_master.xml", "<KNX/>")
+        size_mb = (workdir / "0.xml").stat().st_size / 1024 / 1024
+        print(f"{n:,} Geräte, {n * GAS_PER_DEVICE:,} GAs, 0.xml {size_mb:,.1f} MB")
+        results = {}
+        for variant in ("legacy", "streaming"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", variant, str(workdir)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            res = results[variant] = json.loads(out.strip().splitlines()[-1])
+            print(
+                f"{variant:<10} {res['seconds']:>7.2f} s   Peak-RSS {res['peak_mb']:>8.1f} MB"
+                f"   (+{res['delta_mb']:.1f} MB)   {res['devices']:,} Geräte, {res['ga_keys']:,} GA-Keys"
+            )
+        same = results["legacy"]["digest"] == results["streaming"]["digest"]
+        print("Ergebnisse identisch" if same else "ACHTUNG: Ergebnisse unterschiedlich")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], Path(sys.argv[3]))
+    else:
+        main()
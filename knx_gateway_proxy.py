@@ -11,6 +11,11 @@ Verwendung:
 Optionale Konfigurationsdatei (proxy_config.json im selben Verzeichnis):
     {"server_url": "...", "knx_ip": "...", "knx_port": 3671, "ssl_no_verify": false}
 
+Mehrere KNX/IP-Schnittstellen in einem Prozess (über eine Server-Verbindung):
+    {"server_url": "...", "gateways": [
+        {"id": "eg", "knx_ip": "192.168.1.100"},
+        {"id": "og", "knx_ip": "192.168.1.101", "knx_port": 3671}]}
+
 CLI-Argumente überschreiben Werte aus der Konfigurationsdatei.
 """
 
@@ -20,6 +25,9 @@ import json
 import logging
 import ssl
 import sys
+import time
+from collections import deque
+from datetime import datetime
 from pathlib import Path
 
 try:
@@ -34,19 +42,26 @@ try:
     from xknx.io import ConnectionConfig, ConnectionType
     from xknx.telegram import Telegram
     from xknx.telegram.address import GroupAddress
-    from xknx.telegram.apci import GroupValueRead, GroupValueWrite
+    from xknx.telegram.apci import GroupValueRead, GroupValueResponse, GroupValueWrite
 except ImportError:
     sys.exit("Fehler: 'xknx' nicht installiert. Bitte: pip3 install xknx")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
 log = logging.getLogger("knx_proxy")
 
 _ws_conn = None          # aktive WebSocket-Verbindung zum Server
-_current_xknx = None    # aktive xknx-Instanz
+_xknx_instances: dict[str, XKNX] = {}  # Gateway-ID → aktive xknx-Instanz
+_connected_gateways: set[str] = set()  # Gateway-IDs mit aufgebautem Tunnel
+_default_gateway = ""   # Ziel für write/read ohne "gw"
+_filter: dict = {}      # kompilierter Telegramm-Filter (leer = alles weiterleiten)
+_last_forwarded: dict[tuple, tuple] = {}  # (Gateway, GA raw) → (Payload, Zeitpunkt) für "nur bei Änderung"
+_value_cache: dict[tuple, tuple] = {}     # (Gateway, GA raw) → (letztes Telegramm, Zeitstempel)
+_link_stats = {"reconnects": 0, "tx_bytes": 0, "rx_bytes": 0, "dropped": 0}
+
+BATCH_MAX = 200          # Telegramme pro "telegrams"-Nachricht
+BATCH_INTERVAL = 0.02    # Sammelzeit in Sekunden, bevor ein Batch gesendet wird
+OUTBOX_MAX = 20000       # Puffer für Telegramme während eines WAN-Ausfalls
+_outbox: deque = deque()  # serialisierte Telegramme, die noch an den Server müssen
+_outbox_wakeup: asyncio.Event | None = None  # weckt _outbox_sender (nur solange verbunden)
 
 
 def _build_ssl_context(no_verify: bool):
@@ -61,7 +76,7 @@ def _build_ssl_context(no_verify: bool):
 
 # ── Telegramm-Serialisierung ───────────────────────────────────────────────────
 
-def _serialize_telegram(telegram: Telegram) -> dict | None:
+def _serialize_telegram(telegram: Telegram, gw_id: str | None = None) -> dict | None:
     """Konvertiert ein xknx-Telegram in ein JSON-serialisierbares Dict."""
     payload = telegram.payload
     apci = type(payload).__name__  # "GroupValueWrite", "GroupValueRead", "GroupValueResponse"
@@ -70,8 +85,11 @@ def _serialize_telegram(telegram: Telegram) -> dict | None:
     ga = str(telegram.destination_address)
 
     if isinstance(payload, GroupValueRead):
-        return {"type": "telegram", "src": src, "ga": ga,
-                "apci": apci, "payload_type": "none"}
+        msg = {"type": "telegram", "src": src, "ga": ga,
+               "apci": apci, "payload_type": "none"}
+        if gw_id:
+            msg["gw"] = gw_id
+        return msg
 
     raw = payload.value
     if isinstance(raw, DPTBinary):
@@ -82,41 +100,239 @@ def _serialize_telegram(telegram: Telegram) -> dict | None:
         log.warning("Unbekannter Payload-Typ: %s — Telegramm wird übersprungen", type(raw))
         return None
 
-    return {"type": "telegram", "src": src, "ga": ga,
-            "apci": apci, "payload_type": p_type, "payload_value": p_val}
+    msg = {"type": "telegram", "src": src, "ga": ga,
+           "apci": apci, "payload_type": p_type, "payload_value": p_val}
+    if gw_id:
+        msg["gw"] = gw_id
+    return msg
+
+
+# ── Telegramm-Filter (vom Server konfiguriert) ───────────────────────────────
+
+def _address_bounds(spec: str, individual: bool) -> tuple[int, int]:
+    """Wandelt "1/2/3", "1/2/*", "1/*/*" bzw. "1.1.*" in einen raw-Bereich (min, max).
+
+    Bereiche der Form "1/2/0-1/2/50" umfassen alle Adressen dazwischen. Der
+    Server validiert Filtereinträge mit derselben Funktion.
+    """
+    if "-" in spec:
+        start, end = spec.split("-", 1)
+        lo, _ = _address_bounds(start, individual)
+        _, hi = _address_bounds(end, individual)
+        if lo > hi:
+            raise ValueError(f"Leerer Adressbereich: {spec}")
+        return lo, hi
+    sep, widths = (".", (4, 4, 8)) if individual else ("/", (5, 3, 8))
+    parts = spec.strip().split(sep)
+    if len(parts) > 3 or (len(parts) != 3 and parts[-1] != "*"):
+        raise ValueError(f"Ungültige Adresse: {spec}")
+    lo = hi = 0
+    wildcard = False
+    for i, width in enumerate(widths):
+        part = parts[i].strip() if i < len(parts) else "*"
+        lo <<= width
+        hi <<= width
+        if part == "*":
+            wildcard = True
+            hi |= (1 << width) - 1
+            continue
+        if wildcard:
+            raise ValueError(f"Platzhalter nur am Ende erlaubt: {spec}")
+        n = int(part)
+        if not 0 <= n < (1 << width):
+            raise ValueError(f"Adressteil außerhalb des Bereichs: {spec}")
+        lo |= n
+        hi |= n
+    return lo, hi
+
+
+def _compile_filter(cfg: dict) -> dict:
+    """Kompiliert die Filterkonfiguration des Servers in raw-Adressbereiche."""
+
+    def ranges(key: str, individual: bool) -> list[tuple[int, int]]:
+        result = []
+        for spec in cfg.get(key) or []:
+            try:
+                result.append(_address_bounds(str(spec), individual))
+            except ValueError as e:
+                log.warning("Filtereintrag %s ignoriert: %s", key, e)
+        return result
+
+    return {
+        "ga_allow": ranges("ga_allow", False),
+        "ga_deny": ranges("ga_deny", False),
+        "src_allow": ranges("src_allow", True),
+        "src_deny": ranges("src_deny", True),
+        "on_change": ranges("on_change", False),
+        "max_age_s": float(cfg.get("max_age_s") or 900),
+    }
+
+
+def _in_ranges(raw: int, ranges: list[tuple[int, int]]) -> bool:
+    return any(lo <= raw <= hi for lo, hi in ranges)
+
+
+def _passes_filter(telegram: Telegram, gw_id: str = "") -> bool:
+    """Prüft ein Telegramm gegen den aktiven Filter, bevor es serialisiert wird.
+
+    "Nur bei Änderung" gilt ausschließlich für GroupValueWrite — Antworten auf
+    Leseanforderungen des Servers werden immer weitergeleitet. Unveränderte Werte
+    gehen spätestens nach ``max_age_s`` Sekunden erneut als Lebenszeichen raus.
+    """
+    f = _filter
+    if not f:
+        return True
+    dst = telegram.destination_address
+    if isinstance(dst, GroupAddress):
+        if f["ga_allow"] and not _in_ranges(dst.raw, f["ga_allow"]):
+            return False
+        if _in_ranges(dst.raw, f["ga_deny"]):
+            return False
+    src = telegram.source_address.raw
+    if f["src_allow"] and not _in_ranges(src, f["src_allow"]):
+        return False
+    if _in_ranges(src, f["src_deny"]):
+        return False
+    payload = telegram.payload
+    if (
+        isinstance(payload, GroupValueWrite)
+        and isinstance(dst, GroupAddress)
+        and _in_ranges(dst.raw, f["on_change"])
+    ):
+        now = time.monotonic()
+        key = (gw_id, dst.raw)
+        last = _last_forwarded.get(key)
+        if last is not None and last[0] == payload.value and now - last[1] < f["max_age_s"]:
+            return False
+        _last_forwarded[key] = (payload.value, now)
+    return True
+
+
+def set_filter(cfg: dict):
+    """Übernimmt eine neue Filterkonfiguration vom Server."""
+    global _filter
+    keys = ("ga_allow", "ga_deny", "src_allow", "src_deny", "on_change")
+    _filter = _compile_filter(cfg) if any(cfg.get(k) for k in keys) else {}
+    _last_forwarded.clear()
+    log.info("Telegramm-Filter %s", "aktiv" if _filter else "deaktiviert")
+
+
+# ── Letzte-Werte-Cache ────────────────────────────────────────────────────────
+
+def _cache_telegram(telegram: Telegram, gw_id: str = ""):
+    """Merkt sich den letzten Wert jeder GA — unabhängig vom Filter."""
+    dst = telegram.destination_address
+    if isinstance(dst, GroupAddress) and isinstance(telegram.payload, (GroupValueWrite, GroupValueResponse)):
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        _value_cache[(gw_id, dst.raw)] = (telegram, ts)
+
+
+def _snapshot_message() -> dict:
+    """Alle zwischengespeicherten Werte als eine Nachricht (ohne Busverkehr)."""
+    telegrams = []
+    for (gw_id, _), (telegram, ts) in list(_value_cache.items()):
+        msg = _serialize_telegram(telegram, gw_id)
+        if msg is not None:
+            msg["ts"] = ts
+            telegrams.append(msg)
+    return {"type": "snapshot", "telegrams": telegrams}
 
 
 # ── Callback: KNX-Telegramm empfangen ─────────────────────────────────────────
 
-def telegram_received_cb(telegram: Telegram):
-    """Wird von xknx synchron aufgerufen; delegiert an einen asyncio-Task."""
-    loop = asyncio.get_event_loop()
-    loop.create_task(_forward_telegram(telegram))
-
-
-async def _forward_telegram(telegram: Telegram):
-    """Serialisiert ein Telegramm und sendet es an den Server."""
-    if _ws_conn is None:
+def telegram_received_cb(telegram: Telegram, gw_id: str = ""):
+    """Wird von xknx synchron aufgerufen; filtert, serialisiert und legt in den Ausgang."""
+    _cache_telegram(telegram, gw_id)
+    if not _passes_filter(telegram, gw_id):
         return
-    msg = _serialize_telegram(telegram)
+    msg = _serialize_telegram(telegram, gw_id)
     if msg is None:
         return
+    del msg["type"]  # im Batch überflüssig
+    msg["ts"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    if len(_outbox) >= OUTBOX_MAX:
+        _outbox.popleft()
+        _link_stats["dropped"] += 1
+    _outbox.append(msg)
+    if _outbox_wakeup is not None:
+        _outbox_wakeup.set()
+
+
+async def _outbox_sender():
+    """Sendet den Ausgang gebündelt als "telegrams"-Nachrichten, solange der Server verbunden ist.
+
+    Bei einem Sendefehler bleibt der Batch im Ausgang und wird nach dem
+    Reconnect erneut gesendet — so gehen während eines WAN-Ausfalls keine
+    Telegramme verloren (bis OUTBOX_MAX).
+    """
+    global _outbox_wakeup
+    _outbox_wakeup = wakeup = asyncio.Event()
+    while True:
+        if not _outbox:
+            wakeup.clear()
+            await wakeup.wait()
+            await asyncio.sleep(BATCH_INTERVAL)  # weitere Telegramme einsammeln
+        batch = [_outbox.popleft() for _ in range(min(BATCH_MAX, len(_outbox)))]
+        try:
+            await _send_to_server({"type": "telegrams", "items": batch})
+        except BaseException:  # auch CancelledError beim Verbindungsabbau
+            _outbox.extendleft(reversed(batch))
+            raise
+        log.debug("→ Server: %d Telegramme", len(batch))
+
+
+async def _send_to_server(msg: dict):
+    """Sendet eine Nachricht an den Server und zählt die Bytes für die Link-Statistik."""
+    data = json.dumps(msg)
+    await _ws_conn.send(data)
+    _link_stats["tx_bytes"] += len(data)
+
+
+def _queued_bytes() -> int:
+    """Noch nicht übertragene Bytes im Sendepuffer der WebSocket-Verbindung."""
+    transport = getattr(_ws_conn, "transport", None)
     try:
-        await _ws_conn.send(json.dumps(msg))
-        log.debug("→ Server: %s %s %s", msg["apci"], msg["ga"], msg.get("payload_value", ""))
-    except Exception as e:
-        log.warning("Fehler beim Senden an Server: %s", e)
+        return transport.get_write_buffer_size() if transport is not None else 0
+    except Exception:
+        return 0
+
+
+def _pong_message(ping: dict) -> dict:
+    """Antwort auf einen Ping des Servers inkl. Link-Statistik des Proxys."""
+    return {
+        "type": "pong",
+        "seq": ping.get("seq"),
+        "ts": ping.get("ts"),
+        "proxy_ts": time.time(),
+        "stats": {**_link_stats, "pending": len(_outbox), "queued_bytes": _queued_bytes()},
+    }
 
 
 # ── Nachricht vom Server verarbeiten (write/read) ─────────────────────────────
 
 async def handle_server_message(msg: dict):
     """Verarbeitet eine vom Server gesendete Anweisung."""
-    if _current_xknx is None:
-        log.warning("Nachricht vom Server ignoriert — kein KNX verbunden")
+    msg_type = msg.get("type")
+    if msg_type == "filter":
+        set_filter(msg)
+        return
+    if msg_type == "ping":
+        if _ws_conn is not None:
+            await _send_to_server(_pong_message(msg))
+        return
+    if msg_type == "snapshot_request":
+        if _ws_conn is not None:
+            snapshot = _snapshot_message()
+            await _send_to_server(snapshot)
+            log.info("→ Server: Snapshot mit %d Werten", len(snapshot["telegrams"]))
+        return
+
+    gw_id = msg.get("gw") or _default_gateway
+    xknx = _xknx_instances.get(gw_id)
+    if xknx is None:
+        log.warning("Nachricht vom Server ignoriert — KNX-Gateway %s nicht verbunden", gw_id)
         return
 
-    msg_type = msg.get("type")
     ga_str = msg.get("ga", "")
 
     if msg_type == "write":
@@ -127,13 +343,14 @@ async def handle_server_message(msg: dict):
         else:
             payload_obj = GroupValueWrite(DPTArray(tuple(p_val)))
         tg = Telegram(destination_address=GroupAddress(ga_str), payload=payload_obj)
-        await _current_xknx.telegrams.put(tg)
-        log.info("← Server: Schreibe GA %s = %s", ga_str, p_val)
+        await xknx.telegrams.put(tg)
+        _cache_telegram(tg, gw_id)
+        log.info("← Server: Schreibe GA %s = %s (%s)", ga_str, p_val, gw_id)
 
     elif msg_type == "read":
         tg = Telegram(destination_address=GroupAddress(ga_str), payload=GroupValueRead())
-        await _current_xknx.telegrams.put(tg)
-        log.info("← Server: Lese GA %s", ga_str)
+        await xknx.telegrams.put(tg)
+        log.info("← Server: Lese GA %s (%s)", ga_str, gw_id)
 
     else:
         log.warning("Unbekannter Nachrichtentyp vom Server: %s", msg_type)
@@ -141,13 +358,32 @@ async def handle_server_message(msg: dict):
 
 # ── KNX-Verbindungsschleife ────────────────────────────────────────────────────
 
-async def knx_loop(cfg: dict):
-    """Verbindet mit dem lokalen KNX-Bus und versucht bei Trennung neu zu verbinden."""
-    global _current_xknx
-
-    knx_ip = cfg["knx_ip"]
-    knx_port = cfg.get("knx_port", 3671)
-    knx_type = cfg.get("knx_type", "ip")
+def _gateway_list(cfg: dict) -> list[dict]:
+    """Liefert die konfigurierten KNX/IP-Schnittstellen, jeweils mit eindeutiger ID."""
+    gateways = cfg.get("gateways") or [{"knx_ip": cfg["knx_ip"], "knx_port": cfg.get("knx_port", 3671)}]
+    result = []
+    for gw in gateways:
+        gw = {"knx_port": 3671, "knx_type": cfg.get("knx_type", "ip"), **gw}
+        gw["id"] = str(gw.get("id") or gw["knx_ip"])
+        if any(g["id"] == gw["id"] for g in result):
+            raise ValueError(f"Gateway-ID doppelt vergeben: {gw['id']}")
+        result.append(gw)
+    return result
+
+
+def _status_message(gw: dict, connected: bool) -> dict:
+    msg = {"type": "status", "connected": connected, "gw": gw["id"]}
+    if connected:
+        msg["hw_type"] = gw.get("knx_type", "ip")
+    return msg
+
+
+async def knx_loop(gw: dict):
+    """Verbindet mit einem KNX/IP-Gateway und versucht bei Trennung neu zu verbinden."""
+    gw_id = gw["id"]
+    knx_ip = gw["knx_ip"]
+    knx_port = gw.get("knx_port", 3671)
+    knx_type = gw.get("knx_type", "ip")
 
     if knx_type == "usb":
         raise NotImplementedError(
@@ -164,31 +400,35 @@ async def knx_loop(cfg: dict):
                 gateway_port=knx_port,
             )
         )
-        _current_xknx = xknx
+        _xknx_instances[gw_id] = xknx
         try:
             async with xknx:
-                xknx.telegram_queue.register_telegram_received_cb(telegram_received_cb)
-                log.info("KNX verbunden: %s:%d", knx_ip, knx_port)
+                xknx.telegram_queue.register_telegram_received_cb(
+                    lambda telegram: telegram_received_cb(telegram, gw_id)
+                )
+                _connected_gateways.add(gw_id)
+                log.info("KNX verbunden: %s (%s:%d)", gw_id, knx_ip, knx_port)
                 retry_delay = 10
                 # Status an Server senden
                 if _ws_conn is not None:
                     try:
-                        await _ws_conn.send(json.dumps({"type": "status", "connected": True, "hw_type": knx_type}))
+                        await _send_to_server(_status_message(gw, True))
                     except Exception:
                         pass
                 await asyncio.Event().wait()
         except asyncio.CancelledError:
             break
         except Exception as e:
-            log.warning("KNX-Verbindung getrennt: %s — Neuversuch in %ds", e, retry_delay)
+            log.warning("KNX-Verbindung %s getrennt: %s — Neuversuch in %ds", gw_id, e, retry_delay)
             if _ws_conn is not None:
                 try:
-                    await _ws_conn.send(json.dumps({"type": "status", "connected": False}))
+                    await _send_to_server(_status_message(gw, False))
                 except Exception:
                     pass
             retry_delay = min(retry_delay * 2, 60)
         finally:
-            _current_xknx = None
+            _xknx_instances.pop(gw_id, None)
+            _connected_gateways.discard(gw_id)
 
         try:
             await asyncio.sleep(retry_delay)
@@ -207,6 +447,7 @@ async def ws_loop(cfg: dict):
     ssl_ctx = _build_ssl_context(ssl_no_verify) if server_url.startswith("wss://") else None
 
     retry_delay = 5
+    connected_before = False
     while True:
         try:
             log.info("Verbinde mit Server: %s", server_url)
@@ -214,20 +455,30 @@ async def ws_loop(cfg: dict):
                 _ws_conn = ws
                 log.info("Server-WebSocket verbunden")
                 retry_delay = 5
+                if connected_before:
+                    _link_stats["reconnects"] += 1
+                connected_before = True
 
                 # KNX-Status senden falls bereits verbunden
-                if _current_xknx is not None:
-                    await ws.send(json.dumps({"type": "status", "connected": True,
-                                              "hw_type": cfg.get("knx_type", "ip")}))
+                for gw in _gateway_list(cfg):
+                    if gw["id"] in _connected_gateways:
+                        await _send_to_server(_status_message(gw, True))
 
-                async for raw_msg in ws:
-                    try:
-                        msg = json.loads(raw_msg)
-                        await handle_server_message(msg)
-                    except json.JSONDecodeError:
-                        log.warning("Ungültige JSON-Nachricht vom Server: %s", raw_msg[:100])
-                    except Exception as e:
-                        log.error("Fehler bei Server-Nachricht: %s", e)
+                if _outbox:
+                    log.info("Sende %d gepufferte Telegramme nach", len(_outbox))
+                sender = asyncio.create_task(_outbox_sender())
+                try:
+                    async for raw_msg in ws:
+                        _link_stats["rx_bytes"] += len(raw_msg)
+                        try:
+                            msg = json.loads(raw_msg)
+                            await handle_server_message(msg)
+                        except json.JSONDecodeError:
+                            log.warning("Ungültige JSON-Nachricht vom Server: %s", raw_msg[:100])
+                        except Exception as e:
+                            log.error("Fehler bei Server-Nachricht: %s", e)
+                finally:
+                    sender.cancel()
 
         except asyncio.CancelledError:
             break
@@ -278,9 +529,12 @@ def _parse_args() -> argparse.Namespace:
 
 
 async def main(cfg: dict):
+    global _default_gateway
+    gateways = _gateway_list(cfg)
+    _default_gateway = gateways[0]["id"]
     try:
         await asyncio.gather(
-            knx_loop(cfg),
+            *(knx_loop(gw) for gw in gateways),
             ws_loop(cfg),
         )
     except KeyboardInterrupt:
@@ -288,6 +542,11 @@ async def main(cfg: dict):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
     args = _parse_args()
     file_cfg = _load_proxy_config()
 
@@ -303,12 +562,19 @@ if __name__ == "__main__":
 
     if not cfg.get("server_url"):
         sys.exit("Fehler: --server-url ist erforderlich (oder in proxy_config.json definieren)")
-    if not cfg.get("knx_ip"):
+    if args.knx_ip:
+        cfg.pop("gateways", None)  # --knx-ip erzwingt den Einzel-Gateway-Modus
+    if not cfg.get("knx_ip") and not cfg.get("gateways"):
         sys.exit("Fehler: --knx-ip ist erforderlich (oder in proxy_config.json definieren)")
+    try:
+        gateways = _gateway_list(cfg)
+    except (KeyError, ValueError) as e:
+        sys.exit(f"Fehler in der Gateway-Konfiguration: {e}")
 
     log.info("KNX Gateway Proxy startet")
     log.info("  Server: %s", cfg["server_url"])
-    log.info("  KNX:    %s:%d (%s)", cfg["knx_ip"], cfg["knx_port"], cfg["knx_type"])
+    for gw in gateways:
+        log.info("  KNX:    %s → %s:%d (%s)", gw["id"], gw["knx_ip"], gw["knx_port"], gw["knx_type"])
     if cfg["ssl_no_verify"]:
         log.warning("  SSL-Zertifikatsprüfung deaktiviert!")
 
@@ -1,19 +1,32 @@
 import asyncio
 import csv
+import gzip
+import hashlib
+import heapq
+import hmac
 import io
 import json
 import logging
+import multiprocessing
 import os
+import random
+import secrets
 import shutil
+import signal
 import socket
 import struct
 import tempfile
+import time
 import uuid
-from collections import deque
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import asynccontextmanager
 from datetime import datetime
+from itertools import islice
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
+from queue import Empty
 from typing import Set
 
 import httpx
@@ -36,10 +49,19 @@ from xknx.io import ConnectionConfig, ConnectionType
 from xknx.telegram import Telegram
 from xknx.telegram.address import GroupAddress, IndividualAddress
 from xknx.telegram.apci import GroupValueRead, GroupValueResponse, GroupValueWrite
-from xknxproject import XKNXProj
+from xknxproject.__version__ import __version__ as xknxproject_version
+from xknxproject.combination import combine_project
 from xknxproject.exceptions import InvalidPasswordException, XknxProjectException
+from xknxproject.xml import XMLParser
 from xknxproject.zip.extractor import extract as knxproj_extract
 
+from knx_gateway_proxy import _address_bounds
+
+try:
+    import brotli
+except ImportError:  # optional: without it project responses are gzip only
+    brotli = None
+
 INDEX_HTML = Path(__file__).parent / "index.html"
 CONFIG_PATH = Path(__file__).parent / "config.json"
 ANNOTATIONS_PATH = Path(__file__).parent / "annotations.json"
@@ -47,7 +69,58 @@ LOG_PATH = Path(__file__).parent / "logs" / "knx_bus.log"
 LAST_PROJECT_PATH = Path(__file__).parent / "last_project.json"
 RECENT_PROJECTS_PATH = Path(__file__).parent / "recent_projects.json"
 PROJECTS_DIR = Path(__file__).parent / "projects"
+PA_SCAN_PATH = Path(__file__).parent / "pa_scan.json"
+GA_SCAN_PATH = Path(__file__).parent / "ga_scan.json"
+DEVICE_CACHE_PATH = Path(__file__).parent / "device_cache.json"
+PARSE_CACHE_DIR = Path(__file__).parent / "parse_cache"
+PARSE_CACHE_SECRET_PATH = Path(__file__).parent / "parse_cache.key"  # kept outside the cache
+DEVICE_CACHE_TTL = 7 * 24 * 3600  # seconds a cached property read stays fresh
+INVENTORY_WINDOW = 4  # devices read concurrently by the inventory job
+MGMT_IDLE_TIMEOUT = 60.0  # seconds before an unused management tunnel is closed
+MGMT_RETRY_DELAY = 30.0  # seconds before retrying after no tunnel slot was available
 MAX_RECENT_PROJECTS = 10
+REMOTE_PING_INTERVAL = 10.0  # seconds between application-level pings to the proxy
+BUS_LOAD_WINDOW = 5  # seconds of incoming traffic averaged for the bus-load estimate
+PA_SCAN_WINDOW = 8  # default number of concurrent address checks
+PA_SCAN_MIN_TIMEOUT = 0.4  # seconds; floor for the adaptive per-address timeout
+PA_SCAN_MAX_BUS_LOAD = 30.0  # incoming telegrams/s above which no new checks start
+GA_SCAN_SETTLE = 2.0  # seconds to keep collecting responses after the last scan read
+READ_ALL_TIMEOUT = 2.0  # seconds to wait for a GroupValueResponse per read
+READ_ALL_RETRIES = 2  # extra rounds for GAs that did not answer
+READ_ALL_BACKOFF = 1.0  # pause before the first retry round, doubled per round
+POLL_MIN_INTERVAL = 1.0  # seconds; shortest allowed polling interval per GA
+POLL_MAX_BUS_LOAD = 20.0  # incoming telegrams/s above which polls are deferred
+POLL_BUSY_DELAY = 2.0  # seconds a poll is deferred while the bus is busy
+PARSE_WORKERS = 2  # concurrent project parses (worker processes)
+PARSE_TIMEOUT = 300.0  # seconds before a parse is aborted
+PARSE_CACHE_MAX_MB = 500  # disk budget of the parse cache, least recently used evicted first
+PARSE_CACHE_FORMAT = 2  # bump when the parse result changes shape
+MAX_UPLOAD_MB = 200  # largest accepted .knxproj upload
+UPLOAD_FORM_SLACK = 64 * 1024  # multipart headers and form fields on top of the file
+UPLOAD_CHUNK = 1024 * 1024  # bytes copied per step while storing an upload
+PROJECT_RESPONSE_CACHE_MB = 64  # encoded project payloads kept in memory (LRU)
+PROJECT_PAGE_SIZE = 200  # default page size of /api/project/{section}
+PROJECT_PAGE_MAX = 5000
+PROJECT_DIFF_CACHE = 8  # computed project diffs kept in memory
+
+
+def _new_remote_link() -> dict:
+    """Fresh link-quality counters for the remote gateway WebSocket."""
+    return {
+        "rtt_ms": deque(maxlen=120),
+        "connects": 0,
+        "connected_since": None,
+        "last_pong": None,
+        "rx_bytes": 0,
+        "tx_bytes": 0,
+        "rx_msgs": 0,
+        "tx_msgs": 0,
+        "rx_bps": 0.0,
+        "tx_bps": 0.0,
+        "rate_mark": (time.monotonic(), 0, 0),
+        "proxy": {},
+    }
+
 
 state: dict = {
     "xknx": None,
@@ -65,11 +138,46 @@ state: dict = {
     "remote_gateway_token": "",
     "remote_gateway_ws": None,
     "remote_gateway_connected": False,
+    "remote_link": _new_remote_link(),
+    "remote_gateways": {},  # proxy gateway id → tunnel connected
+    "remote_ga_gateway": {},  # GA → proxy gateway id it was last seen on
+    # Outbound scheduler (created lazily by _outbound())
+    "outbound": None,
+    "outbound_rate": 20.0,  # telegrams/s budget per line
+    "bus_rx": deque(maxlen=BUS_LOAD_WINDOW + 1),  # [second, count] of incoming telegrams
+    "read_waiters": {},  # GA → futures waiting for its next GroupValueResponse
+    "read_all_job": None,
+    "read_inflight": {},  # GA → {"task", "deadline"} of the shared /api/ga/value read
+    "polling": None,  # cyclic polling worker (created lazily by _polling())
+    "polling_schedules": [],  # mirrors config "polling_schedules"
+    "polling_max_bus_load": POLL_MAX_BUS_LOAD,
+    # Project parsing runs in worker processes, off the event loop
+    "parse_pool": [],  # worker dicts: single-process executor, pid, progress queue, busy
+    "parse_slots": None,
+    "parse_workers": PARSE_WORKERS,
+    "parse_timeout": PARSE_TIMEOUT,
+    "parse_jobs": {},  # job id → parse job (running and the last few finished)
+    "parse_cache_max_mb": PARSE_CACHE_MAX_MB,
+    "max_upload_mb": MAX_UPLOAD_MB,
+    "project_slug": None,  # stored project (PROJECTS_DIR) that project_data came from
+    "security_inflight": {},  # (slug, password) → task of the shared security extraction
+    "project_responses": OrderedDict(),  # ("file", slug) | ("current",) → encoded payload, LRU
+    "project_diffs": OrderedDict(),  # (slug A, ETag A, slug B, ETag B) → diff of two stored projects, LRU
     # Scan state
     "ga_scan_running": False,
     "ga_scan_cancel": False,
     "pa_scan_running": False,
     "pa_scan_cancel": False,
+    "pa_scan": None,  # running or last scan (also persisted in PA_SCAN_PATH)
+    "ga_scan": None,  # running or last GA scan (also persisted in GA_SCAN_PATH)
+    "device_cache": None,  # address → last property read (loaded from DEVICE_CACHE_PATH)
+    "inventory_job": None,
+    # Management tunnels (separate from the monitoring tunnel, opened on demand)
+    "mgmt_max_tunnels": 1,
+    "mgmt_pool": [],  # {"xknx", "users", "last_used"}
+    "mgmt_lock": None,
+    "mgmt_retry_at": 0.0,
+    "mgmt_reaper": None,
     # WireGuard
     "wireguard_enabled": False,
     "wireguard_peer_connected": False,
@@ -90,6 +198,15 @@ def load_config() -> dict:
         "language": "de-DE",
         "connection_type": "local",
         "remote_gateway_token": "",
+        "remote_gateway_filter": {},
+        "outbound_rate_per_s": 20,
+        "management_tunnels": 1,
+        "polling_schedules": [],
+        "polling_max_bus_load": POLL_MAX_BUS_LOAD,
+        "parse_workers": PARSE_WORKERS,
+        "parse_timeout_s": PARSE_TIMEOUT,
+        "parse_cache_max_mb": PARSE_CACHE_MAX_MB,
+        "max_upload_mb": MAX_UPLOAD_MB,
         # WireGuard defaults
         "wireguard_enabled": False,
         "wireguard_interface": "wg0",
@@ -137,6 +254,8 @@ def _add_to_recent_projects(filename: str, project: dict, source_path: str | Non
     PROJECTS_DIR.mkdir(exist_ok=True)
     slug = _project_slug(filename)
     (PROJECTS_DIR / f"{slug}.json").write_text(json.dumps(project))
+    (PROJECTS_DIR / f"{slug}.security.json").unlink(missing_ok=True)  # belongs to the old upload
+    _drop_project_response(("file", slug))
     knxproj_stored = False
     if source_path:
         try:
@@ -158,6 +277,136 @@ def _add_to_recent_projects(filename: str, project: dict, source_path: str | Non
     RECENT_PROJECTS_PATH.write_text(json.dumps(recent, indent=2))
 
 
+# ── Project response cache ──────────────────────────────────────────────────────
+# Project payloads are several MB. They are encoded and compressed once and then
+# served from memory, revalidated by ETag, until the project changes.
+
+
+def _encode_project_body(body: bytes) -> dict:
+    entry = {
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=6),
+    }
+    if brotli is not None:
+        entry["br"] = brotli.compress(body, quality=5)
+    entry["size"] = sum(len(entry[enc]) for enc in ("identity", "gzip", "br") if enc in entry)
+    return entry
+
+
+def _drop_project_response(key: tuple) -> int:
+    """Remove a cached payload; returns the bytes freed.
+
+    An alias that shares the payload's bytes keeps them and takes over their size.
+    """
+    cache = state["project_responses"]
+    entry = cache.pop(key, None)
+    if entry is None:
+        return 0
+    for alias in cache.values():
+        if alias.get("shares") == key:
+            alias["size"], alias["shares"] = entry["size"], None
+            return 0
+    return entry["size"]
+
+
+def _cache_project_response(key: tuple, entry: dict):
+    cache = state["project_responses"]
+    _drop_project_response(key)
+    cache[key] = entry
+    total = sum(e["size"] for e in cache.values())
+    while total > PROJECT_RESPONSE_CACHE_MB * 1024 * 1024 and len(cache) > 1:
+        total -= _drop_project_response(next(iter(cache)))
+
+
+def _move_legacy_security(slug: str | None, project: dict) -> bool:
+    """Move _security of a project stored by an older version into its sidecar file."""
+    security = project.pop("_security", None)
+    if security is None:
+        return False
+    if slug:
+        PROJECTS_DIR.mkdir(exist_ok=True)
+        (PROJECTS_DIR / f"{slug}.security.json").write_text(json.dumps(security))
+    return True
+
+
+def _read_stored_project(slug: str, p: Path) -> bytes:
+    body = p.read_bytes()
+    if b'"_security"' in body:
+        project = json.loads(body)
+        if _move_legacy_security(slug, project):
+            body = json.dumps(project).encode()
+            p.write_bytes(body)
+    return body
+
+
+async def _stored_project_entry(slug: str) -> dict:
+    """Encoded PROJECTS_DIR/<slug>.json; re-read when the file changed."""
+    if not slug or slug != _project_slug(slug) or ".." in slug:
+        # Only names _project_slug produces — a/b of the diff come from the query
+        raise HTTPException(status_code=404, detail="Not found")
+    p = PROJECTS_DIR / f"{slug}.json"
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Not found") from None
+    key = ("file", slug)
+    entry = state["project_responses"].get(key)
+    if entry is None or entry["version"] != (st.st_mtime_ns, st.st_size):
+        body = await asyncio.to_thread(_read_stored_project, slug, p)
+        st = p.stat()  # rewritten if it still carried security data
+        entry = await asyncio.to_thread(_encode_project_body, body)
+        entry["version"] = (st.st_mtime_ns, st.st_size)
+        _cache_project_response(key, entry)
+    else:
+        state["project_responses"].move_to_end(key)
+    return entry
+
+
+async def _current_project_entry() -> dict:
+    """Encoded state["project_data"]; re-encoded once another project is loaded."""
+    project = state["project_data"]
+    key = ("current",)
+    entry = state["project_responses"].get(key)
+    if entry is None or entry["project"] is not project:
+        body = await asyncio.to_thread(lambda: json.dumps(project).encode())
+        entry = await asyncio.to_thread(_encode_project_body, body)
+        entry["project"] = project
+        _cache_project_response(key, entry)
+    else:
+        state["project_responses"].move_to_end(key)
+    return entry
+
+
+def _header_tokens(value: str) -> dict[str, float]:
+    """Comma-separated header tokens with their q-value, e.g. Accept-Encoding."""
+    tokens = {}
+    for part in value.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            tokens[name.strip()] = q
+    return tokens
+
+
+def _project_response(request: Request, entry: dict) -> Response:
+    headers = {"ETag": entry["etag"], "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    etags = {t.removeprefix("W/") for t in _header_tokens(request.headers.get("if-none-match", ""))}
+    if entry["etag"] in etags or "*" in etags:
+        return Response(status_code=304, headers=headers)
+    accepted = _header_tokens(request.headers.get("accept-encoding", ""))
+    for encoding in ("br", "gzip"):
+        if encoding in entry and accepted.get(encoding, 0) > 0:
+            headers["Content-Encoding"] = encoding
+            return Response(entry[encoding], media_type="application/json", headers=headers)
+    return Response(entry["identity"], media_type="application/json", headers=headers)
+
+
 # ── WireGuard helpers ──────────────────────────────────────────────────────────
 
 
@@ -323,19 +572,24 @@ def _build_dpt1_lookup() -> dict[str, str]:
 _DPT1_LEGACY: dict[str, str] = _build_dpt1_lookup()
 
 
+bus_logger = logging.getLogger("knx_bus")
+
+
 def setup_log():
+    """Attach the daily rotated bus log; called on startup of the server process.
+
+    Parse workers import this module too and must not open (and rotate) the
+    log file on their own.
+    """
+    if any(isinstance(h, TimedRotatingFileHandler) for h in bus_logger.handlers):
+        return
     LOG_PATH.parent.mkdir(exist_ok=True)
     handler = TimedRotatingFileHandler(
         LOG_PATH, when="midnight", backupCount=30, encoding="utf-8"
     )
     handler.setFormatter(logging.Formatter("%(message)s"))
-    logger = logging.getLogger("knx_bus")
-    logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
-    return logger
-
-
-bus_logger = setup_log()
+    bus_logger.addHandler(handler)
+    bus_logger.setLevel(logging.INFO)
 
 
 async def broadcast(msg: dict):
@@ -352,21 +606,142 @@ def telegram_received_cb(telegram):
     asyncio.create_task(_process_telegram(telegram))
 
 
-async def _process_telegram(telegram):
-    src = str(telegram.source_address)
-    ga = str(telegram.destination_address)
+def _build_project_index(project: dict | None, ga_dpt_map: dict) -> dict:
+    """Lookup tables compiled once per loaded project (GA names, transcoders)."""
+    ga_by_address = {}
+    for gad in (project or {}).get("group_addresses", {}).values():
+        if gad.get("address"):
+            ga_by_address.setdefault(gad["address"], gad)
+    # GAs linked to at least one communication object with the read flag set;
+    # None if the project carries no communication objects (read everything)
+    readable_gas = None
+    if (project or {}).get("communication_objects"):
+        readable_gas = set()
+        for co in project["communication_objects"].values():
+            flags = co.get("flags") or {}
+            if flags.get("read") and flags.get("communication", True):
+                readable_gas.update(co.get("group_address_links") or [])
+    transcoders = {}
+    encoders = {}
+    for ga, dpt in ga_dpt_map.items():
+        if not dpt:
+            continue
+        try:
+            transcoder = DPTBase.parse_transcoder(dpt)
+        except Exception:
+            transcoder = None
+        if transcoder is not None:
+            transcoders[ga] = transcoder
+            encoders[ga] = _make_encoder(transcoder, dpt)
+    return {
+        "project": project,
+        "ga_dpt_map": ga_dpt_map,
+        "ga_by_address": ga_by_address,
+        "readable_gas": readable_gas,
+        "transcoders": transcoders,
+        "encoders": encoders,
+        "sections": {},  # filled on demand by _project_section
+    }
 
-    device_name = ""
-    if state["project_data"]:
-        dev = state["project_data"].get("devices", {}).get(src, {})
-        device_name = dev.get("name", "")
 
-    ga_name = ""
-    if state["project_data"]:
-        for gad in state["project_data"].get("group_addresses", {}).values():
-            if gad.get("address") == ga:
-                ga_name = gad.get("name", "")
-                break
+_TRUE_STRINGS = ("1", "true", "ein", "an", "on", "yes")
+
+
+def _make_encoder(transcoder, dpt_info: dict):
+    """Build a value → (payload, display value) function for one GA, plus its DPT string."""
+    main, sub = dpt_info.get("main"), dpt_info.get("sub")
+    dpt = (
+        f"{main}.{str(sub).zfill(3)}"
+        if main is not None and sub is not None
+        else str(main or "")
+    )
+    if main == 1:
+
+        def encode(value):
+            bool_val = str(value).strip().lower() in _TRUE_STRINGS
+            return GroupValueWrite(transcoder.to_knx(bool_val)), "Ein" if bool_val else "Aus"
+
+    else:
+        unit = getattr(transcoder, "unit", "") or ""
+        suffix = f" {unit}" if unit else ""
+
+        def encode(value):
+            typed_value = float(str(value))
+            return GroupValueWrite(transcoder.to_knx(typed_value)), f"{typed_value:.2f}{suffix}"
+
+    return encode, dpt
+
+
+def _project_index() -> dict:
+    """Return the compiled index, rebuilding it whenever the project or DPT map is replaced."""
+    idx = state.get("project_index")
+    if (
+        idx is None
+        or idx["project"] is not state["project_data"]
+        or idx["ga_dpt_map"] is not state["ga_dpt_map"]
+    ):
+        idx = _build_project_index(state["project_data"], state["ga_dpt_map"])
+        state["project_index"] = idx
+    return idx
+
+
+def _device_name(src: str) -> str:
+    if not state["project_data"]:
+        return ""
+    return state["project_data"].get("devices", {}).get(src, {}).get("name", "")
+
+
+def _ga_name(ga: str) -> str:
+    if not state["project_data"]:
+        return ""
+    return _project_index()["ga_by_address"].get(ga, {}).get("name", "")
+
+
+def _format_decoded(decoded, transcoder) -> tuple[str, str]:
+    """Format a DPT-decoded value for display; returns (value, dpt)."""
+    dpt = ""
+    unit = getattr(transcoder, "unit", "") or ""
+    main = getattr(transcoder, "dpt_main_number", None)
+    sub = getattr(transcoder, "dpt_sub_number", None)
+    if main is not None:
+        dpt = f"{main}.{str(sub).zfill(3)}" if sub is not None else str(main)
+    bool_val = (
+        decoded
+        if isinstance(decoded, bool)
+        else (
+            decoded.value
+            if isinstance(getattr(decoded, "value", None), bool)
+            else None
+        )
+    )
+    if bool_val is not None:
+        value = "Ein" if bool_val else "Aus"
+    elif isinstance(decoded, float):
+        value = f"{decoded:.2f}{' ' + unit if unit else ''}"
+    else:
+        value = f"{decoded}{' ' + unit if unit else ''}"
+    return value, dpt
+
+
+def _estimate_dpt(payload_val) -> str:
+    """DPT estimate from payload size when no DPT is known."""
+    if isinstance(payload_val, DPTBinary):
+        return "1.x"
+    if isinstance(payload_val, DPTArray):
+        n = len(payload_val.value)
+        return {
+            1: "5.x/17.x/20.x",
+            2: "9.x/7.x/8.x",
+            3: "10.x/11.x",
+            4: "14.x/12.x/13.x",
+        }.get(n, f"?({n}B)")
+    return ""
+
+
+def _telegram_entry(telegram, ts: str | None = None) -> dict:
+    """Build the monitor entry (names, decoded value, DPT) for a telegram."""
+    src = str(telegram.source_address)
+    ga = str(telegram.destination_address)
 
     # APCI type (GroupValueWrite / GroupValueRead / GroupValueResponse)
     apci_type = type(telegram.payload).__name__
@@ -381,53 +756,23 @@ async def _process_telegram(telegram):
     dpt = ""
     dpt_estimate = ""
     if telegram.decoded_data is not None:
-        decoded = telegram.decoded_data.value
-        transcoder = telegram.decoded_data.transcoder
-        unit = getattr(transcoder, "unit", "") or ""
-        main = getattr(transcoder, "dpt_main_number", None)
-        sub = getattr(transcoder, "dpt_sub_number", None)
-        if main is not None:
-            dpt = f"{main}.{str(sub).zfill(3)}" if sub is not None else str(main)
-        bool_val = (
-            decoded
-            if isinstance(decoded, bool)
-            else (
-                decoded.value
-                if isinstance(getattr(decoded, "value", None), bool)
-                else None
-            )
+        value, dpt = _format_decoded(
+            telegram.decoded_data.value, telegram.decoded_data.transcoder
         )
-        if bool_val is not None:
-            value = "Ein" if bool_val else "Aus"
-        elif isinstance(decoded, float):
-            value = f"{decoded:.2f}{' ' + unit if unit else ''}"
-        else:
-            value = f"{decoded}{' ' + unit if unit else ''}"
     else:
         value = raw_value
-        # DPT estimate from payload size when no DPT is known
-        payload_val = getattr(telegram.payload, "value", None)
-        if payload_val is not None:
-            if isinstance(payload_val, DPTBinary):
-                dpt_estimate = "1.x"
-            elif isinstance(payload_val, DPTArray):
-                n = len(payload_val.value)
-                dpt_estimate = {
-                    1: "5.x/17.x/20.x",
-                    2: "9.x/7.x/8.x",
-                    3: "10.x/11.x",
-                    4: "14.x/12.x/13.x",
-                }.get(n, f"?({n}B)")
-
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        dpt_estimate = _estimate_dpt(getattr(telegram.payload, "value", None))
 
-    entry = {
+    if ts is None:
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+    return {
         "type": "telegram",
         "ts": ts,
         "src": src,
-        "device": device_name,
+        "device": _device_name(src),
         "ga": ga,
-        "ga_name": ga_name,
+        "ga_name": _ga_name(ga),
         "value": value,
         "raw": raw_value,
         "dpt": dpt,
@@ -435,11 +780,30 @@ async def _process_telegram(telegram):
         "apci": apci_type,
     }
 
-    bus_logger.info(f"{ts} | {src} | {device_name} | {ga} | {ga_name} | {value}")
 
-    state["current_values"][ga] = {"value": value, "ts": ts}
-    state["telegram_buffer"].append(entry)
+def _store_entries(entries: list[dict]):
+    """Write entries to the bus log, the history buffer and current_values."""
+    if not entries:
+        return
+    # One log record per batch — the "%(message)s" formatter keeps the file line-per-telegram
+    bus_logger.info(
+        "\n".join(
+            f"{e['ts']} | {e['src']} | {e['device']} | {e['ga']} | {e['ga_name']} | {e['value']}"
+            for e in entries
+        )
+    )
+    current = state["current_values"]
+    for e in entries:
+        current[e["ga"]] = {"value": e["value"], "ts": e["ts"]}
+    state["telegram_buffer"].extend(entries)
+    _note_bus_traffic(len(entries))
+    _resolve_read_waiters(entries)
+    _collect_ga_scan_responses(entries)
 
+
+async def _process_telegram(telegram):
+    entry = _telegram_entry(telegram)
+    _store_entries([entry])
     await broadcast(entry)
 
 
@@ -452,6 +816,8 @@ async def knx_connect_loop():
     state["language"] = cfg.get("language", "de-DE")
     state["connection_type"] = cfg.get("connection_type", "local")
     state["remote_gateway_token"] = cfg.get("remote_gateway_token", "")
+    state["outbound_rate"] = float(cfg.get("outbound_rate_per_s", 20))
+    state["mgmt_max_tunnels"] = int(cfg.get("management_tunnels", 1))
 
     if state["connection_type"] == "remote_gateway":
         return  # Proxy verbindet sich von außen — hier nichts zu tun
@@ -527,6 +893,7 @@ def load_log_into_buffer():
 
 
 async def start_connect_task():
+    await _close_management_tunnels()  # gateway settings may have changed
     if state["connect_task"] and not state["connect_task"].done():
         state["connect_task"].cancel()
         try:
@@ -543,6 +910,10 @@ def load_last_project():
     try:
         data = json.loads(LAST_PROJECT_PATH.read_text())
         state["project_data"] = data
+        filename = load_config().get("last_project_filename")
+        state["project_slug"] = _project_slug(filename) if filename else None
+        if _move_legacy_security(state["project_slug"], data):
+            LAST_PROJECT_PATH.write_text(json.dumps(data))
         state["ga_dpt_map"] = {
             gad["address"]: gad.get("dpt")
             for gad in data.get("group_addresses", {}).values()
@@ -554,6 +925,7 @@ def load_last_project():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    setup_log()
     load_log_into_buffer()
     load_last_project()
     await start_connect_task()
@@ -563,6 +935,14 @@ async def lifespan(app: FastAPI):
     state["wireguard_ets_port_active"] = cfg.get("wireguard_ets_port_active", False)
     if state["wireguard_enabled"]:
         state["wireguard_latency_task"] = asyncio.create_task(wireguard_monitor_loop())
+    state["polling_schedules"] = cfg.get("polling_schedules", [])
+    state["polling_max_bus_load"] = float(cfg.get("polling_max_bus_load", POLL_MAX_BUS_LOAD))
+    if any(s.get("enabled", True) for s in state["polling_schedules"]):
+        _polling()
+    state["parse_workers"] = max(1, int(cfg.get("parse_workers", PARSE_WORKERS)))
+    state["parse_timeout"] = float(cfg.get("parse_timeout_s", PARSE_TIMEOUT))
+    state["parse_cache_max_mb"] = float(cfg.get("parse_cache_max_mb", PARSE_CACHE_MAX_MB))
+    state["max_upload_mb"] = float(cfg.get("max_upload_mb", MAX_UPLOAD_MB))
     yield
     if state["connect_task"] and not state["connect_task"].done():
         state["connect_task"].cancel()
@@ -570,11 +950,59 @@ async def lifespan(app: FastAPI):
         await state["xknx"].stop()
     if state["wireguard_latency_task"] and not state["wireguard_latency_task"].done():
         state["wireguard_latency_task"].cancel()
+    if state["outbound"] and not state["outbound"]["task"].done():
+        state["outbound"]["task"].cancel()
+    if state["polling"] and not state["polling"]["task"].done():
+        state["polling"]["task"].cancel()
+    _stop_parse_pool()
+    await _close_management_tunnels()
 
 
 app = FastAPI(title="Open-KNXViewer", lifespan=lifespan)
 
 
+def _upload_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Datei zu groß (max. {state['max_upload_mb']:g} MB).")
+
+
+class UploadLimitMiddleware:
+    """Reject oversized project uploads while the request body is still arriving.
+
+    A Content-Length above the limit is refused before anything is read; chunked
+    bodies are counted as they stream in and aborted once they exceed it.
+    """
+
+    def __init__(self, app, paths: set[str]):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        limit = state["max_upload_mb"] * 1024 * 1024 + UPLOAD_FORM_SLACK
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            err = _upload_too_large()
+            await JSONResponse({"detail": err.detail}, status_code=err.status_code)(scope, receive, send)
+            return
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise _upload_too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+app.add_middleware(UploadLimitMiddleware, paths={"/api/parse", "/api/parse/jobs"})
+
+
 @app.get("/.well-known/appspecific/com.chrome.devtools.json", include_in_schema=False)
 async def chrome_devtools():
     return {}
@@ -601,6 +1029,11 @@ def get_gateway():
         "connection_type": state.get("connection_type", "local"),
         "remote_gateway_token": cfg.get("remote_gateway_token", ""),
         "remote_gateway_connected": state.get("remote_gateway_connected", False),
+        "remote_gateways": state.get("remote_gateways", {}),
+        "remote_link": _remote_link_summary(),
+        "outbound": _outbound_summary(),
+        "management": _management_summary(),
+        "polling": _polling_summary(),
     }
 
 
@@ -732,6 +1165,22 @@ def _parse_knxip_description(data: bytes) -> dict:
                     }
                 )
             result["services"] = services
+        elif dib_type == 0x07 and dib_len >= 4:  # DIB_TUNNELLING_INFO (KNXnet/IP v2)
+            slots = []
+            for i in range(4, dib_len - 3, 4):
+                ia_high, ia_low, _, status = block[i : i + 4]
+                slots.append(
+                    {
+                        "address": f"{ia_high >> 4}.{ia_high & 0xF}.{ia_low}",
+                        "usable": bool(status & 0x04),
+                        "authorized": bool(status & 0x02),
+                        "free": bool(status & 0x01),
+                    }
+                )
+            result["tunnelling"] = {
+                "max_apdu_length": struct.unpack_from("!H", block, 2)[0],
+                "slots": slots,
+            }
         pos += dib_len
     return result
 
@@ -745,10 +1194,22 @@ async def set_gateway(data: dict):
             "gateway_port": data.get("port", cfg["gateway_port"]),
             "language": data.get("language", cfg["language"]),
             "connection_type": data.get("connection_type", cfg["connection_type"]),
+            "outbound_rate_per_s": data.get(
+                "outbound_rate_per_s", cfg["outbound_rate_per_s"]
+            ),
+            "management_tunnels": data.get(
+                "management_tunnels", cfg["management_tunnels"]
+            ),
+            "polling_max_bus_load": data.get(
+                "polling_max_bus_load", cfg["polling_max_bus_load"]
+            ),
         }
     )
     save_config(cfg)
     state["language"] = cfg["language"]
+    state["outbound_rate"] = float(cfg["outbound_rate_per_s"])
+    state["mgmt_max_tunnels"] = int(cfg["management_tunnels"])
+    state["polling_max_bus_load"] = float(cfg["polling_max_bus_load"])
     await start_connect_task()
     return {"ok": True}
 
@@ -767,10 +1228,209 @@ def get_last_project_info():
 
 
 @app.get("/api/last-project/data")
-def get_last_project_data():
+async def get_last_project_data(request: Request):
     if not state["project_data"]:
         raise HTTPException(status_code=404, detail="No project data")
-    return JSONResponse(content=state["project_data"])
+    return _project_response(request, await _current_project_entry())
+
+
+async def _project_security(slug: str, password: str, project: dict) -> dict:
+    """Security data of a stored project, extracted on first use.
+
+    Kept next to the project only for archives without a password; protected
+    ones are decrypted again on every request, so the password keeps guarding
+    their keys.
+    """
+    cached = PROJECTS_DIR / f"{slug}.security.json"
+    if cached.exists():
+        return json.loads(cached.read_text())
+    archive = PROJECTS_DIR / f"{slug}.knxproj"
+    if not archive.exists():
+        raise HTTPException(status_code=404, detail="Original nicht gespeichert")
+    refs = {
+        "group_addresses": {
+            ga_id: {"raw_address": ga["raw_address"], "address": ga["address"]}
+            for ga_id, ga in project.get("group_addresses", {}).items()
+        },
+        "devices": {
+            ia: {"name": dev.get("name")} for ia, dev in project.get("devices", {}).items()
+        },
+    }
+    try:
+        security = await _run_in_parse_pool(_security_from_file, str(archive), password, refs)
+    except InvalidPasswordException as exc:
+        raise HTTPException(status_code=422, detail="Projektpasswort fehlt oder ist falsch") from exc
+    except Exception as exc:
+        raise _parse_error(exc) from exc
+    if not password:
+        cached.write_text(json.dumps(security))
+    return security
+
+
+@app.post("/api/project/security")
+async def project_security(data: dict | None = None):
+    """KNX Security data (tool keys, GA keys, certificates) of the current project.
+
+    Not part of the project payload; extracted from the stored .knxproj on
+    request (cached unless the project is password protected).
+    Body: {"password": "..."} for protected projects.
+    """
+    project = state["project_data"]
+    if not project:
+        raise HTTPException(status_code=404, detail="No project data")
+    slug = state["project_slug"]
+    if not slug:
+        raise HTTPException(status_code=404, detail="Original nicht gespeichert")
+    password = (data or {}).get("password") or ""
+    key = (slug, password)
+    inflight = state["security_inflight"].get(key)
+    if inflight is None:
+        inflight = asyncio.create_task(_project_security(slug, password, project))
+        state["security_inflight"][key] = inflight
+
+        def _done(task, key=key):
+            if state["security_inflight"].get(key) is task:
+                del state["security_inflight"][key]
+            if not task.cancelled():
+                task.exception()
+
+        inflight.add_done_callback(_done)
+    return JSONResponse(content=await asyncio.shield(inflight))
+
+
+# ── Project sections ───────────────────────────────────────────────────────────
+# Single parts of the loaded project instead of the whole blob. List sections
+# are paged, filtered and sorted server-side from rows compiled into the project
+# index; tree sections are returned as they are.
+
+# URL name → (project key, field holding the address used by ?range=, separator)
+PROJECT_LIST_SECTIONS = {
+    "devices": ("devices", "individual_address", "."),
+    "group-addresses": ("group_addresses", "address", "/"),
+    "communication-objects": ("communication_objects", "device_address", "."),
+    "functions": ("functions", None, None),
+}
+PROJECT_TREE_SECTIONS = {
+    "info": "info",
+    "topology": "topology",
+    "locations": "locations",
+    "group-ranges": "group_ranges",
+}
+_SEARCH_FIELDS = ("name", "text", "function_text", "description", "comment")
+
+
+def _address_key(value) -> tuple:
+    """Numeric sort key for "1/2/3" and "1.1.5" style addresses."""
+    parts = str(value).replace("/", ".").split(".")
+    return tuple(int(p) if p.isdigit() else 0 for p in parts)
+
+
+def _project_section(name: str) -> list[dict]:
+    """Rows of a list section in address order, compiled once per loaded project."""
+    idx = _project_index()
+    rows = idx["sections"].get(name)
+    if rows is None:
+        key, addr_field, _ = PROJECT_LIST_SECTIONS[name]
+        rows = []
+        for item_id, item in ((idx["project"] or {}).get(key) or {}).items():
+            address = str(item.get(addr_field) or item_id) if addr_field else None
+            rows.append({
+                "id": item_id,
+                "item": item,
+                "address": address,
+                "search": " ".join(
+                    [item_id] + [str(item[f]) for f in _SEARCH_FIELDS if item.get(f)]
+                ).lower(),
+            })
+        if addr_field:
+            rows.sort(key=lambda r: _address_key(r["address"]))
+        idx["sections"][name] = rows
+    return rows
+
+
+def _address_range(pattern: str, sep: str):
+    """Matcher for ?range=1/2/* (any part may be *, a trailing * matches the rest)."""
+    parts = pattern.split(sep)
+    if not pattern or any(p != "*" and not p.isdigit() for p in parts):
+        raise HTTPException(status_code=422, detail=f"Ungültiger Adressbereich: {pattern}")
+    open_end = parts[-1] == "*"
+    if open_end:
+        parts = parts[:-1]
+
+    def matches(address: str) -> bool:
+        addr = address.split(sep)
+        if len(addr) < len(parts) or (not open_end and len(addr) != len(parts)):
+            return False
+        return all(p == "*" or p == a for p, a in zip(parts, addr))
+
+    return matches
+
+
+def _sort_key(field: str):
+    if field == "id":
+        return lambda r: (_address_key(r["id"]), r["id"])
+    if field in ("address", "individual_address", "device_address"):
+        return lambda r: _address_key(r["item"].get(field) or r["address"] or "")
+
+    def key(r):
+        value = r["item"].get(field)
+        if isinstance(value, (int, float)):
+            return (0, value, "")
+        return (1, 0, "" if value is None else str(value).lower())
+
+    return key
+
+
+@app.get("/api/project/{section}")
+async def get_project_section(
+    section: str,
+    offset: int = 0,
+    limit: int = PROJECT_PAGE_SIZE,
+    fields: str = "",
+    q: str = "",
+    sort: str = "",
+    address_range: str = Query("", alias="range"),
+):
+    """One section of the loaded project.
+
+    List sections (devices, group-addresses, communication-objects, functions)
+    return {"total", "offset", "limit", "items"}; every item carries its key as
+    "id". ?range=1/2/* limits to an address range, ?q= searches names and
+    descriptions, ?sort=name (or -name) orders, ?fields=address,name,dpt
+    selects the returned fields.
+    """
+    project = state["project_data"]
+    if not project:
+        raise HTTPException(status_code=404, detail="No project data")
+    if section in PROJECT_TREE_SECTIONS:
+        return JSONResponse(content=project.get(PROJECT_TREE_SECTIONS[section]) or {})
+    if section not in PROJECT_LIST_SECTIONS:
+        raise HTTPException(status_code=404, detail="Unbekannter Projektbereich")
+    if offset < 0 or not 1 <= limit <= PROJECT_PAGE_MAX:
+        raise HTTPException(
+            status_code=422, detail=f"offset >= 0 und limit zwischen 1 und {PROJECT_PAGE_MAX}"
+        )
+    rows = _project_section(section)
+    if address_range:
+        _, addr_field, sep = PROJECT_LIST_SECTIONS[section]
+        if addr_field is None:
+            raise HTTPException(status_code=422, detail="Bereich ohne Adressen")
+        in_range = _address_range(address_range, sep)
+        rows = [r for r in rows if in_range(r["address"])]
+    if q:
+        needle = q.lower()
+        rows = [r for r in rows if needle in r["search"]]
+    if sort:
+        field = sort.lstrip("-")
+        rows = sorted(rows, key=_sort_key(field), reverse=sort.startswith("-"))
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    items = []
+    for r in rows[offset:offset + limit]:
+        if selected:
+            items.append({"id": r["id"], **{f: r["item"].get(f) for f in selected}})
+        else:
+            items.append({"id": r["id"], **r["item"]})
+    return JSONResponse(content={"total": len(rows), "offset": offset, "limit": limit, "items": items})
 
 
 @app.get("/api/recent-projects")
@@ -830,20 +1490,25 @@ def get_recent_xml(slug: str):
 
 
 @app.get("/api/recent-projects/{slug}/data")
-def get_recent_project_data(slug: str):
-    p = PROJECTS_DIR / f"{slug}.json"
-    if not p.exists():
-        raise HTTPException(status_code=404, detail="Not found")
-    data = json.loads(p.read_text())
-    # Update server state so DPT decoding works for incoming telegrams
-    state["project_data"] = data
-    state["ga_dpt_map"] = {
-        gad["address"]: gad.get("dpt")
-        for gad in data.get("group_addresses", {}).values()
-        if gad.get("address")
-    }
-    if state["xknx"]:
-        state["xknx"].group_address_dpt.set(state["ga_dpt_map"])
+async def get_recent_project_data(slug: str, request: Request):
+    cached = await _stored_project_entry(slug)
+    if state["project_slug"] != slug or not state["project_data"]:
+        data = await asyncio.to_thread(json.loads, cached["identity"])
+        # Update server state so DPT decoding works for incoming telegrams
+        state["project_data"] = data
+        state["project_slug"] = slug
+        state["ga_dpt_map"] = {
+            gad["address"]: gad.get("dpt")
+            for gad in data.get("group_addresses", {}).values()
+            if gad.get("address")
+        }
+        if state["xknx"]:
+            state["xknx"].group_address_dpt.set(state["ga_dpt_map"])
+        # Same bytes as the stored file, no need to encode the project again;
+        # they are counted with the file entry as long as that is cached
+        _cache_project_response(
+            ("current",), {**cached, "project": data, "size": 0, "shares": ("file", slug)}
+        )
     # Move to top with updated timestamp
     recent = _load_recent_projects()
     entry = next((r for r in recent if r["slug"] == slug), None)
@@ -851,15 +1516,142 @@ def get_recent_project_data(slug: str):
         entry["last_used"] = datetime.now().isoformat(timespec="seconds")
         recent = [entry] + [r for r in recent if r["slug"] != slug]
         RECENT_PROJECTS_PATH.write_text(json.dumps(recent, indent=2))
-    return JSONResponse(content=data)
+    return _project_response(request, cached)
 
 
 @app.get("/api/recent-projects/{slug}/raw")
-def get_recent_project_raw(slug: str):
-    p = PROJECTS_DIR / f"{slug}.json"
-    if not p.exists():
-        raise HTTPException(status_code=404, detail="Not found")
-    return JSONResponse(content=json.loads(p.read_text()))
+async def get_recent_project_raw(slug: str, request: Request):
+    return _project_response(request, await _stored_project_entry(slug))
+
+
+# ── Project diff ────────────────────────────────────────────────────────────────
+
+
+def _dpt_str(dpt: dict | None) -> str:
+    if not dpt or dpt.get("main") is None:
+        return ""
+    return f"{dpt['main']}.{str(dpt['sub']).zfill(3)}" if dpt.get("sub") is not None else str(dpt["main"])
+
+
+def _device_ga_links(project: dict) -> dict[str, set]:
+    """Device address → group addresses linked by its communication objects."""
+    links: dict[str, set] = {}
+    for co in (project.get("communication_objects") or {}).values():
+        if co.get("device_address"):
+            links.setdefault(co["device_address"], set()).update(co.get("group_address_links") or [])
+    return links
+
+
+def _compute_project_diff(proj_a: dict, proj_b: dict) -> dict:
+    """Devices by IA, GAs by address, DPT changes and changed GA links per device."""
+    gas_a = {ga["address"]: ga for ga in proj_a.get("group_addresses", {}).values() if ga.get("address")}
+    gas_b = {ga["address"]: ga for ga in proj_b.get("group_addresses", {}).values() if ga.get("address")}
+    ga_diff: dict = {"added": [], "removed": [], "changed": []}
+    for addr in sorted(gas_a.keys() | gas_b.keys(), key=_address_key):
+        a, b = gas_a.get(addr), gas_b.get(addr)
+        if a is None or b is None:
+            ga = a or b
+            ga_diff["removed" if b is None else "added"].append(
+                {"address": addr, "name": ga.get("name", ""), "dpt": ga.get("dpt")}
+            )
+            continue
+        dpt_a, dpt_b = _dpt_str(a.get("dpt")), _dpt_str(b.get("dpt"))
+        if a.get("name") != b.get("name") or dpt_a != dpt_b:
+            ga_diff["changed"].append({
+                "address": addr, "nameA": a.get("name", ""), "nameB": b.get("name", ""),
+                "dptA": dpt_a, "dptB": dpt_b, "critical": dpt_a != dpt_b and bool(dpt_a and dpt_b),
+            })
+    devs_a, devs_b = proj_a.get("devices") or {}, proj_b.get("devices") or {}
+    links_a, links_b = _device_ga_links(proj_a), _device_ga_links(proj_b)
+    dev_diff: dict = {"added": [], "removed": [], "changed": []}
+    for ia in sorted(devs_a.keys() | devs_b.keys(), key=_address_key):
+        a, b = devs_a.get(ia), devs_b.get(ia)
+        if a is None or b is None:
+            dev = a or b
+            dev_diff["removed" if b is None else "added"].append(
+                {"individual_address": ia, "name": dev.get("name", "")}
+            )
+            continue
+        la, lb = links_a.get(ia, set()), links_b.get(ia, set())
+        if a.get("name") != b.get("name") or la != lb:
+            dev_diff["changed"].append({
+                "individual_address": ia, "nameA": a.get("name", ""), "nameB": b.get("name", ""),
+                "links_added": sorted(lb - la, key=_address_key),
+                "links_removed": sorted(la - lb, key=_address_key),
+            })
+    return {"ga": ga_diff, "devices": dev_diff}
+
+
+def _project_diff_text(diff: dict, name_a: str, name_b: str) -> str:
+    """Plain-text summary of a project diff, used as input for /api/llm/compare."""
+    ga, dev = diff["ga"], diff["devices"]
+    lines = [
+        f'Vergleich: "{name_a}" vs "{name_b}"', "",
+        f"GRUPPENADRESSEN: Neu ({len(ga['added'])}), Entfernt ({len(ga['removed'])}), "
+        f"Geändert ({len(ga['changed'])})",
+    ]
+    for g in ga["added"]:
+        dpt = _dpt_str(g["dpt"])
+        lines.append(f"  + {g['address']}: {g['name']}" + (f" [DPT {dpt}]" if dpt else ""))
+    for g in ga["removed"]:
+        lines.append(f"  - {g['address']}: {g['name']}")
+    for c in ga["changed"]:
+        if c["dptA"] != c["dptB"]:
+            critical = " [KRITISCH]" if c["critical"] else ""
+            lines.append(f"  ~ {c['address']}: DPT {c['dptA'] or '–'} → {c['dptB'] or '–'}{critical}")
+        if c["nameA"] != c["nameB"]:
+            lines.append(f'  ~ {c["address"]}: "{c["nameA"]}" → "{c["nameB"]}"')
+    lines += ["", (
+        f"GERÄTE: Neu ({len(dev['added'])}), Entfernt ({len(dev['removed'])}), "
+        f"Geändert ({len(dev['changed'])})"
+    )]
+    for d in dev["added"]:
+        lines.append(f"  + {d['individual_address']}: {d['name']}")
+    for d in dev["removed"]:
+        lines.append(f"  - {d['individual_address']}: {d['name']}")
+    for c in dev["changed"]:
+        if c["nameA"] != c["nameB"]:
+            lines.append(f'  ~ {c["individual_address"]}: "{c["nameA"]}" → "{c["nameB"]}"')
+        if c["links_added"] or c["links_removed"]:
+            links = [f"+{g}" for g in c["links_added"]] + [f"-{g}" for g in c["links_removed"]]
+            lines.append(f"  ~ {c['individual_address']}: GA-Verknüpfungen {' '.join(links)}")
+    return "\n".join(lines)
+
+
+async def _project_diff(slug_a: str, slug_b: str) -> dict:
+    """Diff of two stored projects, cached by their slugs and content hashes (ETags)."""
+    entry_a, entry_b = await _stored_project_entry(slug_a), await _stored_project_entry(slug_b)
+    # The slugs are part of the key: the result names both projects
+    key = (slug_a, entry_a["etag"], slug_b, entry_b["etag"])
+    cache = state["project_diffs"]
+    diff = cache.get(key)
+    if diff is not None:
+        cache.move_to_end(key)
+        return diff
+
+    def compute():
+        proj_a, proj_b = json.loads(entry_a["identity"]), json.loads(entry_b["identity"])
+        name_a = proj_a.get("info", {}).get("name") or slug_a
+        name_b = proj_b.get("info", {}).get("name") or slug_b
+        result = {"a": slug_a, "b": slug_b, "name_a": name_a, "name_b": name_b,
+                  **_compute_project_diff(proj_a, proj_b)}
+        result["diff_text"] = _project_diff_text(result, name_a, name_b)
+        return result
+
+    diff = await asyncio.to_thread(compute)
+    cache[key] = diff
+    while len(cache) > PROJECT_DIFF_CACHE:
+        cache.popitem(last=False)
+    return diff
+
+
+@app.get("/api/projects/diff")
+async def projects_diff(b: str, a: str = ""):
+    """Differences from stored project a (default: the current one) to b."""
+    slug_a = a or state["project_slug"]
+    if not slug_a:
+        raise HTTPException(status_code=404, detail="No project data")
+    return JSONResponse(content=await _project_diff(slug_a, b))
 
 
 @app.delete("/api/recent-projects/{slug}")
@@ -869,6 +1661,8 @@ def delete_recent_project(slug: str):
     p = PROJECTS_DIR / f"{slug}.json"
     if p.exists():
         p.unlink()
+    (PROJECTS_DIR / f"{slug}.security.json").unlink(missing_ok=True)
+    _drop_project_response(("file", slug))
     return {"ok": True}
 
 
@@ -958,6 +1752,8 @@ async def websocket_endpoint(ws: WebSocket):
             "language": state["language"],
         }
     )
+    if state.get("connection_type") == "remote_gateway":
+        await ws.send_json({"type": "link_status", **_remote_link_summary()})
     await ws.send_json({"type": "snapshot", "values": state["current_values"]})
     await ws.send_json(
         {
@@ -997,6 +1793,261 @@ def _make_telegram_from_proxy(msg: dict) -> Telegram:
     )
 
 
+def _remote_target(ga_str: str, gateway: str | None = None) -> dict:
+    """Routing field for write/read: explicit gateway or where the GA was last seen."""
+    gw = gateway or state["remote_ga_gateway"].get(ga_str)
+    return {"gw": gw} if gw else {}
+
+
+async def _remote_send(gw_ws, msg: dict):
+    """Send a message to the proxy and account it in the link statistics."""
+    data = json.dumps(msg)
+    await gw_ws.send_text(data)
+    link = state["remote_link"]
+    link["tx_msgs"] += 1
+    link["tx_bytes"] += len(data.encode())
+
+
+def _percentile(values, pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[idx], 1)
+
+
+def _remote_link_summary() -> dict:
+    """Link-quality telemetry as exposed via /api/gateway and /ws."""
+    link = state["remote_link"]
+    rtts = list(link["rtt_ms"])
+    return {
+        "rtt_ms": {
+            "last": round(rtts[-1], 1) if rtts else None,
+            "p50": _percentile(rtts, 50),
+            "p90": _percentile(rtts, 90),
+            "p99": _percentile(rtts, 99),
+            "samples": len(rtts),
+        },
+        "connects": link["connects"],
+        "connected_since": link["connected_since"],
+        "last_pong": link["last_pong"],
+        "rx_bytes": link["rx_bytes"],
+        "tx_bytes": link["tx_bytes"],
+        "rx_msgs": link["rx_msgs"],
+        "tx_msgs": link["tx_msgs"],
+        "rx_bps": round(link["rx_bps"], 1),
+        "tx_bps": round(link["tx_bps"], 1),
+        "proxy_reconnects": link["proxy"].get("reconnects"),
+        "proxy_queued_bytes": link["proxy"].get("queued_bytes"),
+        "proxy_pending": link["proxy"].get("pending"),
+    }
+
+
+def _record_pong(msg: dict):
+    """Update RTT and throughput from a pong answering one of our pings."""
+    link = state["remote_link"]
+    now = time.monotonic()
+    try:
+        link["rtt_ms"].append((now - float(msg["ts"])) * 1000)
+    except (KeyError, TypeError, ValueError):
+        return
+    link["last_pong"] = datetime.now().isoformat(timespec="seconds")
+    link["proxy"] = msg.get("stats") or {}
+    mark_t, mark_rx, mark_tx = link["rate_mark"]
+    dt = now - mark_t
+    if dt > 0:
+        link["rx_bps"] = (link["rx_bytes"] - mark_rx) / dt
+        link["tx_bps"] = (link["tx_bytes"] - mark_tx) / dt
+    link["rate_mark"] = (now, link["rx_bytes"], link["tx_bytes"])
+
+
+async def _remote_ping_loop(ws):
+    """Ping the proxy; a failed send closes the link so the proxy reconnects."""
+    seq = 0
+    try:
+        while True:
+            await asyncio.sleep(REMOTE_PING_INTERVAL)
+            seq += 1
+            await _remote_send(ws, {"type": "ping", "seq": seq, "ts": time.monotonic()})
+    except Exception as exc:
+        logging.getLogger("knx_bus").warning("Remote-Gateway-Ping fehlgeschlagen, trenne: %s", exc)
+        try:
+            await ws.close(code=1011)  # ends receive_text in remote_gateway_endpoint
+        except Exception:
+            pass
+
+
+def _bulk_read_delay(base: float = 0.05) -> float:
+    """Pause between bulk reads, stretched when the remote uplink is slow or backed up."""
+    if state.get("connection_type") != "remote_gateway":
+        return base
+    link = state["remote_link"]
+    p90 = _percentile(link["rtt_ms"], 90)
+    factor = 1.0
+    if p90 is not None and p90 > 100:
+        factor = p90 / 100
+    queued = link["proxy"].get("queued_bytes") or 0
+    if queued > 64 * 1024:
+        factor *= 4
+    elif queued > 16 * 1024:
+        factor *= 2
+    return min(1.0, base * factor)
+
+
+_PROXY_APCIS = {"GroupValueWrite", "GroupValueRead", "GroupValueResponse"}
+_READ_RAW = str(GroupValueRead())
+
+
+def _remote_entry(item: dict, transcoders: dict) -> dict:
+    """Decode a proxy telegram straight into a monitor entry.
+
+    Fast path for /ws/remote-gateway: no xknx Telegram or address objects are
+    built; only the payload is wrapped for the GA's precompiled transcoder.
+    """
+    apci = item["apci"]
+    if apci not in _PROXY_APCIS:
+        raise ValueError(f"Unbekannter APCI: {apci}")
+    src = item["src"]
+    ga = item["ga"]
+    dpt = ""
+    dpt_estimate = ""
+    if apci == "GroupValueRead":
+        raw_value = value = _READ_RAW
+    else:
+        p_val = item.get("payload_value")
+        if item.get("payload_type") == "binary":
+            payload = DPTBinary(p_val)
+        else:
+            payload = DPTArray(tuple(p_val))
+        raw_value = str(payload)
+        transcoder = transcoders.get(ga)
+        if transcoder is not None:
+            try:
+                value, dpt = _format_decoded(transcoder.from_knx(payload), transcoder)
+            except Exception:
+                transcoder = None
+        if transcoder is None:
+            value = raw_value
+            dpt_estimate = _estimate_dpt(payload)
+    return {
+        "type": "telegram",
+        "ts": item.get("ts") or datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+        "src": src,
+        "device": _device_name(src),
+        "ga": ga,
+        "ga_name": _ga_name(ga),
+        "value": value,
+        "raw": raw_value,
+        "dpt": dpt,
+        "dpt_estimate": dpt_estimate,
+        "apci": apci,
+    }
+
+
+async def _ingest_remote_batch(items: list) -> int:
+    """Process a batch of proxy telegrams: one log write, one /ws broadcast."""
+    transcoders = _project_index()["transcoders"]
+    entries = []
+    for item in items:
+        try:
+            entry = _remote_entry(item, transcoders)
+        except (KeyError, TypeError, ValueError) as exc:
+            logging.getLogger("knx_bus").debug("Invalid proxy telegram %s: %s", item, exc)
+            continue
+        if item.get("gw"):
+            state["remote_ga_gateway"][entry["ga"]] = item["gw"]
+        entries.append(entry)
+    _store_entries(entries)
+    if len(entries) == 1:
+        await broadcast(entries[0])
+    elif entries:
+        await broadcast({"type": "telegram_batch", "entries": entries})
+    return len(entries)
+
+
+async def _apply_remote_snapshot(items: list) -> int:
+    """Merge a proxy value snapshot into current_values (older values never win)."""
+    transcoders = _project_index()["transcoders"]
+    updated = 0
+    for item in items:
+        try:
+            entry = _remote_entry(item, transcoders)
+        except (KeyError, TypeError, ValueError):
+            continue
+        if item.get("gw"):
+            state["remote_ga_gateway"][entry["ga"]] = item["gw"]
+        current = state["current_values"].get(entry["ga"])
+        if current and current.get("ts", "") > entry["ts"]:
+            continue
+        state["current_values"][entry["ga"]] = {"value": entry["value"], "ts": entry["ts"]}
+        updated += 1
+    logging.getLogger("knx_bus").info("Remote snapshot: %d values updated", updated)
+    await broadcast({"type": "snapshot", "values": state["current_values"]})
+    return updated
+
+
+@app.post("/api/gateway/remote-snapshot")
+async def request_remote_snapshot():
+    """Ask the proxy for its last-value cache (no bus traffic)."""
+    gw_ws = state.get("remote_gateway_ws")
+    if gw_ws is None:
+        raise HTTPException(status_code=503, detail="Remote-Gateway nicht verbunden")
+    await _remote_send(gw_ws, {"type": "snapshot_request"})
+    return {"ok": True}
+
+
+_FILTER_RANGE_KEYS = {
+    "ga_allow": False,
+    "ga_deny": False,
+    "src_allow": True,
+    "src_deny": True,
+    "on_change": False,
+}
+
+
+def _normalize_gateway_filter(data: dict) -> dict:
+    """Validate a proxy filter config with the proxy's own address parser.
+
+    Raises ValueError on invalid entries so they are rejected here instead of
+    being silently dropped by the proxy.
+    """
+    result: dict = {}
+    for key, individual in _FILTER_RANGE_KEYS.items():
+        specs = data.get(key) or []
+        if isinstance(specs, str):
+            specs = [x for x in specs.replace(",", " ").split() if x]
+        for spec in specs:
+            _address_bounds(str(spec), individual)
+        result[key] = [str(spec).strip() for spec in specs]
+    max_age = int(data.get("max_age_s") or 900)
+    if max_age < 1:
+        raise ValueError("max_age_s muss mindestens 1 Sekunde sein")
+    result["max_age_s"] = max_age
+    return result
+
+
+@app.get("/api/gateway/remote-filter")
+def get_remote_gateway_filter():
+    stored = load_config().get("remote_gateway_filter") or {}
+    return {**_normalize_gateway_filter({}), **stored}
+
+
+@app.post("/api/gateway/remote-filter")
+async def set_remote_gateway_filter(data: dict):
+    """Store the proxy-side telegram filter and push it to a connected proxy."""
+    try:
+        flt = _normalize_gateway_filter(data)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=422, detail=f"Ungültiger Filter: {exc}") from exc
+    cfg = load_config()
+    cfg["remote_gateway_filter"] = flt
+    save_config(cfg)
+    gw_ws = state.get("remote_gateway_ws")
+    if gw_ws is not None:
+        await _remote_send(gw_ws, {"type": "filter", **flt})
+    return {"ok": True, "filter": flt, "pushed": gw_ws is not None}
+
+
 @app.websocket("/ws/remote-gateway")
 async def remote_gateway_endpoint(ws: WebSocket, token: str = Query(...)):
     cfg = load_config()
@@ -1008,11 +2059,32 @@ async def remote_gateway_endpoint(ws: WebSocket, token: str = Query(...)):
         return
     await ws.accept()
     state["remote_gateway_ws"] = ws
+    link = state["remote_link"]
+    link["connects"] += 1
+    link["connected_since"] = datetime.now().isoformat(timespec="seconds")
+    link["rtt_ms"].clear()
+    link["rate_mark"] = (time.monotonic(), link["rx_bytes"], link["tx_bytes"])
+    ping_task = asyncio.create_task(_remote_ping_loop(ws))
     try:
+        await _remote_send(ws, {"type": "filter", **(cfg.get("remote_gateway_filter") or {})})
+        # Repopulate current_values from the proxy's cache instead of reading the bus
+        await _remote_send(ws, {"type": "snapshot_request"})
         while True:
-            msg = json.loads(await ws.receive_text())
-            if msg["type"] == "status":
-                state["remote_gateway_connected"] = msg.get("connected", False)
+            raw = await ws.receive_text()
+            link["rx_msgs"] += 1
+            link["rx_bytes"] += len(raw)
+            msg = json.loads(raw)
+            if msg["type"] == "pong":
+                _record_pong(msg)
+                await broadcast({"type": "link_status", **_remote_link_summary()})
+            elif msg["type"] == "status":
+                if msg.get("gw"):
+                    state["remote_gateways"][msg["gw"]] = msg.get("connected", False)
+                    state["remote_gateway_connected"] = any(
+                        state["remote_gateways"].values()
+                    )
+                else:
+                    state["remote_gateway_connected"] = msg.get("connected", False)
                 state["connected"] = state["remote_gateway_connected"]
                 await broadcast(
                     {
@@ -1021,124 +2093,358 @@ async def remote_gateway_endpoint(ws: WebSocket, token: str = Query(...)):
                         "ip": "remote",
                         "port": 0,
                         "language": state["language"],
+                        "gateways": state["remote_gateways"],
                     }
                 )
+            elif msg["type"] == "telegrams":
+                await _ingest_remote_batch(msg.get("items", []))
             elif msg["type"] == "telegram":
-                telegram = _make_telegram_from_proxy(msg)
-                asyncio.create_task(_process_telegram(telegram))
+                await _ingest_remote_batch([msg])
+            elif msg["type"] == "snapshot":
+                await _apply_remote_snapshot(msg.get("telegrams", []))
     except WebSocketDisconnect:
         pass
     finally:
+        ping_task.cancel()
         state["remote_gateway_ws"] = None
+        state["remote_gateways"] = {}
         state["remote_gateway_connected"] = False
         state["connected"] = False
         await broadcast({"type": "status", "connected": False})
 
 
-# ── GA Write / Read ───────────────────────────────────────────────────────────
-
+# ── Outbound scheduler ────────────────────────────────────────────────────────
+#
+# Every telegram we put on the bus goes through one queue per process. Jobs are
+# served by priority class, and each line (local tunnel, or proxy gateway id)
+# gets a telegrams/s budget. Polling and bulk traffic additionally yield to the
+# incoming bus load and to a slow remote uplink; interactive traffic only
+# respects the budget so a running scan never delays a user's write.
+# Management connections (PA scan, programming mode, device properties) are
+# driven by xknx on their own tunnel; they take turns in the same queue via
+# _bus_turn, weighted by the telegrams each step puts on the line.
+
+OUTBOUND_INTERACTIVE = 0  # user-triggered write/read
+OUTBOUND_BATCH = 1  # items of /api/ga/write-batch
+OUTBOUND_POLLING = 2  # scheduled reads
+OUTBOUND_BULK = 3  # read-all, scans
+OUTBOUND_CLASSES = ("interactive", "batch", "polling", "bulk")
+OUTBOUND_MIN_RATE = 1.0  # background traffic is slowed down, never starved
+
+
+def _note_bus_traffic(count: int):
+    sec = int(time.monotonic())
+    buckets = state["bus_rx"]
+    if buckets and buckets[-1][0] == sec:
+        buckets[-1][1] += count
+    else:
+        buckets.append([sec, count])
+
+
+def _bus_load() -> float:
+    """Incoming telegrams/s averaged over the last BUS_LOAD_WINDOW seconds."""
+    cutoff = int(time.monotonic()) - BUS_LOAD_WINDOW
+    return sum(c for sec, c in state["bus_rx"] if sec >= cutoff) / BUS_LOAD_WINDOW
+
+
+def _outbound_interval(priority: int) -> float:
+    """Minimum spacing on one line before a job of this class may be sent."""
+    rate = max(OUTBOUND_MIN_RATE, float(state["outbound_rate"]))
+    if priority == OUTBOUND_INTERACTIVE:
+        return 1 / rate
+    rate = max(OUTBOUND_MIN_RATE, rate - _bus_load())
+    return _bulk_read_delay(1 / rate)
+
+
+def _outbound() -> dict:
+    """Scheduler state; the worker is (re)started on first use in the running loop."""
+    ob = state["outbound"]
+    if ob is None or ob["task"].done():
+        ob = {
+            "pending": [],
+            "seq": 0,
+            "last_sent": {},  # line → monotonic time of the last telegram
+            "sent": [0] * len(OUTBOUND_CLASSES),
+            "wakeup": asyncio.Event(),
+        }
+        ob["task"] = asyncio.create_task(_outbound_worker(ob))
+        state["outbound"] = ob
+    return ob
+
+
+def _proxy_message(telegram: Telegram, gateway: str | None = None) -> dict:
+    ga_str = str(telegram.destination_address)
+    payload = telegram.payload
+    if isinstance(payload, GroupValueRead):
+        return {"type": "read", "ga": ga_str, **_remote_target(ga_str, gateway)}
+    raw_payload = payload.value
+    if isinstance(raw_payload, DPTBinary):
+        p_type, p_val = "binary", raw_payload.value
+    else:
+        p_type, p_val = "array", list(raw_payload.value)
+    return {
+        "type": "write",
+        "ga": ga_str,
+        "payload_type": p_type,
+        "payload_value": p_val,
+        **_remote_target(ga_str, gateway),
+    }
 
-@app.post("/api/ga/write")
-async def ga_write(data: dict):
-    ga_str = data.get("ga", "")
-    value_str = str(data.get("value", ""))
-    if not state["connected"]:
-        raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
-    if (
-        state.get("wireguard_enabled")
-        and "ga_rw" not in state["wireguard_allowed_actions"]
-    ):
-        raise HTTPException(
-            status_code=503,
-            detail=f"Latenz zu hoch ({state['wireguard_latency_ms']} ms) — GA-Schreiben nicht erlaubt",
-        )
-    dpt_info = state["ga_dpt_map"].get(ga_str)
-    if not dpt_info:
-        raise HTTPException(status_code=422, detail="DPT für diese GA nicht bekannt")
-    try:
-        transcoder = DPTBase.parse_transcoder(dpt_info)
-        if transcoder is None:
-            raise ValueError(f"Unbekannter DPT: {dpt_info}")
-        main = dpt_info.get("main")
-        if main == 1:
-            bool_val = value_str.strip().lower() in (
-                "1",
-                "true",
-                "ein",
-                "an",
-                "on",
-                "yes",
-            )
-            typed_value = bool_val
-            display_value = "Ein" if bool_val else "Aus"
-        else:
-            typed_value = float(value_str)
-            unit = getattr(transcoder, "unit", "") or ""
-            display_value = f"{typed_value:.2f}{' ' + unit if unit else ''}"
-        payload = GroupValueWrite(transcoder.to_knx(typed_value))
-    except Exception as exc:
-        raise HTTPException(
-            status_code=422, detail=f"Wert konnte nicht kodiert werden: {exc}"
-        ) from exc
 
-    telegram = Telegram(destination_address=GroupAddress(ga_str), payload=payload)
+async def _outbound_dispatch(job: dict):
+    if job["telegram"] is None:
+        return  # a turn for traffic the caller sends itself, see _bus_turn
     if state.get("connection_type") == "remote_gateway":
         gw_ws = state.get("remote_gateway_ws")
         if gw_ws is None:
-            raise HTTPException(
-                status_code=503, detail="Remote-Gateway nicht verbunden"
-            )
-        raw_payload = payload.value
-        if isinstance(raw_payload, DPTBinary):
-            p_type, p_val = "binary", raw_payload.value
-        else:
-            p_type, p_val = "array", list(raw_payload.value)
-        await gw_ws.send_json(
-            {
-                "type": "write",
-                "ga": ga_str,
-                "payload_type": p_type,
-                "payload_value": p_val,
-            }
-        )
+            raise HTTPException(status_code=503, detail="Remote-Gateway nicht verbunden")
+        await _remote_send(gw_ws, _proxy_message(job["telegram"], job["gateway"]))
     else:
-        await state["xknx"].telegrams.put(telegram)
+        if state["xknx"] is None:
+            raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
+        await state["xknx"].telegrams.put(job["telegram"])
 
-    # Update local state so current_values and WebSocket clients reflect the sent value
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-    ga_name = ""
-    if state["project_data"]:
-        for gad in state["project_data"].get("group_addresses", {}).values():
-            if gad.get("address") == ga_str:
-                ga_name = gad.get("name", "")
-                break
-    dpt_main = dpt_info.get("main")
-    dpt_sub = dpt_info.get("sub")
-    dpt = (
-        f"{dpt_main}.{str(dpt_sub).zfill(3)}"
-        if dpt_main is not None and dpt_sub is not None
-        else str(dpt_main or "")
-    )
-    entry = {
+
+async def _outbound_worker(ob: dict):
+    pending = ob["pending"]
+    while True:
+        pending[:] = [j for j in pending if not j["future"].done()]  # drop cancelled callers
+        if not pending:
+            ob["wakeup"].clear()
+            await ob["wakeup"].wait()
+            continue
+        now = time.monotonic()
+        ready_at = {
+            id(j): ob["last_sent"].get(j["line"], 0.0) + _outbound_interval(j["prio"])
+            for j in pending
+        }
+        ready = [j for j in pending if ready_at[id(j)] <= now]
+        if not ready:
+            ob["wakeup"].clear()
+            try:
+                await asyncio.wait_for(
+                    ob["wakeup"].wait(), timeout=min(ready_at.values()) - now
+                )
+            except asyncio.TimeoutError:
+                pass
+            continue
+        job = min(ready, key=lambda j: (j["prio"], j["seq"]))
+        pending.remove(job)
+        # a turn worth several telegrams holds the line for their intervals
+        ob["last_sent"][job["line"]] = now + (job["cost"] - 1) * _outbound_interval(job["prio"])
+        try:
+            await _outbound_dispatch(job)
+        except Exception as exc:
+            if not job["future"].done():
+                job["future"].set_exception(exc)
+            continue
+        ob["sent"][job["prio"]] += job["cost"]
+        if not job["future"].done():
+            job["future"].set_result(None)
+
+
+async def _bus_send(
+    telegram: Telegram,
+    priority: int = OUTBOUND_INTERACTIVE,
+    gateway: str | None = None,
+):
+    """Queue a telegram and wait until it has been handed to the gateway.
+
+    Raises HTTPException(503) if the gateway is gone by the time it is sent.
+    """
+    ob = _outbound()
+    line = ""
+    if state.get("connection_type") == "remote_gateway":
+        line = _remote_target(str(telegram.destination_address), gateway).get("gw", "")
+    await _outbound_enqueue(ob, telegram, priority, line, gateway, 1)
+
+
+async def _bus_turn(priority: int, cost: int = 1):
+    """Wait for a turn on the local line for `cost` telegrams sent outside the queue.
+
+    Used by management connections, which xknx sends itself.
+    """
+    await _outbound_enqueue(_outbound(), None, priority, "", None, cost)
+
+
+async def _outbound_enqueue(
+    ob: dict, telegram: Telegram | None, priority: int, line: str, gateway: str | None, cost: int
+):
+    ob["seq"] += 1
+    job = {
+        "telegram": telegram,
+        "prio": priority,
+        "seq": ob["seq"],
+        "line": line,
+        "gateway": gateway,
+        "cost": cost,
+        "future": asyncio.get_running_loop().create_future(),
+    }
+    ob["pending"].append(job)
+    ob["wakeup"].set()
+    await job["future"]
+
+
+def _outbound_summary() -> dict:
+    ob = state["outbound"]
+    pending = [0] * len(OUTBOUND_CLASSES)
+    sent = ob["sent"] if ob else pending
+    if ob:
+        for job in ob["pending"]:
+            if not job["future"].done():
+                pending[job["prio"]] += 1
+    return {
+        "rate_per_s": state["outbound_rate"],
+        "bus_load": round(_bus_load(), 1),
+        "pending": dict(zip(OUTBOUND_CLASSES, pending)),
+        "sent": dict(zip(OUTBOUND_CLASSES, sent)),
+    }
+
+
+# ── GA Write / Read ───────────────────────────────────────────────────────────
+
+
+def _encode_ga_write(ga_str: str, value) -> tuple:
+    """Encode a value for a GA with its precompiled encoder; returns (payload, display, dpt)."""
+    dpt_info = state["ga_dpt_map"].get(ga_str)
+    if not dpt_info:
+        raise HTTPException(status_code=422, detail="DPT für diese GA nicht bekannt")
+    try:
+        compiled = _project_index()["encoders"].get(ga_str)
+        if compiled is None:
+            raise ValueError(f"Unbekannter DPT: {dpt_info}")
+        encode, dpt = compiled
+        payload, display_value = encode(value)
+    except Exception as exc:
+        raise HTTPException(
+            status_code=422, detail=f"Wert konnte nicht kodiert werden: {exc}"
+        ) from exc
+    return payload, display_value, dpt
+
+
+def _own_write_entry(ga_str: str, display_value: str, dpt: str) -> dict:
+    """Telegram entry for a value written by this application."""
+    return {
         "type": "telegram",
-        "ts": ts,
+        "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
         "src": "0.0.0",
         "device": "Open-KNXViewer",
         "ga": ga_str,
-        "ga_name": ga_name,
+        "ga_name": _ga_name(ga_str),
         "value": display_value,
         "raw": "",
         "dpt": dpt,
     }
-    state["current_values"][ga_str] = {"value": display_value, "ts": ts}
+
+
+def _check_ga_write_allowed():
+    if not state["connected"]:
+        raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
+    if (
+        state.get("wireguard_enabled")
+        and "ga_rw" not in state["wireguard_allowed_actions"]
+    ):
+        raise HTTPException(
+            status_code=503,
+            detail=f"Latenz zu hoch ({state['wireguard_latency_ms']} ms) — GA-Schreiben nicht erlaubt",
+        )
+
+
+def _check_remote_connected():
+    if (
+        state.get("connection_type") == "remote_gateway"
+        and state.get("remote_gateway_ws") is None
+    ):
+        raise HTTPException(status_code=503, detail="Remote-Gateway nicht verbunden")
+
+
+@app.post("/api/ga/write")
+async def ga_write(data: dict):
+    ga_str = data.get("ga", "")
+    _check_ga_write_allowed()
+    payload, display_value, dpt = _encode_ga_write(ga_str, data.get("value", ""))
+    _check_remote_connected()
+    telegram = Telegram(destination_address=GroupAddress(ga_str), payload=payload)
+    await _bus_send(telegram, OUTBOUND_INTERACTIVE, data.get("gateway"))
+
+    # Update local state so current_values and WebSocket clients reflect the sent value
+    entry = _own_write_entry(ga_str, display_value, dpt)
+    state["current_values"][ga_str] = {"value": display_value, "ts": entry["ts"]}
     state["telegram_buffer"].append(entry)
     await broadcast(entry)
     return {"ok": True}
 
 
-@app.post("/api/ga/read")
-async def ga_read(data: dict):
-    ga_str = data.get("ga", "")
+WRITE_BATCH_MAX = 1000
+
+
+@app.post("/api/ga/write-batch")
+async def ga_write_batch(data: dict):
+    """Write many GAs in one request (scenes, commissioning scripts).
+
+    All items are validated and encoded before the first telegram is sent;
+    with ``all_or_nothing`` a single invalid item rejects the whole batch.
+    Valid items go out in order through the outbound queue in their own class:
+    ahead of polling and scans, but paced by the bus load like them, so
+    interactive requests can slip in between.
+    """
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=422, detail="Keine Einträge angegeben")
+    if len(items) > WRITE_BATCH_MAX:
+        raise HTTPException(
+            status_code=422, detail=f"Maximal {WRITE_BATCH_MAX} Einträge pro Anfrage"
+        )
+    _check_ga_write_allowed()
+    default_gateway = data.get("gateway")
+
+    results = []
+    prepared = []
+    for item in items:
+        ga_str = str(item.get("ga", "")) if isinstance(item, dict) else ""
+        try:
+            if not isinstance(item, dict):
+                raise HTTPException(status_code=422, detail="Ungültiger Eintrag")
+            payload, display_value, dpt = _encode_ga_write(ga_str, item.get("value", ""))
+            telegram = Telegram(destination_address=GroupAddress(ga_str), payload=payload)
+        except HTTPException as exc:
+            results.append({"ga": ga_str, "ok": False, "error": exc.detail})
+            continue
+        except Exception as exc:
+            results.append({"ga": ga_str, "ok": False, "error": f"Ungültige GA: {exc}"})
+            continue
+        result = {"ga": ga_str, "ok": True, "value": display_value}
+        results.append(result)
+        prepared.append((result, telegram, item.get("gateway", default_gateway), dpt))
+
+    failed = len(results) - len(prepared)
+    if failed and data.get("all_or_nothing"):
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"{failed} Einträge ungültig", "results": results},
+        )
+    _check_remote_connected()
+
+    entries = []
+    for result, telegram, gateway, dpt in prepared:
+        try:
+            await _bus_send(telegram, OUTBOUND_BATCH, gateway)
+        except HTTPException as exc:
+            result.update(ok=False, error=exc.detail)
+            result.pop("value")
+            continue
+        entries.append(_own_write_entry(result["ga"], result["value"], dpt))
+
+    current = state["current_values"]
+    for e in entries:
+        current[e["ga"]] = {"value": e["value"], "ts": e["ts"]}
+    state["telegram_buffer"].extend(entries)
+    if entries:
+        await broadcast({"type": "telegram_batch", "entries": entries})
+    return {"ok": len(entries) == len(results), "sent": len(entries), "results": results}
+
+
+def _check_ga_read_allowed():
     if not state["connected"]:
         raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
     if (
@@ -1149,23 +2455,222 @@ async def ga_read(data: dict):
             status_code=503,
             detail=f"Latenz zu hoch ({state['wireguard_latency_ms']} ms) — GA-Lesen nicht erlaubt",
         )
-    if state.get("connection_type") == "remote_gateway":
-        gw_ws = state.get("remote_gateway_ws")
-        if gw_ws is None:
-            raise HTTPException(
-                status_code=503, detail="Remote-Gateway nicht verbunden"
-            )
-        await gw_ws.send_json({"type": "read", "ga": ga_str})
-    else:
-        telegram = Telegram(
-            destination_address=GroupAddress(ga_str), payload=GroupValueRead()
-        )
-        await state["xknx"].telegrams.put(telegram)
+    _check_remote_connected()
+
+
+@app.post("/api/ga/read")
+async def ga_read(data: dict):
+    try:
+        ga_str = str(GroupAddress(data.get("ga", "")))
+    except Exception:
+        raise HTTPException(
+            status_code=422, detail=f"Ungültige Gruppenadresse: {data.get('ga', '')}"
+        ) from None
+    _check_ga_read_allowed()
+    if ga_str in state["read_inflight"]:
+        return {"ok": True, "coalesced": True}  # a read of this GA is already on the bus
+    telegram = Telegram(
+        destination_address=GroupAddress(ga_str), payload=GroupValueRead()
+    )
+    await _bus_send(telegram, OUTBOUND_INTERACTIVE, data.get("gateway"))
     return {"ok": True}
 
 
+def _response_waiter(ga_str: str) -> asyncio.Future:
+    """Future resolved with (entry, monotonic time) by the next response from this GA."""
+    fut = asyncio.get_running_loop().create_future()
+    state["read_waiters"].setdefault(ga_str, []).append(fut)
+    return fut
+
+
+def _drop_waiter(ga_str: str, fut: asyncio.Future):
+    waiters = state["read_waiters"].get(ga_str)
+    if waiters and fut in waiters:
+        waiters.remove(fut)
+        if not waiters:
+            del state["read_waiters"][ga_str]
+
+
+def _resolve_read_waiters(entries: list[dict]):
+    waiters = state["read_waiters"]
+    if not waiters:
+        return
+    now = time.monotonic()
+    for e in entries:
+        if e.get("apci") != "GroupValueResponse":
+            continue
+        for fut in waiters.pop(e["ga"], ()):
+            if not fut.done():
+                fut.set_result((e, now))
+
+
+async def _read_once(ga_str: str, read: dict, gateway: str | None) -> dict:
+    """Send one read and wait for the response until read["deadline"].
+
+    Callers that join later push the deadline out to their own timeout.
+    """
+    loop = asyncio.get_running_loop()
+    fut = _response_waiter(ga_str)
+    try:
+        tg = Telegram(destination_address=GroupAddress(ga_str), payload=GroupValueRead())
+        await _bus_send(tg, OUTBOUND_INTERACTIVE, gateway)
+        while not fut.done():
+            remaining = read["deadline"] - loop.time()
+            if remaining <= 0:
+                raise HTTPException(status_code=504, detail=f"Keine Antwort von {ga_str}")
+            await asyncio.wait({fut}, timeout=remaining)
+        entry, _ = fut.result()
+    finally:
+        _drop_waiter(ga_str, fut)
+    return entry
+
+
+async def _read_coalesced(ga_str: str, timeout: float, gateway: str | None = None) -> dict:
+    """Read a GA and wait for its response; concurrent callers share one bus telegram.
+
+    The shared read lasts until the deadline of its longest-waiting caller.
+    """
+    deadline = asyncio.get_running_loop().time() + timeout
+    read = state["read_inflight"].get(ga_str)
+    if read is None:
+        read = {"deadline": deadline}
+        read["task"] = asyncio.create_task(_read_once(ga_str, read, gateway))
+        state["read_inflight"][ga_str] = read
+
+        def _done(task, ga_str=ga_str, read=read):
+            if state["read_inflight"].get(ga_str) is read:
+                del state["read_inflight"][ga_str]
+            if not task.cancelled():
+                task.exception()  # retrieved here so early-leaving callers don't log it
+
+        read["task"].add_done_callback(_done)
+    else:
+        read["deadline"] = max(read["deadline"], deadline)
+    try:
+        return await asyncio.wait_for(asyncio.shield(read["task"]), timeout=timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504, detail=f"Keine Antwort von {ga_str} innerhalb von {timeout:g} s"
+        ) from None
+
+
+def _value_age(ts: str) -> float | None:
+    try:
+        seen = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S.%f")
+    except (TypeError, ValueError):
+        return None
+    return (datetime.now() - seen).total_seconds()
+
+
+@app.get("/api/ga/value")
+async def ga_value(
+    ga: str,
+    max_age: float | None = None,
+    timeout: float = 2.0,
+    gateway: str | None = None,
+):
+    """Current value of a GA, read from the bus and awaited.
+
+    With max_age (seconds) a cached value that is at most that old is returned
+    without touching the bus. Concurrent reads of the same GA share one telegram.
+    """
+    try:
+        ga = str(GroupAddress(ga))
+    except Exception:
+        raise HTTPException(status_code=422, detail=f"Ungültige Gruppenadresse: {ga}") from None
+    if max_age is not None:
+        cached = state["current_values"].get(ga)
+        age = _value_age(cached["ts"]) if cached else None
+        if age is not None and age <= max_age:
+            return {"ga": ga, "value": cached["value"], "ts": cached["ts"], "cached": True}
+    _check_ga_read_allowed()
+    entry = await _read_coalesced(ga, min(30.0, max(0.1, timeout)), gateway)
+    return {
+        "ga": ga,
+        "value": entry["value"],
+        "ts": entry["ts"],
+        "src": entry["src"],
+        "cached": False,
+    }
+
+
+def _read_all_summary(job: dict) -> dict:
+    counts = {"answered": 0, "timeout": 0, "pending": 0, "not_sent": 0}
+    for res in job["results"].values():
+        counts[res["status"]] += 1
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "started": job["started"],
+        "finished": job["finished"],
+        "round": job["round"],
+        "total": len(job["results"]),
+        "sent": job["sent"],
+        "skipped": len(job["skipped"]),
+        **counts,
+    }
+
+
+async def _run_read_all(job: dict, timeout: float, retries: int):
+    results = job["results"]
+    todo = list(results)
+    try:
+        for rnd in range(1 + retries):
+            if rnd:
+                await asyncio.sleep(READ_ALL_BACKOFF * 2 ** (rnd - 1))
+            job["round"] = rnd + 1
+            waits = []
+            for i, ga_str in enumerate(todo):
+                if job["cancel"]:
+                    break
+                fut = _response_waiter(ga_str)
+                tg = Telegram(
+                    destination_address=GroupAddress(ga_str), payload=GroupValueRead()
+                )
+                try:
+                    await _bus_send(tg, OUTBOUND_BULK)
+                except HTTPException:
+                    _drop_waiter(ga_str, fut)
+                    job["cancel"] = True  # gateway gone
+                    break
+                waits.append((ga_str, fut, time.monotonic()))
+                results[ga_str]["attempts"] += 1
+                job["sent"] += 1
+                if i % 20 == 0:
+                    await broadcast({"type": "read_all_progress", **_read_all_summary(job)})
+            for ga_str, fut, sent_at in waits:
+                remaining = 0.0 if job["cancel"] else sent_at + timeout - time.monotonic()
+                try:
+                    entry, answered_at = await asyncio.wait_for(fut, timeout=max(0.0, remaining))
+                except asyncio.TimeoutError:
+                    _drop_waiter(ga_str, fut)
+                    results[ga_str]["status"] = "timeout"
+                    continue
+                results[ga_str].update(
+                    status="answered",
+                    latency_ms=round((answered_at - sent_at) * 1000, 1),
+                    value=entry["value"],
+                    src=entry["src"],
+                )
+            todo = [ga for ga in todo if results[ga]["status"] != "answered"]
+            await broadcast({"type": "read_all_progress", **_read_all_summary(job)})
+            if not todo or job["cancel"]:
+                break
+    finally:
+        for res in results.values():
+            if res["status"] == "pending":
+                res["status"] = "not_sent"
+        job["status"] = "cancelled" if job["cancel"] else "done"
+        job["finished"] = datetime.now().isoformat(timespec="seconds")
+        await broadcast({"type": "read_all_complete", **_read_all_summary(job)})
+
+
 @app.post("/api/ga/read-all")
-async def ga_read_all():
+async def ga_read_all(data: dict | None = None):
+    """Read every readable GA and track which ones answer.
+
+    Body (optional): {"timeout": s, "retries": n, "include_unreadable": bool}
+    """
     if not state["connected"]:
         raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
     if (
@@ -1176,119 +2681,753 @@ async def ga_read_all():
             status_code=503,
             detail=f"Latenz zu hoch ({state['wireguard_latency_ms']} ms) — GA-Lesen nicht erlaubt",
         )
+    job = state["read_all_job"]
+    if job and job["status"] == "running":
+        raise HTTPException(status_code=409, detail="Alle-Lesen läuft bereits")
+    data = data or {}
+    try:
+        timeout = min(30.0, max(0.1, float(data.get("timeout", READ_ALL_TIMEOUT))))
+        retries = min(5, max(0, int(data.get("retries", READ_ALL_RETRIES))))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=422, detail="Ungültiger Wert für timeout/retries"
+        ) from None
+
     gas = list(state["ga_dpt_map"].keys())
+    skipped = []
+    readable = _project_index()["readable_gas"]
+    if readable is not None and not data.get("include_unreadable"):
+        skipped = [ga for ga in gas if ga not in readable]
+        gas = [ga for ga in gas if ga in readable]
+
+    job = {
+        "id": uuid.uuid4().hex[:8],
+        "status": "running",
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "finished": None,
+        "round": 0,
+        "sent": 0,
+        "cancel": False,
+        "skipped": skipped,
+        "results": {
+            ga: {"status": "pending", "attempts": 0, "latency_ms": None, "value": None}
+            for ga in gas
+        },
+    }
+    state["read_all_job"] = job
+    asyncio.create_task(_run_read_all(job, timeout, retries))
+    return {"ok": True, "count": len(gas), "skipped": len(skipped), "job_id": job["id"]}
 
-    async def _send_all():
-        if state.get("connection_type") == "remote_gateway":
-            gw_ws = state.get("remote_gateway_ws")
-            if gw_ws is None:
-                return
-            for ga_str in gas:
-                await gw_ws.send_json({"type": "read", "ga": ga_str})
-                await asyncio.sleep(0.05)
-        else:
-            for ga_str in gas:
-                tg = Telegram(
-                    destination_address=GroupAddress(ga_str), payload=GroupValueRead()
+
+@app.get("/api/ga/read-all")
+def ga_read_all_report():
+    """Report of the running or last read-all: per-GA status, attempts and latency."""
+    job = state["read_all_job"]
+    if job is None:
+        raise HTTPException(status_code=404, detail="Noch kein Lesedurchlauf")
+    return {
+        **_read_all_summary(job),
+        "skipped_gas": job["skipped"],
+        "results": job["results"],
+    }
+
+
+@app.post("/api/ga/read-all/cancel")
+async def ga_read_all_cancel():
+    if state["read_all_job"]:
+        state["read_all_job"]["cancel"] = True
+    return {"ok": True}
+
+
+# ── Cyclic polling ────────────────────────────────────────────────────────────
+#
+# Devices that do not send on change are read periodically. Each schedule
+# spreads its GAs evenly over the interval (plus random jitter) so that a list
+# of 50 GAs polled every minute produces a steady trickle instead of a burst.
+# Reads go through the outbound queue as OUTBOUND_POLLING and therefore share
+# the per-line budget; polls are deferred while the bus is busy and skipped if
+# the previous read of the same GA is still waiting in the queue.
+
+
+def _polling() -> dict:
+    """Return the polling worker, starting it on first use."""
+    poll = state["polling"]
+    if poll is None or poll["task"].done():
+        poll = {
+            "wakeup": asyncio.Event(),
+            "plan": [],  # heap of [fire_at, seq, schedule id, ga, slot]
+            "seq": 0,
+            "inflight": set(),
+            "stats": {},  # schedule id → counters
+        }
+        _polling_replan(poll)
+        poll["task"] = asyncio.create_task(_polling_worker(poll))
+        state["polling"] = poll
+    return poll
+
+
+def _polling_replan(poll: dict):
+    """Lay out the next poll of every GA of every enabled schedule."""
+    now = time.monotonic()
+    plan = []
+    for sched in state["polling_schedules"]:
+        poll["stats"].setdefault(
+            sched["id"], {"sent": 0, "deferred": 0, "overrun": 0, "errors": 0, "last_poll": None}
+        )
+        if not sched.get("enabled", True) or not sched["gas"]:
+            continue
+        step = sched["interval_s"] / len(sched["gas"])
+        for i, ga in enumerate(sched["gas"]):
+            slot = now + i * step
+            poll["seq"] += 1
+            plan.append([slot + random.uniform(0, sched["jitter_s"]), poll["seq"], sched["id"], ga, slot])
+    heapq.heapify(plan)
+    poll["plan"] = plan
+    poll["wakeup"].set()
+
+
+async def _poll_read(poll: dict, stats: dict, ga_str: str):
+    try:
+        tg = Telegram(destination_address=GroupAddress(ga_str), payload=GroupValueRead())
+        await _bus_send(tg, OUTBOUND_POLLING)
+        stats["sent"] += 1
+        stats["last_poll"] = datetime.now().isoformat(timespec="seconds")
+    except HTTPException:
+        stats["errors"] += 1
+    finally:
+        poll["inflight"].discard(ga_str)
+
+
+async def _polling_worker(poll: dict):
+    while True:
+        plan = poll["plan"]
+        now = time.monotonic()
+        if not plan or plan[0][0] > now:
+            poll["wakeup"].clear()
+            try:
+                await asyncio.wait_for(
+                    poll["wakeup"].wait(), timeout=plan[0][0] - now if plan else None
                 )
-                await state["xknx"].telegrams.put(tg)
-                await asyncio.sleep(
-                    0.05
-                )  # 50 ms between requests to avoid flooding the bus
+            except asyncio.TimeoutError:
+                pass
+            continue
+        item = heapq.heappop(plan)
+        _, _, sid, ga_str, slot = item
+        sched = next((s for s in state["polling_schedules"] if s["id"] == sid), None)
+        if sched is None:
+            continue
+        stats = poll["stats"][sid]
+        allowed = state["connected"] and (
+            not state.get("wireguard_enabled")
+            or "ga_rw" in state["wireguard_allowed_actions"]
+        )
+        if allowed and _bus_load() > state["polling_max_bus_load"]:
+            # Busy bus: retry shortly, but never later than the next regular slot
+            stats["deferred"] += 1
+            item[0] = now + min(POLL_BUSY_DELAY, sched["interval_s"])
+            if item[0] < slot + sched["interval_s"]:
+                heapq.heappush(plan, item)
+                continue
+        elif allowed and ga_str in poll["inflight"]:
+            stats["overrun"] += 1  # budget too small for this schedule
+        elif allowed:
+            poll["inflight"].add(ga_str)
+            asyncio.create_task(_poll_read(poll, stats, ga_str))
+        # Next slot on the schedule's grid; resynchronise if we fell behind
+        slot += sched["interval_s"]
+        if slot < now:
+            slot = now + sched["interval_s"]
+        item[0] = slot + random.uniform(0, sched["jitter_s"])
+        item[4] = slot
+        heapq.heappush(plan, item)
+
+
+def _polling_summary() -> dict:
+    poll = state["polling"]
+    stats = poll["stats"] if poll else {}
+    return {
+        "running": bool(poll and not poll["task"].done()),
+        "max_bus_load": state["polling_max_bus_load"],
+        "bus_load": round(_bus_load(), 1),
+        "schedules": [
+            {**sched, "stats": stats.get(sched["id"])} for sched in state["polling_schedules"]
+        ],
+    }
+
+
+def _parse_poll_schedule(data: dict) -> dict:
+    """Validate a schedule from the API; raises HTTPException(422)."""
+    gas = data.get("gas")
+    if not isinstance(gas, list) or not gas:
+        raise HTTPException(status_code=422, detail="Keine Gruppenadressen angegeben")
+    try:
+        gas = list(dict.fromkeys(str(GroupAddress(str(ga))) for ga in gas))
+    except Exception as exc:
+        raise HTTPException(status_code=422, detail=f"Ungültige GA: {exc}") from exc
+    try:
+        interval = float(data.get("interval_s", 60))
+        jitter = float(data.get("jitter_s", 0))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=422, detail="Ungültiger Wert für interval_s/jitter_s"
+        ) from None
+    if interval < POLL_MIN_INTERVAL:
+        raise HTTPException(
+            status_code=422, detail=f"Intervall muss mindestens {POLL_MIN_INTERVAL:g} s sein"
+        )
+    if not 0 <= jitter <= interval:
+        raise HTTPException(
+            status_code=422, detail="Jitter muss zwischen 0 und dem Intervall liegen"
+        )
+    return {
+        "id": str(data.get("id") or uuid.uuid4().hex[:8]),
+        "name": str(data.get("name", "")),
+        "gas": gas,
+        "interval_s": interval,
+        "jitter_s": jitter,
+        "enabled": bool(data.get("enabled", True)),
+    }
+
+
+def _save_poll_schedules(schedules: list[dict]):
+    cfg = load_config()
+    cfg["polling_schedules"] = schedules
+    save_config(cfg)
+    state["polling_schedules"] = schedules
+    _polling_replan(_polling())
+
+
+@app.get("/api/polling")
+def get_polling():
+    return _polling_summary()
+
+
+@app.post("/api/polling")
+async def set_poll_schedule(data: dict):
+    """Create a polling schedule, or replace the one with the same id.
+
+    Body: {"id"?, "name", "gas": [...], "interval_s", "jitter_s", "enabled"}
+    """
+    sched = _parse_poll_schedule(data)
+    schedules = [s for s in state["polling_schedules"] if s["id"] != sched["id"]]
+    schedules.append(sched)
+    _save_poll_schedules(schedules)
+    return sched
+
+
+@app.delete("/api/polling/{schedule_id}")
+async def delete_poll_schedule(schedule_id: str):
+    schedules = [s for s in state["polling_schedules"] if s["id"] != schedule_id]
+    if len(schedules) == len(state["polling_schedules"]):
+        raise HTTPException(status_code=404, detail="Abfrageplan nicht gefunden")
+    _save_poll_schedules(schedules)
+    if state["polling"]:
+        state["polling"]["stats"].pop(schedule_id, None)
+    return {"ok": True}
+
+
+# ── Management tunnels ────────────────────────────────────────────────────────
+#
+# Scans, programming-mode detection and property reads run over their own
+# tunnel(s) so that heavy management traffic does not delay telegram reception
+# on the monitoring tunnel. Tunnels are opened on demand, shared by concurrent
+# operations and closed after MGMT_IDLE_TIMEOUT. Without a free tunnel slot on
+# the gateway, management falls back to the monitoring tunnel.
+
+
+async def _open_management_tunnel() -> XKNX | None:
+    ip, port = state["gateway_ip"], state["gateway_port"]
+    try:
+        desc = await asyncio.wait_for(_fetch_gateway_description(ip, port), timeout=2.0)
+        slots = desc.get("tunnelling", {}).get("slots")
+        if slots is not None and not any(s["free"] and s["usable"] for s in slots):
+            logging.getLogger("knx_bus").info("Kein freier Tunnel-Slot für Management")
+            return None
+    except Exception:
+        pass  # gateway without (v2) description — just try to connect
+    xknx = XKNX(
+        connection_config=ConnectionConfig(
+            connection_type=ConnectionType.TUNNELING,
+            gateway_ip=ip,
+            gateway_port=port,
+        )
+    )
+    try:
+        await asyncio.wait_for(xknx.start(), timeout=5.0)
+    except Exception as exc:
+        logging.getLogger("knx_bus").warning("Management-Tunnel nicht verfügbar: %s", exc)
+        try:
+            await xknx.stop()
+        except Exception:
+            pass
+        return None
+    return xknx
+
+
+async def _lease_management_tunnel() -> dict | None:
+    if not state["mgmt_max_tunnels"] or state.get("connection_type") == "remote_gateway":
+        return None
+    if state["mgmt_lock"] is None:
+        state["mgmt_lock"] = asyncio.Lock()
+    pool = state["mgmt_pool"]
+    async with state["mgmt_lock"]:
+        for entry in [e for e in pool if not e["xknx"].connection_manager.connected.is_set()]:
+            pool.remove(entry)
+            asyncio.create_task(entry["xknx"].stop())
+        entry = next((e for e in pool if e["users"] == 0), None)
+        if (
+            entry is None
+            and len(pool) < state["mgmt_max_tunnels"]
+            and time.monotonic() >= state["mgmt_retry_at"]
+        ):
+            xknx = await _open_management_tunnel()
+            if xknx is None:
+                state["mgmt_retry_at"] = time.monotonic() + MGMT_RETRY_DELAY
+            else:
+                entry = {"xknx": xknx, "users": 0, "last_used": time.monotonic()}
+                pool.append(entry)
+                if state["mgmt_reaper"] is None or state["mgmt_reaper"].done():
+                    state["mgmt_reaper"] = asyncio.create_task(_management_reaper())
+        if entry is None and pool:
+            entry = min(pool, key=lambda e: e["users"])  # share the least busy tunnel
+        if entry is not None:
+            entry["users"] += 1
+        return entry
+
+
+@asynccontextmanager
+async def _management_tunnel():
+    """XKNX instance to run management procedures on."""
+    entry = await _lease_management_tunnel()
+    if entry is None:
+        yield state["xknx"]
+        return
+    try:
+        yield entry["xknx"]
+    finally:
+        entry["users"] -= 1
+        entry["last_used"] = time.monotonic()
+
+
+async def _management_reaper():
+    while state["mgmt_pool"]:
+        await asyncio.sleep(min(10.0, MGMT_IDLE_TIMEOUT))
+        now = time.monotonic()
+        for entry in list(state["mgmt_pool"]):
+            if entry["users"] == 0 and now - entry["last_used"] >= MGMT_IDLE_TIMEOUT:
+                state["mgmt_pool"].remove(entry)
+                await entry["xknx"].stop()
+
+
+async def _close_management_tunnels():
+    pool, state["mgmt_pool"] = state["mgmt_pool"], []
+    state["mgmt_retry_at"] = 0.0
+    for entry in pool:
+        try:
+            await entry["xknx"].stop()
+        except Exception:
+            pass
 
-    asyncio.create_task(_send_all())
-    return {"ok": True, "count": len(gas)}
+
+def _management_summary() -> dict:
+    return {
+        "max_tunnels": state["mgmt_max_tunnels"],
+        "open_tunnels": len(state["mgmt_pool"]),
+        "active_operations": sum(e["users"] for e in state["mgmt_pool"]),
+    }
 
 
 # ── Bus Scan ───────────────────────────────────────────────────────────────────
 
 
+def _collect_ga_scan_responses(entries: list[dict]):
+    """Record responses from GAs inside the range of the running GA scan."""
+    job = state["ga_scan"]
+    if job is None or not state["ga_scan_running"]:
+        return
+    lo, hi = job["range"]
+    for e in entries:
+        if e.get("apci") != "GroupValueResponse":
+            continue
+        try:
+            raw = GroupAddress(e["ga"]).raw
+        except Exception:
+            continue
+        if lo <= raw <= hi:
+            job["responded"][e["ga"]] = {"value": e["value"], "src": e["src"], "ts": e["ts"]}
+
+
+def _save_ga_scan(job: dict):
+    job["updated"] = datetime.now().isoformat(timespec="seconds")
+    GA_SCAN_PATH.write_text(json.dumps(job))
+
+
+def _load_ga_scan() -> dict | None:
+    if state.get("ga_scan") is not None:
+        return state["ga_scan"]
+    if GA_SCAN_PATH.exists():
+        try:
+            return json.loads(GA_SCAN_PATH.read_text())
+        except (OSError, ValueError):
+            return None
+    return None
+
+
+def _ga_scan_progress(job: dict) -> dict:
+    lo, hi = job["range"]
+    return {
+        "done": job["position"],
+        "total": hi - lo + 1,
+        "sent": job["sent"],
+        "skipped": job["skipped"],
+        "responded": len(job["responded"]),
+    }
+
+
+async def _run_ga_scan(job: dict, skip: set):
+    lo, hi = job["range"]
+    delay = job["params"]["delay_ms"] / 1000
+    try:
+        # position is the offset of the next GA; the range is generated lazily
+        while lo + job["position"] <= hi:
+            if state.get("ga_scan_cancel") or not state["connected"]:
+                break
+            ga_str = str(GroupAddress(lo + job["position"]))
+            if ga_str in skip:
+                job["position"] += 1
+                job["skipped"] += 1
+                continue
+            tg = Telegram(destination_address=GroupAddress(ga_str), payload=GroupValueRead())
+            sent_at = time.monotonic()
+            try:
+                # Pacing adapts to bus load via the outbound scheduler
+                await _bus_send(tg, OUTBOUND_BULK)
+            except HTTPException:
+                break
+            job["position"] += 1
+            job["sent"] += 1
+            if job["sent"] % 20 == 0:
+                await broadcast({"type": "scan_ga_progress", **_ga_scan_progress(job)})
+            if job["sent"] % 100 == 0:
+                _save_ga_scan(job)
+            if delay:
+                # optional floor on top of the scheduler's own pacing
+                await asyncio.sleep(max(0.0, delay - (time.monotonic() - sent_at)))
+        if job["sent"] and not state.get("ga_scan_cancel"):
+            await asyncio.sleep(GA_SCAN_SETTLE)  # late responses still count
+    finally:
+        job["cancelled"] = state.get("ga_scan_cancel", False)
+        job["complete"] = lo + job["position"] > hi
+        state["ga_scan_running"] = False
+        _save_ga_scan(job)
+        await broadcast(
+            {
+                "type": "scan_ga_complete",
+                **_ga_scan_progress(job),
+                "cancelled": job["cancelled"],
+                "complete": job["complete"],
+            }
+        )
+        state["ga_scan_cancel"] = False
+
+
 @app.post("/api/ga/scan")
 async def ga_scan(data: dict):
-    """Scan a range of group addresses by sending GroupValueRead to each."""
+    """Scan a range of group addresses by sending GroupValueRead to each.
+
+    Options: skip_known (GAs of the loaded project), skip_answered (GAs that
+    answered in earlier scans; listed as answered_before, not as results of
+    the new scan), delay_ms (extra pause per read) and
+    resume (continue the last interrupted scan).
+    """
     if not state["connected"]:
         raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
     if state.get("ga_scan_running"):
         raise HTTPException(status_code=409, detail="GA-Scan läuft bereits")
 
-    start = data.get("start", "0/0/1")
-    end = data.get("end", "5/7/255")
-    delay_ms = max(50, int(data.get("delay_ms", 100)))
+    previous = _load_ga_scan()
+    if data.get("resume"):
+        if not previous or previous.get("complete"):
+            raise HTTPException(
+                status_code=404, detail="Kein unterbrochener GA-Scan vorhanden"
+            )
+        job = previous
+    else:
+        try:
+            lo = GroupAddress(data.get("start", "0/0/1")).raw
+            hi = GroupAddress(data.get("end", "5/7/255")).raw
+        except Exception:
+            raise HTTPException(
+                status_code=422, detail="Ungültiges GA-Format (erwartet: main/middle/sub)"
+            ) from None
+        if hi < lo:
+            raise HTTPException(status_code=422, detail="Ende liegt vor dem Anfang")
+        params = {
+            "start": data.get("start", "0/0/1"),
+            "end": data.get("end", "5/7/255"),
+            "delay_ms": max(0, min(1000, int(data.get("delay_ms", 0)))),
+            "skip_known": bool(data.get("skip_known", False)),
+            "skip_answered": bool(data.get("skip_answered", False)),
+        }
+        answered = set()
+        if params["skip_answered"] and previous:
+            answered.update(previous.get("responded", {}), previous.get("answered_before", ()))
+        job = {
+            "params": params,
+            "range": [lo, hi],
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "position": 0,
+            "sent": 0,
+            "skipped": 0,
+            "responded": {},
+            # skipped as answered in an earlier scan; not results of this one
+            "answered_before": sorted(answered, key=lambda ga: GroupAddress(ga).raw),
+        }
+
+    # The skip set is rebuilt on resume; position counts every GA in the range,
+    # so the resume point stays valid whatever is skipped.
+    skip = set()
+    if job["params"]["skip_known"]:
+        skip.update(state["ga_dpt_map"])
+        skip.update(_project_index()["ga_by_address"])
+    if job["params"]["skip_answered"]:
+        skip.update(job["responded"], job.get("answered_before", ()))
+    job.update(complete=False, cancelled=False)
+    state["ga_scan"] = job
+    _save_ga_scan(job)
+
+    state["ga_scan_running"] = True
+    state["ga_scan_cancel"] = False
+    asyncio.create_task(_run_ga_scan(job, skip))
+    lo, hi = job["range"]
+    return {
+        "ok": True,
+        "count": hi - lo + 1,
+        "remaining": hi - lo + 1 - job["position"],
+        "resumed": bool(data.get("resume")),
+    }
+
+
+@app.get("/api/ga/scan")
+def ga_scan_report():
+    """State of the running or last GA scan with the GAs that responded."""
+    job = _load_ga_scan()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Noch kein GA-Scan")
+    return {
+        **_ga_scan_progress(job),
+        **job,  # "responded" here is the full result set, not the count
+        "running": state.get("ga_scan_running", False),
+    }
+
+
+@app.post("/api/ga/scan/cancel")
+async def ga_scan_cancel():
+    state["ga_scan_cancel"] = True
+    return {"ok": True}
+
+
+def _pa_scan_order(params: dict, project: dict | None):
+    """Yield the addresses to probe, lazily and in a deterministic order.
+
+    With guided=True and a loaded project: known devices first, then the
+    remaining addresses of populated lines, then (unless skip_unpopulated)
+    all other lines in the requested range.
+    """
+    area, line, device = params["area"], params["line"], params["device"]
+    devices = [device] if device is not None else range(1, 256)
+
+    def in_scope(a: int, li: int) -> bool:
+        return (area is None or a == area) and (line is None or li == line)
+
+    known = []
+    populated = []
+    if params["guided"] and project:
+        for addr in project.get("devices", {}):
+            try:
+                a, li, d = (int(x) for x in addr.split("."))
+            except ValueError:
+                continue
+            if in_scope(a, li) and (device is None or d == device):
+                known.append((a, li, d))
+        for a_key, area_data in project.get("topology", {}).items():
+            for l_key, line_data in (area_data.get("lines") or {}).items():
+                try:
+                    a, li = int(a_key), int(l_key)
+                except ValueError:
+                    continue
+                if line_data.get("devices") and in_scope(a, li):
+                    populated.append((a, li))
+    known.sort()
+    populated.sort()
+    yield from (f"{a}.{li}.{d}" for a, li, d in known)
+
+    known_set = set(known)
+    covered = set(populated)
+    for a, li in populated:
+        yield from (f"{a}.{li}.{d}" for d in devices if (a, li, d) not in known_set)
+    if params["skip_unpopulated"] and populated:
+        return
+    for a in [area] if area is not None else range(1, 16):
+        for li in [line] if line is not None else range(1, 16):
+            if (a, li) in covered:
+                continue
+            yield from (f"{a}.{li}.{d}" for d in devices if (a, li, d) not in known_set)
+
+
+def _pa_scan_project_key() -> str:
+    project = state["project_data"] or {}
+    return f"{project.get('info', {}).get('name', '')}#{len(project.get('devices', {}))}"
+
+
+def _pa_scan_diff(scan: dict) -> dict | None:
+    """Compare the checked part of a scan with the devices of the loaded project."""
+    project = state["project_data"]
+    if not project:
+        return None
+    expected = set(project.get("devices", {}))
+    checked = {
+        addr
+        for addr in islice(_pa_scan_order(scan["params"], project), scan["position"])
+        if addr in expected
+    }
+    found = set(scan["found"])
+
+    def key(a):
+        return IndividualAddress(a).raw
+
+    return {
+        "missing": sorted(checked - found, key=key),
+        "unexpected": sorted(found - expected, key=key),
+    }
+
 
-    def _parse_ga(s: str):
-        parts = s.split("/")
-        return int(parts[0]), int(parts[1]), int(parts[2])
+def _save_pa_scan(scan: dict):
+    scan["updated"] = datetime.now().isoformat(timespec="seconds")
+    PA_SCAN_PATH.write_text(json.dumps(scan))
 
-    try:
-        sm, sk, ss = _parse_ga(start)
-        em, ek, es = _parse_ga(end)
-    except Exception:
-        raise HTTPException(
-            status_code=422, detail="Ungültiges GA-Format (erwartet: main/middle/sub)"
-        ) from None
 
-    gas = []
-    for m in range(sm, em + 1):
-        for k in range(0, 8):
-            if m == sm and k < sk:
-                continue
-            if m == em and k > ek:
-                break
-            for s in range(0, 256):
-                if m == sm and k == sk and s < ss:
-                    continue
-                if m == em and k == ek and s > es:
-                    break
-                gas.append(f"{m}/{k}/{s}")
+def _load_pa_scan() -> dict | None:
+    if state.get("pa_scan") is not None:
+        return state["pa_scan"]
+    if PA_SCAN_PATH.exists():
+        try:
+            return json.loads(PA_SCAN_PATH.read_text())
+        except (OSError, ValueError):
+            return None
+    return None
 
-    if len(gas) > 32768:
-        raise HTTPException(
-            status_code=422, detail=f"Bereich zu groß ({len(gas)} GAs, max 32768)"
-        )
 
-    state["ga_scan_running"] = True
-    state["ga_scan_cancel"] = False
+async def _check_pa(addr: str, timeout: float) -> bool | None:
+    """True if a device answers, False if none does, None if the check failed."""
+    from xknx.management.procedures import nm_individual_address_check
 
-    async def _run():
+    # connect, descriptor read, ack and disconnect
+    await _bus_turn(OUTBOUND_BULK, cost=4)
+    try:
+        async with _management_tunnel() as xknx:
+            return await asyncio.wait_for(
+                nm_individual_address_check(xknx, IndividualAddress(addr)),
+                timeout=timeout,
+            )
+    except asyncio.TimeoutError:
+        return False
+    except Exception as exc:
+        logging.getLogger("knx_bus").debug("PA-Check %s fehlgeschlagen: %s", addr, exc)
+        return None
+
+
+async def _run_pa_scan(scan: dict):
+    params = scan["params"]
+    ceiling = params["timeout_ms"] / 1000
+    found = scan["found"]
+    rtts = deque(maxlen=50)  # ms until an existing device answered
+    slots = asyncio.Semaphore(params["window"])
+    probes = set()
+    finished = set(scan.get("finished", ()))  # indices done beyond the resume position
+    completed = 0
+
+    async def _probe(idx: int, addr: str):
+        nonlocal completed
         try:
-            for i, ga_str in enumerate(gas):
-                if state.get("ga_scan_cancel"):
-                    break
-                if not state["connected"]:
-                    break
-                tg = Telegram(
-                    destination_address=GroupAddress(ga_str), payload=GroupValueRead()
-                )
-                await state["xknx"].telegrams.put(tg)
-                if i % 20 == 0:
-                    await broadcast(
-                        {"type": "scan_ga_progress", "done": i, "total": len(gas)}
-                    )
-                await asyncio.sleep(delay_ms / 1000)
+            started = time.monotonic()
+            present = await _check_pa(addr, _pa_scan_timeout(rtts, ceiling))
         finally:
-            state["ga_scan_running"] = False
+            slots.release()
+        if present is None:
+            return  # no definite answer — stays open, a resumed scan checks it again
+        if present:
+            rtts.append((time.monotonic() - started) * 1000)
+            found.append(addr)
+        # position = every address before it has been checked
+        finished.add(idx)
+        while scan["position"] in finished:
+            finished.remove(scan["position"])
+            scan["position"] += 1
+        completed += 1
+        if completed % 25 == 0:
+            scan["finished"] = sorted(finished)
+            _save_pa_scan(scan)
+        if present:
+            await broadcast({"type": "scan_pa_found", "address": addr})
+        if completed % 5 == 0:
             await broadcast(
                 {
-                    "type": "scan_ga_complete",
-                    "total": len(gas),
-                    "cancelled": state.get("ga_scan_cancel", False),
+                    "type": "scan_pa_progress",
+                    "done": scan["position"] + len(finished),
+                    "total": scan["total"],
+                    "timeout_ms": round(_pa_scan_timeout(rtts, ceiling) * 1000),
                 }
             )
-            state["ga_scan_cancel"] = False
 
-    asyncio.create_task(_run())
-    return {"ok": True, "count": len(gas)}
-
-
-@app.post("/api/ga/scan/cancel")
-async def ga_scan_cancel():
-    state["ga_scan_cancel"] = True
-    return {"ok": True}
+    try:
+        for idx, addr in enumerate(_pa_scan_order(params, state["project_data"])):
+            if idx < scan["position"] or idx in finished:
+                continue  # checked before the scan was interrupted
+            await slots.acquire()
+            # Back off while the bus is busy; checks already in flight finish
+            while _bus_load() > params["max_bus_load"] and not state.get("pa_scan_cancel"):
+                await asyncio.sleep(0.2)
+            if state.get("pa_scan_cancel") or not state["connected"]:
+                slots.release()
+                break
+            task = asyncio.create_task(_probe(idx, addr))
+            probes.add(task)
+            task.add_done_callback(probes.discard)
+        if probes:
+            await asyncio.gather(*probes)
+    finally:
+        pending = list(probes)
+        for task in pending:
+            task.cancel()
+        # Let the cancelled checks unwind before the final checkpoint
+        await asyncio.gather(*pending, return_exceptions=True)
+        scan["cancelled"] = state.get("pa_scan_cancel", False)
+        scan["complete"] = scan["position"] >= scan["total"]
+        scan["finished"] = sorted(finished)
+        scan["found"] = sorted(found, key=lambda a: IndividualAddress(a).raw)
+        scan["diff"] = _pa_scan_diff(scan)
+        _save_pa_scan(scan)
+        state["pa_scan_running"] = False
+        await broadcast(
+            {
+                "type": "scan_pa_complete",
+                "found": scan["found"],
+                "total": scan["total"],
+                "cancelled": scan["cancelled"],
+                "complete": scan["complete"],
+                "diff": scan["diff"],
+            }
+        )
+        state["pa_scan_cancel"] = False
 
 
 @app.post("/api/bus/scan")
 async def bus_scan(data: dict):
-    """Scan physical addresses on the bus using xknx management P2P connections."""
+    """Scan physical addresses on the bus using xknx management P2P connections.
+
+    {"resume": true} continues the last interrupted scan with its parameters.
+    """
     if not state["connected"]:
         raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
     if state.get("connection_type") == "remote_gateway":
@@ -1298,62 +3437,67 @@ async def bus_scan(data: dict):
     if state.get("pa_scan_running"):
         raise HTTPException(status_code=409, detail="PA-Scan läuft bereits")
 
-    area = data.get("area")  # None = alle Bereiche 1-15
-    line = data.get("line")  # None = alle Linien 1-15
-    device = data.get("device")  # None = alle Geräte 1-255
-    timeout_ms = max(500, min(5000, int(data.get("timeout_ms", 1500))))
-
-    areas = [area] if area is not None else list(range(1, 16))
-    addresses = []
-    for a in areas:
-        lines = [line] if line is not None else list(range(1, 16))
-        for li in lines:
-            devices = [device] if device is not None else list(range(1, 256))
-            for d in devices:
-                addresses.append(f"{a}.{li}.{d}")
+    if data.get("resume"):
+        scan = _load_pa_scan()
+        if not scan or scan.get("complete"):
+            raise HTTPException(
+                status_code=404, detail="Kein unterbrochener PA-Scan vorhanden"
+            )
+        if scan["params"]["guided"] and scan["project"] != _pa_scan_project_key():
+            raise HTTPException(
+                status_code=409,
+                detail="Projekt hat sich seit dem Scan geändert — bitte neu starten",
+            )
+    else:
+        params = {
+            "area": data.get("area"),  # None = alle Bereiche 1-15
+            "line": data.get("line"),  # None = alle Linien 1-15
+            "device": data.get("device"),  # None = alle Geräte 1-255
+            "timeout_ms": max(500, min(5000, int(data.get("timeout_ms", 1500)))),
+            "window": max(1, min(32, int(data.get("window", PA_SCAN_WINDOW)))),
+            "max_bus_load": float(data.get("max_bus_load", PA_SCAN_MAX_BUS_LOAD)),
+            "guided": bool(data.get("guided", True)),
+            "skip_unpopulated": bool(data.get("skip_unpopulated", False)),
+        }
+        scan = {
+            "params": params,
+            "project": _pa_scan_project_key(),
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "position": 0,
+            "finished": [],
+            "found": [],
+        }
+    scan["total"] = sum(1 for _ in _pa_scan_order(scan["params"], state["project_data"]))
+    scan.update(complete=False, cancelled=False, diff=None)
+    state["pa_scan"] = scan
+    _save_pa_scan(scan)
 
     state["pa_scan_running"] = True
     state["pa_scan_cancel"] = False
+    asyncio.create_task(_run_pa_scan(scan))
+    return {
+        "ok": True,
+        "count": scan["total"],
+        "remaining": scan["total"] - scan["position"] - len(scan.get("finished", ())),
+        "window": scan["params"]["window"],
+        "resumed": bool(data.get("resume")),
+    }
 
-    async def _check(addr: str) -> bool:
-        from xknx.management.procedures import nm_individual_address_check
 
-        try:
-            return await asyncio.wait_for(
-                nm_individual_address_check(state["xknx"], IndividualAddress(addr)),
-                timeout=timeout_ms / 1000,
-            )
-        except (asyncio.TimeoutError, Exception):
-            return False
+@app.get("/api/bus/scan")
+def bus_scan_report():
+    """State of the running or last PA scan, including the diff against the project."""
+    scan = _load_pa_scan()
+    if scan is None:
+        raise HTTPException(status_code=404, detail="Noch kein PA-Scan")
+    return {**scan, "running": state.get("pa_scan_running", False)}
 
-    async def _run():
-        found = []
-        try:
-            for i, addr in enumerate(addresses):
-                if state.get("pa_scan_cancel") or not state["connected"]:
-                    break
-                exists = await _check(addr)
-                if exists:
-                    found.append(addr)
-                    await broadcast({"type": "scan_pa_found", "address": addr})
-                if i % 5 == 0:
-                    await broadcast(
-                        {"type": "scan_pa_progress", "done": i, "total": len(addresses)}
-                    )
-        finally:
-            state["pa_scan_running"] = False
-            await broadcast(
-                {
-                    "type": "scan_pa_complete",
-                    "found": found,
-                    "total": len(addresses),
-                    "cancelled": state.get("pa_scan_cancel", False),
-                }
-            )
-            state["pa_scan_cancel"] = False
 
-    asyncio.create_task(_run())
-    return {"ok": True, "count": len(addresses)}
+def _pa_scan_timeout(rtts, ceiling: float) -> float:
+    """Per-address timeout: a multiple of the p90 answer time seen so far, within bounds."""
+    if len(rtts) < 3:
+        return ceiling
+    return min(ceiling, max(PA_SCAN_MIN_TIMEOUT, 4 * _percentile(rtts, 90) / 1000))
 
 
 @app.post("/api/bus/scan/cancel")
@@ -1373,51 +3517,44 @@ async def bus_programming_mode(timeout: float = 3.0):
         )
     from xknx.management.procedures import nm_individual_address_read
 
+    await _bus_turn(OUTBOUND_INTERACTIVE)  # one broadcast read
     try:
-        addresses = await asyncio.wait_for(
-            nm_individual_address_read(state["xknx"], timeout=timeout),
-            timeout=timeout + 1.0,
-        )
+        async with _management_tunnel() as xknx:
+            addresses = await asyncio.wait_for(
+                nm_individual_address_read(xknx, timeout=timeout),
+                timeout=timeout + 1.0,
+            )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return {"addresses": [str(a) for a in addresses]}
 
 
-@app.get("/api/device/{addr}/properties")
-async def device_properties(addr: str):
-    """Read device properties via xknx management P2P connection."""
-    if not state["connected"]:
-        raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
-    if state.get("connection_type") == "remote_gateway":
-        raise HTTPException(
-            status_code=503,
-            detail="Device-Properties nur mit lokaler Gateway-Verbindung",
-        )
+# KNX standard Object 0 (Device Object) property IDs
+DEVICE_PROPERTIES = {
+    11: "PID_OBJECT_TYPE",
+    13: "PID_OBJECT_NAME",
+    12: "PID_MANUFACTURER_ID",
+    14: "PID_LOAD_STATE",
+    56: "PID_SERIAL_NUMBER",
+    57: "PID_FIRMWARE_REVISION",
+    78: "PID_ORDER_INFO",
+}
 
-    from xknx.telegram import apci as xknx_apci
 
-    # KNX standard Object 0 (Device Object) property IDs
-    PROPERTIES = {
-        11: "PID_OBJECT_TYPE",
-        13: "PID_OBJECT_NAME",
-        12: "PID_MANUFACTURER_ID",
-        14: "PID_LOAD_STATE",
-        56: "PID_SERIAL_NUMBER",
-        57: "PID_FIRMWARE_REVISION",
-        78: "PID_ORDER_INFO",
-    }
+async def _read_device_properties(addr: str, priority: int = OUTBOUND_INTERACTIVE) -> dict:
+    """Read descriptor and Device Object properties over one P2P connection.
 
-    try:
-        ia = IndividualAddress(addr)
-    except Exception:
-        raise HTTPException(
-            status_code=422, detail=f"Ungültige physische Adresse: {addr}"
-        ) from None
+    Each step takes its turn in the outbound queue with the given priority.
+    """
+    from xknx.telegram import apci as xknx_apci
 
+    ia = IndividualAddress(addr)
     try:
-        async with state["xknx"].management.connection(ia) as conn:
+        await _bus_turn(priority, cost=2)  # connect and disconnect
+        async with _management_tunnel() as xknx, xknx.management.connection(ia) as conn:
             # Read device descriptor (type info)
             try:
+                await _bus_turn(priority, cost=2)  # request and ack of the response
                 desc_resp = await asyncio.wait_for(
                     conn.request(
                         payload=xknx_apci.DeviceDescriptorRead(descriptor=0),
@@ -1432,10 +3569,14 @@ async def device_properties(addr: str):
                 )
             except Exception:
                 descriptor = None
+            if descriptor is None:
+                # Unreachable — a failure, not a result to cache
+                raise HTTPException(status_code=504, detail=f"Gerät {addr} antwortet nicht")
 
             # Read properties
             props = {}
-            for pid, name in PROPERTIES.items():
+            for pid, name in DEVICE_PROPERTIES.items():
+                await _bus_turn(priority, cost=2)
                 try:
                     resp = await asyncio.wait_for(
                         conn.request(
@@ -1450,6 +3591,8 @@ async def device_properties(addr: str):
                     props[name] = raw.hex().upper() if raw else None
                 except Exception:
                     props[name] = None
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=503, detail=f"Verbindung zu {addr} fehlgeschlagen: {exc}"
@@ -1461,12 +3604,171 @@ async def device_properties(addr: str):
 
     return {
         "address": addr,
-        "descriptor": f"0x{descriptor:04X}" if descriptor is not None else None,
+        "descriptor": f"0x{descriptor:04X}",
         "manufacturer_id": mfr_id,
         "properties": props,
+        "read_at": datetime.now().isoformat(timespec="seconds"),
+        "read_ts": time.time(),
+    }
+
+
+def _device_cache() -> dict:
+    if state["device_cache"] is None:
+        cache = {}
+        if DEVICE_CACHE_PATH.exists():
+            try:
+                cache = json.loads(DEVICE_CACHE_PATH.read_text())
+            except (OSError, ValueError):
+                cache = {}
+        state["device_cache"] = cache
+    return state["device_cache"]
+
+
+def _save_device_cache():
+    DEVICE_CACHE_PATH.write_text(json.dumps(_device_cache(), indent=2))
+
+
+def _cached_properties(addr: str, max_age: float = DEVICE_CACHE_TTL) -> dict | None:
+    entry = _device_cache().get(addr)
+    if entry and time.time() - entry.get("read_ts", 0) <= max_age:
+        return entry
+    return None
+
+
+def _check_management_allowed(what: str):
+    if not state["connected"]:
+        raise HTTPException(status_code=503, detail="Kein KNX-Gateway verbunden")
+    if state.get("connection_type") == "remote_gateway":
+        raise HTTPException(
+            status_code=503, detail=f"{what} nur mit lokaler Gateway-Verbindung"
+        )
+
+
+@app.get("/api/device/{addr}/properties")
+async def device_properties(addr: str, refresh: bool = False):
+    """Device properties, served from the cache unless stale or refresh=true.
+
+    504 if the device does not answer (nothing is cached then).
+    """
+    try:
+        IndividualAddress(addr)
+    except Exception:
+        raise HTTPException(
+            status_code=422, detail=f"Ungültige physische Adresse: {addr}"
+        ) from None
+    if not refresh:
+        cached = _cached_properties(addr)
+        if cached:
+            return {**cached, "cached": True}
+    _check_management_allowed("Device-Properties")
+    result = await _read_device_properties(addr)
+    _device_cache()[addr] = result
+    _save_device_cache()
+    return {**result, "cached": False}
+
+
+def _inventory_summary(job: dict) -> dict:
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "total": len(job["addresses"]),
+        "done": job["done"],
+        "cached": job["cached"],
+        "failed": len(job["failed"]),
+        "started": job["started"],
+        "finished": job["finished"],
+    }
+
+
+async def _run_inventory(job: dict, window: int, refresh: bool):
+    slots = asyncio.Semaphore(window)
+
+    async def _one(addr: str):
+        async with slots:
+            if job["cancel"]:
+                return
+            if not refresh and _cached_properties(addr):
+                job["cached"] += 1
+            else:
+                try:
+                    _device_cache()[addr] = await _read_device_properties(addr, OUTBOUND_BULK)
+                except HTTPException as exc:
+                    job["failed"][addr] = exc.detail
+            job["done"] += 1
+            if job["done"] % 5 == 0:
+                _save_device_cache()
+                await broadcast({"type": "inventory_progress", **_inventory_summary(job)})
+
+    try:
+        await asyncio.gather(*(_one(addr) for addr in job["addresses"]))
+    finally:
+        _save_device_cache()
+        job["status"] = "cancelled" if job["cancel"] else "done"
+        job["finished"] = datetime.now().isoformat(timespec="seconds")
+        await broadcast({"type": "inventory_complete", **_inventory_summary(job)})
+
+
+@app.post("/api/device/inventory")
+async def device_inventory(data: dict | None = None):
+    """Read properties of many devices concurrently into the device cache.
+
+    Body (optional): {"addresses": [...], "window": n, "refresh": bool}.
+    Without addresses, all devices of the loaded project are read.
+    """
+    _check_management_allowed("Inventur")
+    job = state["inventory_job"]
+    if job and job["status"] == "running":
+        raise HTTPException(status_code=409, detail="Inventur läuft bereits")
+    data = data or {}
+    addresses = data.get("addresses")
+    if addresses is None:
+        addresses = list((state["project_data"] or {}).get("devices", {}))
+    try:
+        addresses = sorted(
+            {str(IndividualAddress(a)) for a in addresses},
+            key=lambda a: IndividualAddress(a).raw,
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=422, detail="Ungültige physische Adresse in der Liste"
+        ) from None
+    if not addresses:
+        raise HTTPException(status_code=422, detail="Keine Geräte zum Lesen")
+    window = max(1, min(16, int(data.get("window", INVENTORY_WINDOW))))
+
+    job = {
+        "id": uuid.uuid4().hex[:8],
+        "status": "running",
+        "addresses": addresses,
+        "done": 0,
+        "cached": 0,
+        "failed": {},
+        "cancel": False,
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "finished": None,
+    }
+    state["inventory_job"] = job
+    asyncio.create_task(_run_inventory(job, window, bool(data.get("refresh"))))
+    return {"ok": True, "count": len(addresses), "job_id": job["id"]}
+
+
+@app.get("/api/device/inventory")
+def device_inventory_report():
+    """Inventory status plus every cached device (address → properties)."""
+    job = state["inventory_job"]
+    return {
+        "job": {**_inventory_summary(job), "failed_devices": job["failed"]} if job else None,
+        "devices": _device_cache(),
     }
 
 
+@app.post("/api/device/inventory/cancel")
+async def device_inventory_cancel():
+    if state["inventory_job"]:
+        state["inventory_job"]["cancel"] = True
+    return {"ok": True}
+
+
 # ── WireGuard API ─────────────────────────────────────────────────────────────
 
 
@@ -1819,6 +4121,10 @@ async def llm_compare(data: dict):
         raise HTTPException(
             status_code=400, detail="OpenRouter API-Key nicht konfiguriert"
         )
+    if data.get("b"):
+        # Stored projects: use the (cached) server-side diff instead of a client-built text
+        diff = await _project_diff(data.get("a") or state["project_slug"] or "", data["b"])
+        diff_text, name_a, name_b = diff["diff_text"], diff["name_a"], diff["name_b"]
     if not diff_text:
         raise HTTPException(status_code=400, detail="Kein Diff-Text übergeben")
     messages = [
@@ -1871,152 +4177,508 @@ def _parse_ets_certificate(raw: str) -> dict:
     return fields
 
 
-def _extract_security_data(tmp_path: str, password: str, project: dict) -> dict:
-    """Parse KNX Security data (device keys/passwords, GA keys, ETS cert) from raw project XML."""
-    import re
+def _append_secure_device(result: dict, dev: dict, area_addr: str, line_addr: str, devices: dict):
+    """Add a DeviceInstance collected by _extract_security_data if it carries security data."""
+    sec = dev["security"]
+    if sec is None:
+        return
+    attrs, ip_cfg, bus_ifaces = dev["attrs"], dev["ip"], dev["bus_ifaces"]
+    ia = f"{area_addr}.{line_addr}.{attrs.get('Address', '0')}"
+    tool_key = sec.get("ToolKey")
+    device_auth_code = sec.get("DeviceAuthenticationCode")
+    device_mgmt_password = sec.get("DeviceManagementPassword")
+    sequence_number = sec.get("SequenceNumber")
+    # Skip devices with only a default SequenceNumber="0" and no actual keys/passwords
+    # (ETS writes <Security SequenceNumber="0"/> to all devices even in non-secure projects)
+    has_keys = tool_key or device_auth_code or device_mgmt_password or bus_ifaces
+    has_nonzero_seq = sequence_number not in (None, "0")
+    if not has_keys and not has_nonzero_seq:
+        return
+    result["devices"].append(
+        {
+            "address": ia,
+            "name": devices.get(ia, {}).get("name") or attrs.get("Name") or "",
+            "ip_address": ip_cfg.get("IPAddress") if ip_cfg is not None else None,
+            "mac_address": ip_cfg.get("MACAddress") if ip_cfg is not None else None,
+            "tool_key": tool_key,
+            "device_auth_code": device_auth_code,
+            "device_mgmt_password": device_mgmt_password,
+            "sequence_number": sequence_number,
+            "bus_interfaces": bus_ifaces or None,
+        }
+    )
+
+
+def _extract_security_data(content, project: dict) -> dict:
+    """Parse KNX Security data (device keys/passwords, GA keys, ETS cert) from raw project XML.
+
+    ``content`` is the opened archive of the project; certificates are read
+    from its root zip. 0.xml is read in a single streaming iterparse pass: only
+    the attributes of the few relevant elements are kept and every element is
+    dropped as soon as it has been closed, so memory stays flat even for very
+    large projects.
+    """
     import xml.etree.ElementTree as ET
-    import zipfile
 
     result: dict = {"devices": [], "ga_keys": {}, "ets_certificates": []}
     try:
-        with knxproj_extract(tmp_path, password or None) as content:
-            f = content.open_project_0()
-            xml_str = f.read().decode("utf-8")
-
-        ns_match = re.search(r'xmlns="([^"]+)"', xml_str)
-        ns = ns_match.group(1) if ns_match else "http://knx.org/xml/project/21"
-        root = ET.fromstring(xml_str)
-
-        # Build raw_address → formatted address map from parsed project
+        # raw_address → formatted address map from parsed project
         raw_to_addr: dict[int, str] = {
             ga["raw_address"]: ga["address"]
             for ga in project.get("group_addresses", {}).values()
         }
-
-        # ── Device security — walk topology to reconstruct individual addresses ──
-        for area in root.iter(f"{{{ns}}}Area"):
-            area_addr = area.get("Address", "0")
-            for line in area.iter(f"{{{ns}}}Line"):
-                line_addr = line.get("Address", "0")
-                for dev in line.iter(f"{{{ns}}}DeviceInstance"):
-                    sec = dev.find(f"{{{ns}}}Security")
-                    if sec is None:
-                        continue
-                    dev_addr = dev.get("Address", "0")
-                    ia = f"{area_addr}.{line_addr}.{dev_addr}"
-                    dev_info = project.get("devices", {}).get(ia, {})
-                    ip_cfg = dev.find(f"{{{ns}}}IPConfig")
-                    bus_ifaces = []
-                    for bi in dev.iter(f"{{{ns}}}BusInterface"):
-                        pwd = bi.get("Password")
-                        if pwd:
-                            bus_ifaces.append(
-                                {"ref_id": bi.get("RefId", ""), "password": pwd}
-                            )
-                    tool_key = sec.get("ToolKey")
-                    device_auth_code = sec.get("DeviceAuthenticationCode")
-                    device_mgmt_password = sec.get("DeviceManagementPassword")
-                    sequence_number = sec.get("SequenceNumber")
-                    # Skip devices with only a default SequenceNumber="0" and no actual keys/passwords
-                    # (ETS writes <Security SequenceNumber="0"/> to all devices even in non-secure projects)
-                    has_keys = (
-                        tool_key
-                        or device_auth_code
-                        or device_mgmt_password
-                        or bus_ifaces
-                    )
-                    has_nonzero_seq = sequence_number not in (None, "0")
-                    if not has_keys and not has_nonzero_seq:
-                        continue
-                    result["devices"].append(
-                        {
-                            "address": ia,
-                            "name": dev_info.get("name") or dev.get("Name") or "",
-                            "ip_address": ip_cfg.get("IPAddress")
-                            if ip_cfg is not None
-                            else None,
-                            "mac_address": ip_cfg.get("MACAddress")
-                            if ip_cfg is not None
-                            else None,
-                            "tool_key": tool_key,
-                            "device_auth_code": device_auth_code,
-                            "device_mgmt_password": device_mgmt_password,
-                            "sequence_number": sequence_number,
-                            "bus_interfaces": bus_ifaces or None,
-                        }
-                    )
-
-        # ── GA keys ──────────────────────────────────────────────────────────
-        for ga_el in root.iter(f"{{{ns}}}GroupAddress"):
-            key = ga_el.get("Key")
-            if not key:
-                continue
-            raw = ga_el.get("Address")
-            try:
-                raw_int = int(raw) if raw is not None else None
-            except ValueError:
-                raw_int = None
-            formatted = raw_to_addr.get(raw_int, raw or "")
-            result["ga_keys"][formatted] = key
+        devices = project.get("devices", {})
+        area_addr = "0"
+        line_addr = None  # None outside a topology Line (e.g. unassigned devices)
+        dev = None  # DeviceInstance currently open
+        stack: list = []  # open elements
+
+        with content.open_project_0() as f:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                tag = elem.tag.rpartition("}")[2]
+                if event == "end":
+                    stack.pop()
+                    if tag == "DeviceInstance" and dev is not None:
+                        _append_secure_device(result, dev, area_addr, line_addr, devices)
+                        dev = None
+                    elif tag == "Line":
+                        line_addr = None
+                    elem.clear()
+                    if stack and len(stack[-1]) and stack[-1][-1] is elem:
+                        del stack[-1][-1]
+                    continue
+                parent = stack[-1].tag.rpartition("}")[2] if stack else ""
+                stack.append(elem)
+                attrs = elem.attrib
+                if tag == "Area":
+                    area_addr = attrs.get("Address", "0")
+                elif tag == "Line":
+                    line_addr = attrs.get("Address", "0")
+                elif tag == "DeviceInstance" and line_addr is not None:
+                    dev = {"attrs": dict(attrs), "security": None, "ip": None, "bus_ifaces": []}
+                elif dev is not None and tag == "Security" and parent == "DeviceInstance":
+                    dev["security"] = dict(attrs)
+                elif dev is not None and tag == "IPConfig" and parent == "DeviceInstance":
+                    dev["ip"] = dict(attrs)
+                elif dev is not None and tag == "BusInterface":
+                    if attrs.get("Password"):
+                        dev["bus_ifaces"].append(
+                            {"ref_id": attrs.get("RefId", ""), "password": attrs["Password"]}
+                        )
+                elif tag == "GroupAddress" and attrs.get("Key"):
+                    raw = attrs.get("Address")
+                    try:
+                        raw_int = int(raw) if raw is not None else None
+                    except ValueError:
+                        raw_int = None
+                    formatted = raw_to_addr.get(raw_int, raw or "")
+                    result["ga_keys"][formatted] = attrs["Key"]
 
         # ── ETS certificates ─────────────────────────────────────────────────
-        with zipfile.ZipFile(tmp_path) as zf:
-            for name in zf.namelist():
-                if name.endswith(".certificate"):
-                    raw = zf.read(name).decode("utf-8", errors="replace")
-                    cert = _parse_ets_certificate(raw)
-                    if cert:
-                        result["ets_certificates"].append(cert)
+        for name in content.root.namelist():
+            if name.endswith(".certificate"):
+                raw = content.root.read(name).decode("utf-8", errors="replace")
+                cert = _parse_ets_certificate(raw)
+                if cert:
+                    result["ets_certificates"].append(cert)
 
     except Exception as exc:
         logging.getLogger("knx_bus").warning("Security data extraction failed: %s", exc)
     return result
 
 
+# ── Project parsing ───────────────────────────────────────────────────────────
+#
+# Parsing runs in worker processes (a 40 MB project would otherwise block the
+# event loop for many seconds). Every upload becomes a parse job: the worker
+# reports its stage through a queue shared with the pool, the server forwards
+# it to /ws as "parse_progress", and the job can be cancelled at any time.
+
+PARSE_PROGRESS_POLL = 0.1  # seconds between checks of the worker progress queue
+PARSE_JOBS_KEEP = 3  # finished jobs (with their result) kept for /api/parse/jobs
+
+_parse_progress = None  # progress queue; only set inside worker processes
+
+
+def _init_parse_worker(progress):
+    global _parse_progress
+    _parse_progress = progress
+
+
+def _report_parse_stage(job_id: str | None, stage: str):
+    if _parse_progress is not None and job_id:
+        _parse_progress.put((job_id, stage))
+
+
+def _parse_project_file(
+    tmp_path: str, password: str, language: str, job_id: str | None = None
+) -> dict:
+    """Parse a .knxproj; runs in a worker process.
+
+    Security data is not part of the result, see _security_from_file.
+    """
+    _report_parse_stage(job_id, "decrypting" if password else "extracting")
+    with knxproj_extract(tmp_path, password or None) as content:
+        _report_parse_stage(job_id, "parsing")
+        return combine_project(XMLParser(content).parse(language or None))
+
+
+def _security_from_file(path: str, password: str, refs: dict) -> dict:
+    """Extract the security data of a stored .knxproj; runs in a worker process.
+
+    ``refs`` holds the parts of the parsed project _extract_security_data
+    needs (group address raw → formatted address, device names).
+    """
+    with knxproj_extract(path, password or None) as content:
+        return _extract_security_data(content, refs)
+
+
+async def _acquire_parse_worker() -> dict:
+    """An idle worker process, or a new one; each running parse has its own."""
+    for worker in state["parse_pool"]:
+        if not worker["busy"]:
+            worker["busy"] = True
+            return worker
+    # spawn: forking a process that runs an event loop and xknx threads is unsafe
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    pool = ProcessPoolExecutor(
+        max_workers=1, mp_context=ctx, initializer=_init_parse_worker, initargs=(queue,)
+    )
+    try:
+        pid = await asyncio.wrap_future(pool.submit(os.getpid))
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    worker = {"pool": pool, "pid": pid, "queue": queue, "busy": True}
+    state["parse_pool"].append(worker)
+    return worker
+
+
+def _kill_parse_worker(worker: dict):
+    """Kill one worker process; a running parse cannot be interrupted otherwise."""
+    if worker in state["parse_pool"]:
+        state["parse_pool"].remove(worker)
+    try:
+        os.kill(worker["pid"], signal.SIGTERM)
+    except OSError:
+        pass  # already gone
+    worker["pool"].shutdown(wait=False, cancel_futures=True)
+
+
+def _stop_parse_pool():
+    """Kill all worker processes, e.g. on shutdown."""
+    for worker in list(state["parse_pool"]):
+        _kill_parse_worker(worker)
+
+
+async def _forward_parse_progress(queue):
+    """Apply stage reports from a worker to their jobs and announce them."""
+    while True:
+        try:
+            job_id, stage = queue.get_nowait()
+        except (Empty, OSError, ValueError):
+            break
+        job = state["parse_jobs"].get(job_id)
+        if job and job["status"] == "running":
+            await _set_parse_stage(job, stage)
+
+
+async def _parse_in_pool(
+    tmp_path: str, password: str, language: str, job: dict | None = None
+) -> dict:
+    """Run _parse_project_file in the process pool, at most parse_workers at a time."""
+    return await _run_in_parse_pool(
+        _parse_project_file, tmp_path, password, language, job and job["id"], job=job
+    )
+
+
+async def _run_in_parse_pool(fn, *args, job: dict | None = None):
+    """Run fn(*args) in a parse worker process, sharing the slots and timeout.
+
+    Timeouts and cancellation kill only the worker of this call; parses
+    running in the other workers are not affected.
+    """
+    if state["parse_slots"] is None:
+        state["parse_slots"] = asyncio.Semaphore(state["parse_workers"])
+    loop = asyncio.get_running_loop()
+    async with state["parse_slots"]:
+        if job:
+            job["status"] = "running"
+            job["started"] = datetime.now().isoformat(timespec="seconds")
+        worker = await _acquire_parse_worker()
+        cfut = None
+        try:
+            cfut = worker["pool"].submit(fn, *args)
+            fut = asyncio.wrap_future(cfut)
+            deadline = loop.time() + state["parse_timeout"]
+            while not fut.done():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait({fut}, timeout=min(PARSE_PROGRESS_POLL, remaining))
+                await _forward_parse_progress(worker["queue"])
+            return fut.result()
+        except asyncio.TimeoutError:
+            _kill_parse_worker(worker)
+            raise HTTPException(
+                status_code=504,
+                detail=f"Parsen abgebrochen (länger als {state['parse_timeout']:g} s)",
+            ) from None
+        except asyncio.CancelledError:
+            if cfut is None or not cfut.cancel():  # already running in the worker
+                _kill_parse_worker(worker)
+            raise
+        except BrokenProcessPool:
+            _kill_parse_worker(worker)
+            raise HTTPException(
+                status_code=500, detail="Parser-Prozess abgestürzt, bitte erneut versuchen"
+            ) from None
+        finally:
+            worker["busy"] = False
+
+
+def _parse_cache_secret() -> bytes:
+    """Per-install key of the parse cache names, created on first use.
+
+    Entries named by an earlier, unkeyed scheme are removed with it: a plain
+    hash over file hash and password would let anyone holding the archive and
+    the cache test passwords offline.
+    """
+    try:
+        return PARSE_CACHE_SECRET_PATH.read_bytes()
+    except FileNotFoundError:
+        pass
+    secret = secrets.token_bytes(32)
+    fd = os.open(PARSE_CACHE_SECRET_PATH, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    for entry in PARSE_CACHE_DIR.glob("*.json"):
+        entry.unlink(missing_ok=True)
+    return secret
+
+
+def _parse_cache_key(sha256: str, password: str, language: str) -> str:
+    """Cache key of an upload; the password only enters through a keyed hash."""
+    material = "\0".join(
+        (str(PARSE_CACHE_FORMAT), xknxproject_version, sha256, language, password)
+    )
+    return hmac.new(_parse_cache_secret(), material.encode(), hashlib.sha256).hexdigest()
+
+
+def _parse_cache_get(key: str) -> dict | None:
+    path = PARSE_CACHE_DIR / f"{key}.json"
+    try:
+        project = json.loads(path.read_text())
+        os.utime(path)  # mark as recently used
+    except (OSError, ValueError):
+        return None
+    return project
+
+
+def _parse_cache_put(key: str, project: dict):
+    limit = state["parse_cache_max_mb"] * 1024 * 1024
+    if limit <= 0:
+        return
+    PARSE_CACHE_DIR.mkdir(exist_ok=True)
+    path = PARSE_CACHE_DIR / f"{key}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(project))
+    tmp.replace(path)
+    entries = []
+    for entry in PARSE_CACHE_DIR.glob("*.json"):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, entry))
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= limit:
+            break
+        entry.unlink(missing_ok=True)
+        total -= size
+
+
+def _parse_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, HTTPException):
+        return exc
+    if isinstance(exc, InvalidPasswordException):
+        return HTTPException(status_code=422, detail=f"Invalid password: {exc}")
+    if isinstance(exc, XknxProjectException):
+        return HTTPException(status_code=500, detail=str(exc))
+    return HTTPException(status_code=500, detail=f"Parsing failed: {exc}")
+
+
+def _activate_project(project: dict, filename: str, source_path: str):
+    """Make a freshly parsed project the current one and persist it."""
+    state["project_data"] = project
+    state["ga_dpt_map"] = {
+        gad["address"]: gad.get("dpt")
+        for gad in project.get("group_addresses", {}).values()
+        if gad.get("address")
+    }
+    # Register DPT map with the live xknx instance so future telegrams are decoded
+    if state["xknx"]:
+        state["xknx"].group_address_dpt.set(state["ga_dpt_map"])
+
+    state["project_slug"] = _project_slug(filename)
+    state["project_responses"].pop(("current",), None)
+
+    # Persist parsed project and filename for next startup
+    LAST_PROJECT_PATH.write_text(json.dumps(project))
+    cfg = load_config()
+    cfg["last_project_filename"] = filename
+    save_config(cfg)
+    _add_to_recent_projects(filename, project, source_path=source_path)
+
+
+def _parse_job_summary(job: dict) -> dict:
+    return {
+        key: job[key]
+        for key in (
+            "id", "filename", "status", "stage", "error", "cached",
+            "created", "started", "finished",
+        )
+    }
+
+
+async def _set_parse_stage(job: dict, stage: str):
+    job["stage"] = stage
+    await broadcast({"type": "parse_progress", **_parse_job_summary(job)})
+
+
+def _prune_parse_jobs():
+    finished = [j for j in state["parse_jobs"].values() if j["finished"]]
+    for job in finished[:-PARSE_JOBS_KEEP]:
+        del state["parse_jobs"][job["id"]]
+
+
+async def _run_parse_job(job: dict):
+    try:
+        key = _parse_cache_key(job["sha256"], job["password"], job["language"])
+        project = await asyncio.to_thread(_parse_cache_get, key)
+        if project is not None:
+            job["cached"] = True
+        else:
+            project = await _parse_in_pool(
+                job["path"], job["password"], job["language"], job
+            )
+            await asyncio.to_thread(_parse_cache_put, key, project)
+        await _set_parse_stage(job, "persisting")
+        _activate_project(project, job["filename"], job["path"])
+        job["result"] = project
+        job["status"] = "done"
+    except asyncio.CancelledError:
+        job["status"] = "cancelled"
+    except Exception as exc:
+        err = _parse_error(exc)
+        job.update(status="error", error=err.detail, status_code=err.status_code)
+    finally:
+        job["password"] = None
+        os.unlink(job["path"])
+        job["finished"] = datetime.now().isoformat(timespec="seconds")
+        _prune_parse_jobs()
+        await broadcast({"type": "parse_complete", **_parse_job_summary(job)})
+
+
+async def _save_upload(file: UploadFile) -> tuple[str, str]:
+    """Copy an upload chunk by chunk into a temp file; returns (path, sha256 hex)."""
+    suffix = Path(file.filename or "project.knxproj").suffix or ".knxproj"
+    limit = state["max_upload_mb"] * 1024 * 1024
+    sha256 = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK):
+                size += len(chunk)
+                if size > limit:
+                    raise _upload_too_large()
+                sha256.update(chunk)
+                tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    return tmp.name, sha256.hexdigest()
+
+
+async def _start_parse_job(file: UploadFile, password: str, language: str) -> dict:
+    tmp_path, sha256 = await _save_upload(file)
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "filename": file.filename or "project.knxproj",
+        "status": "queued",
+        "stage": "queued",
+        "error": None,
+        "status_code": None,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "started": None,
+        "finished": None,
+        "path": tmp_path,
+        "sha256": sha256,
+        "cached": False,
+        "password": password,
+        "language": language,
+        "result": None,
+    }
+    state["parse_jobs"][job["id"]] = job
+    job["task"] = asyncio.create_task(_run_parse_job(job))
+    return job
+
+
 @app.post("/api/parse")
 async def parse_project(
     file: UploadFile = File(...),
     password: str = Form(default=""),
     language: str = Form(default=""),
 ):
-    suffix = Path(file.filename or "project.knxproj").suffix or ".knxproj"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(await file.read())
-        tmp_path = tmp.name
+    job = await _start_parse_job(file, password, language)
+    # A dropped client connection must not abort the parse half-way
+    await asyncio.shield(job["task"])
+    if job["status"] == "cancelled":
+        raise HTTPException(status_code=409, detail="Parsen abgebrochen")
+    if job["status"] != "done":
+        raise HTTPException(status_code=job["status_code"], detail=job["error"])
+    return JSONResponse(content=job["result"])
+
+
+@app.post("/api/parse/jobs")
+async def parse_job_start(
+    file: UploadFile = File(...),
+    password: str = Form(default=""),
+    language: str = Form(default=""),
+):
+    """Start parsing in the background; progress via /ws or GET /api/parse/jobs/{id}."""
+    job = await _start_parse_job(file, password, language)
+    return _parse_job_summary(job)
 
-    try:
-        kwargs: dict = {"path": tmp_path}
-        if password:
-            kwargs["password"] = password
-        if language:
-            kwargs["language"] = language
 
-        project = XKNXProj(**kwargs).parse()
-        project["_security"] = _extract_security_data(tmp_path, password, project)
+def _get_parse_job(job_id: str) -> dict:
+    job = state["parse_jobs"].get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Parse-Auftrag nicht gefunden")
+    return job
 
-        state["project_data"] = project
-        state["ga_dpt_map"] = {
-            gad["address"]: gad.get("dpt")
-            for gad in project.get("group_addresses", {}).values()
-            if gad.get("address")
-        }
-        # Register DPT map with the live xknx instance so future telegrams are decoded
-        if state["xknx"]:
-            state["xknx"].group_address_dpt.set(state["ga_dpt_map"])
 
-        # Persist parsed project and filename for next startup
-        LAST_PROJECT_PATH.write_text(json.dumps(project))
-        cfg = load_config()
-        cfg["last_project_filename"] = file.filename or "project.knxproj"
-        save_config(cfg)
-        _add_to_recent_projects(file.filename or "project.knxproj", project, source_path=tmp_path)
+@app.get("/api/parse/jobs/{job_id}")
+def parse_job_status(job_id: str):
+    return _parse_job_summary(_get_parse_job(job_id))
 
-        return JSONResponse(content=project)
-    except InvalidPasswordException as exc:
-        raise HTTPException(status_code=422, detail=f"Invalid password: {exc}") from exc
-    except XknxProjectException as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Parsing failed: {exc}") from exc
-    finally:
-        os.unlink(tmp_path)
+
+@app.get("/api/parse/jobs/{job_id}/result")
+def parse_job_result(job_id: str):
+    job = _get_parse_job(job_id)
+    if job["status"] == "error":
+        raise HTTPException(status_code=job["status_code"], detail=job["error"])
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail="Parse-Auftrag nicht abgeschlossen")
+    return JSONResponse(content=job["result"])
+
+
+@app.post("/api/parse/jobs/{job_id}/cancel")
+async def parse_job_cancel(job_id: str):
+    job = _get_parse_job(job_id)
+    if job["finished"] is None:
+        job["task"].cancel()
+    return {"ok": True}
@@ -5,10 +5,16 @@ Safe to expose to the internet.
 Run with:
   .venv/bin/uvicorn server_public:app --host 0.0.0.0 --port 8004
 """
+import asyncio
 import logging
+import multiprocessing
 import os
+import signal
 import tempfile
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from datetime import datetime
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
@@ -20,8 +26,11 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from xknxproject import XKNXProj
+from xknxproject.combination import combine_project
 from xknxproject.exceptions import InvalidPasswordException, XknxProjectException
+from xknxproject.models import GroupAddressStyle
+from xknxproject.models.models import XMLGroupAddress
+from xknxproject.xml import XMLParser
 from xknxproject.zip.extractor import extract as knxproj_extract
 
 INDEX_HTML = Path(__file__).parent / "index.html"
@@ -29,23 +38,41 @@ DEMO_PATH = Path(__file__).parent / "demo.knxproj"
 ACCESS_LOG = Path(__file__).parent / "logs" / "access_public.log"
 
 MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # 50 MB
+UPLOAD_FORM_SLACK = 64 * 1024  # Multipart-Header und Formularfelder zusätzlich zur Datei
+UPLOAD_CHUNK = 1024 * 1024  # Bytes pro Schritt beim Speichern eines Uploads
+PARSE_WORKERS = 2  # gleichzeitige Parser-Prozesse
+PARSE_TIMEOUT = 120.0  # Sekunden, danach wird das Parsen abgebrochen
 
 # IPs, die nicht ins Access-Log geschrieben werden (z.B. Monitoring)
 ACCESS_LOG_SKIP_IPS = {"172.18.0.1"}
 
 # ── Access-Logger ─────────────────────────────────────────────────────────────
-ACCESS_LOG.parent.mkdir(exist_ok=True)
-_access_handler = TimedRotatingFileHandler(
-    ACCESS_LOG, when="midnight", backupCount=30, encoding="utf-8"
-)
-_access_handler.setFormatter(logging.Formatter("%(message)s"))
 access_log = logging.getLogger("access_public")
 access_log.setLevel(logging.INFO)
-access_log.addHandler(_access_handler)
 access_log.propagate = False
 
+
+def _setup_access_log():
+    # Nur im Serverprozess: die Parser-Worker importieren dieses Modul ebenfalls
+    # und würden die Datei sonst selbst rotieren
+    if access_log.handlers:
+        return
+    ACCESS_LOG.parent.mkdir(exist_ok=True)
+    handler = TimedRotatingFileHandler(ACCESS_LOG, when="midnight", backupCount=30, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    access_log.addHandler(handler)
+
 limiter = Limiter(key_func=get_remote_address, default_limits=[])
-app = FastAPI(title="Open-KNXViewer (Public)", docs_url=None, redoc_url=None)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _setup_access_log()
+    yield
+    _stop_parse_pool()
+
+
+app = FastAPI(title="Open-KNXViewer (Public)", docs_url=None, redoc_url=None, lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -83,6 +110,42 @@ class AccessLogMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class UploadLimitMiddleware:
+    """Lehnt zu große Uploads ab, während der Request-Body noch ankommt."""
+
+    def __init__(self, app, paths: set[str]):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        limit = MAX_UPLOAD_BYTES + UPLOAD_FORM_SLACK
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            err = _upload_too_large()
+            await JSONResponse({"detail": err.detail}, status_code=err.status_code)(scope, receive, send)
+            return
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise _upload_too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail="Datei zu groß (max. 50 MB).")
+
+
+app.add_middleware(UploadLimitMiddleware, paths={"/api/parse", "/api/parse/security"})
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(AccessLogMiddleware)
 
@@ -97,89 +160,184 @@ def _parse_ets_certificate(raw: str) -> dict:
     return fields
 
 
-def _extract_security_data(tmp_path: str, password: str, project: dict) -> dict:
-    import re
+def _append_secure_device(result: dict, dev: dict, area_addr: str, line_addr: str, devices: dict):
+    sec = dev["security"]
+    if sec is None:
+        return
+    attrs, ip_cfg, bus_ifaces = dev["attrs"], dev["ip"], dev["bus_ifaces"]
+    ia = f"{area_addr}.{line_addr}.{attrs.get('Address', '0')}"
+    tool_key = sec.get("ToolKey")
+    device_auth_code = sec.get("DeviceAuthenticationCode")
+    device_mgmt_password = sec.get("DeviceManagementPassword")
+    sequence_number = sec.get("SequenceNumber")
+    # Skip devices with only a default SequenceNumber="0" and no actual keys/passwords
+    # (ETS writes <Security SequenceNumber="0"/> to all devices even in non-secure projects)
+    has_keys = tool_key or device_auth_code or device_mgmt_password or bus_ifaces
+    has_nonzero_seq = sequence_number not in (None, "0")
+    if not has_keys and not has_nonzero_seq:
+        return
+    result["devices"].append({
+        "address": ia,
+        "name": devices.get(ia, {}).get("name") or attrs.get("Name") or "",
+        "ip_address": ip_cfg.get("IPAddress") if ip_cfg is not None else None,
+        "mac_address": ip_cfg.get("MACAddress") if ip_cfg is not None else None,
+        "tool_key": tool_key,
+        "device_auth_code": device_auth_code,
+        "device_mgmt_password": device_mgmt_password,
+        "sequence_number": sequence_number,
+        "bus_interfaces": bus_ifaces or None,
+    })
+
+
+def _extract_security_data(content, project: dict, ga_style: GroupAddressStyle | None = None) -> dict:
+    # Single streaming iterparse pass over 0.xml; elements are dropped once closed.
+    # Ohne geparstes Projekt (project == {}) werden GA-Adressen über ga_style formatiert.
     import xml.etree.ElementTree as ET
-    import zipfile
     result: dict = {"devices": [], "ga_keys": {}, "ets_certificates": []}
     try:
-        with knxproj_extract(tmp_path, password or None) as content:
-            f = content.open_project_0()
-            xml_str = f.read().decode("utf-8")
-
-        ns_match = re.search(r'xmlns="([^"]+)"', xml_str)
-        ns = ns_match.group(1) if ns_match else "http://knx.org/xml/project/21"
-        root = ET.fromstring(xml_str)
-
         raw_to_addr: dict[int, str] = {
             ga["raw_address"]: ga["address"]
             for ga in project.get("group_addresses", {}).values()
         }
-
-        for area in root.iter(f"{{{ns}}}Area"):
-            area_addr = area.get("Address", "0")
-            for line in area.iter(f"{{{ns}}}Line"):
-                line_addr = line.get("Address", "0")
-                for dev in line.iter(f"{{{ns}}}DeviceInstance"):
-                    sec = dev.find(f"{{{ns}}}Security")
-                    if sec is None:
-                        continue
-                    dev_addr = dev.get("Address", "0")
-                    ia = f"{area_addr}.{line_addr}.{dev_addr}"
-                    dev_info = project.get("devices", {}).get(ia, {})
-                    ip_cfg = dev.find(f"{{{ns}}}IPConfig")
-                    bus_ifaces = []
-                    for bi in dev.iter(f"{{{ns}}}BusInterface"):
-                        pwd = bi.get("Password")
-                        if pwd:
-                            bus_ifaces.append({"ref_id": bi.get("RefId", ""), "password": pwd})
-                    tool_key = sec.get("ToolKey")
-                    device_auth_code = sec.get("DeviceAuthenticationCode")
-                    device_mgmt_password = sec.get("DeviceManagementPassword")
-                    sequence_number = sec.get("SequenceNumber")
-                    # Skip devices with only a default SequenceNumber="0" and no actual keys/passwords
-                    # (ETS writes <Security SequenceNumber="0"/> to all devices even in non-secure projects)
-                    has_keys = tool_key or device_auth_code or device_mgmt_password or bus_ifaces
-                    has_nonzero_seq = sequence_number not in (None, "0")
-                    if not has_keys and not has_nonzero_seq:
-                        continue
-                    result["devices"].append({
-                        "address": ia,
-                        "name": dev_info.get("name") or dev.get("Name") or "",
-                        "ip_address": ip_cfg.get("IPAddress") if ip_cfg is not None else None,
-                        "mac_address": ip_cfg.get("MACAddress") if ip_cfg is not None else None,
-                        "tool_key": tool_key,
-                        "device_auth_code": device_auth_code,
-                        "device_mgmt_password": device_mgmt_password,
-                        "sequence_number": sequence_number,
-                        "bus_interfaces": bus_ifaces or None,
-                    })
-
-        for ga_el in root.iter(f"{{{ns}}}GroupAddress"):
-            key = ga_el.get("Key")
-            if not key:
-                continue
-            raw = ga_el.get("Address")
-            try:
-                raw_int = int(raw) if raw is not None else None
-            except ValueError:
-                raw_int = None
-            formatted = raw_to_addr.get(raw_int, raw or "")
-            result["ga_keys"][formatted] = key
-
-        with zipfile.ZipFile(tmp_path) as zf:
-            for name in zf.namelist():
-                if name.endswith(".certificate"):
-                    raw = zf.read(name).decode("utf-8", errors="replace")
-                    cert = _parse_ets_certificate(raw)
-                    if cert:
-                        result["ets_certificates"].append(cert)
+        devices = project.get("devices", {})
+        area_addr, line_addr, dev, stack = "0", None, None, []
+
+        with content.open_project_0() as f:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                tag = elem.tag.rpartition("}")[2]
+                if event == "end":
+                    stack.pop()
+                    if tag == "DeviceInstance" and dev is not None:
+                        _append_secure_device(result, dev, area_addr, line_addr, devices)
+                        dev = None
+                    elif tag == "Line":
+                        line_addr = None
+                    elem.clear()
+                    if stack and len(stack[-1]) and stack[-1][-1] is elem:
+                        del stack[-1][-1]
+                    continue
+                parent = stack[-1].tag.rpartition("}")[2] if stack else ""
+                stack.append(elem)
+                attrs = elem.attrib
+                if tag == "Area":
+                    area_addr = attrs.get("Address", "0")
+                elif tag == "Line":
+                    line_addr = attrs.get("Address", "0")
+                elif tag == "DeviceInstance" and line_addr is not None:
+                    dev = {"attrs": dict(attrs), "security": None, "ip": None, "bus_ifaces": []}
+                elif dev is not None and tag == "Security" and parent == "DeviceInstance":
+                    dev["security"] = dict(attrs)
+                elif dev is not None and tag == "IPConfig" and parent == "DeviceInstance":
+                    dev["ip"] = dict(attrs)
+                elif dev is not None and tag == "BusInterface":
+                    if attrs.get("Password"):
+                        dev["bus_ifaces"].append({"ref_id": attrs.get("RefId", ""), "password": attrs["Password"]})
+                elif tag == "GroupAddress" and attrs.get("Key"):
+                    raw = attrs.get("Address")
+                    try:
+                        raw_int = int(raw) if raw is not None else None
+                    except ValueError:
+                        raw_int = None
+                    addr = raw_to_addr.get(raw_int)
+                    if addr is None and ga_style is not None and raw_int is not None:
+                        addr = XMLGroupAddress.str_address(raw_int, ga_style)
+                    result["ga_keys"][addr or raw or ""] = attrs["Key"]
+
+        for name in content.root.namelist():
+            if name.endswith(".certificate"):
+                raw = content.root.read(name).decode("utf-8", errors="replace")
+                cert = _parse_ets_certificate(raw)
+                if cert:
+                    result["ets_certificates"].append(cert)
 
     except Exception:
         pass
     return result
 
 
+# ── Parsen in Worker-Prozessen ────────────────────────────────────────────────
+# Ein großes Projekt blockiert sonst für Sekunden die Event-Loop (und damit
+# alle anderen Anfragen).
+
+_parse_pool: list[dict] = []  # Worker: Einzelprozess-Executor, PID, belegt
+_parse_slots = asyncio.Semaphore(PARSE_WORKERS)
+
+
+def _parse_project_file(tmp_path: str, password: str, language: str) -> dict:
+    """Parse a .knxproj; runs in a worker process. Security data is extracted on demand."""
+    with knxproj_extract(tmp_path, password or None) as content:
+        return combine_project(XMLParser(content).parse(language or None))
+
+
+def _security_from_file(tmp_path: str, password: str) -> dict:
+    """Nur die Sicherheitsdaten, ohne das Projekt zu parsen; läuft im Worker-Prozess."""
+    import xml.etree.ElementTree as ET
+    with knxproj_extract(tmp_path, password or None) as content:
+        with content.open_project_meta() as f:
+            info = ET.parse(f).find("{*}Project/{*}ProjectInformation")
+        style = GroupAddressStyle((info.get("GroupAddressStyle") if info is not None else None) or "ThreeLevel")
+        return _extract_security_data(content, {}, style)
+
+
+async def _acquire_worker() -> dict:
+    # Jeder laufende Parse hat seinen eigenen Prozess, freie werden wiederverwendet
+    for worker in _parse_pool:
+        if not worker["busy"]:
+            worker["busy"] = True
+            return worker
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        pid = await asyncio.wrap_future(pool.submit(os.getpid))
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    worker = {"pool": pool, "pid": pid, "busy": True}
+    _parse_pool.append(worker)
+    return worker
+
+
+def _kill_worker(worker: dict):
+    if worker in _parse_pool:
+        _parse_pool.remove(worker)
+    try:
+        os.kill(worker["pid"], signal.SIGTERM)
+    except OSError:
+        pass
+    worker["pool"].shutdown(wait=False, cancel_futures=True)
+
+
+def _stop_parse_pool():
+    for worker in list(_parse_pool):
+        _kill_worker(worker)
+
+
+async def _parse_in_pool(*args) -> dict:
+    return await _run_in_pool(_parse_project_file, *args)
+
+
+async def _run_in_pool(fn, *args):
+    async with _parse_slots:
+        worker = await _acquire_worker()
+        try:
+            fut = asyncio.wrap_future(worker["pool"].submit(fn, *args))
+            return await asyncio.wait_for(fut, timeout=PARSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            _kill_worker(worker)  # nur dieser Parse, andere laufen weiter
+            raise HTTPException(
+                status_code=504, detail=f"Parsen abgebrochen (länger als {PARSE_TIMEOUT:g} s)"
+            ) from None
+        except BrokenProcessPool:
+            _kill_worker(worker)
+            raise HTTPException(
+                status_code=500, detail="Parser-Prozess abgestürzt, bitte erneut versuchen"
+            ) from None
+        except asyncio.CancelledError:
+            _kill_worker(worker)
+            raise
+        finally:
+            worker["busy"] = False
+
+
 @app.get("/.well-known/appspecific/com.chrome.devtools.json", include_in_schema=False)
 async def chrome_devtools():
     return {}
@@ -207,44 +365,43 @@ async def get_demo():
         raise HTTPException(status_code=404, detail="Demo nicht verfügbar")
     if _demo_cache is None:
         try:
-            _demo_cache = XKNXProj(path=str(DEMO_PATH)).parse()
+            _demo_cache = await _parse_in_pool(str(DEMO_PATH), "", "")
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"Demo konnte nicht geladen werden: {exc}") from exc
     return JSONResponse(content=_demo_cache)
 
 
-@app.post("/api/parse")
-@limiter.limit("5/minute")
-async def parse_project(
-    request: Request,
-    file: UploadFile = File(...),
-    password: str = Form(default=""),
-    language: str = Form(default="de-DE"),
-):
+async def _save_upload(file: UploadFile) -> str:
+    """Schreibt den Upload blockweise in eine Temp-Datei und bricht beim Größenlimit ab."""
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".knxproj", mode="wb") as tmp:
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise _upload_too_large()
+                tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    return tmp.name
+
+
+async def _parse_upload(file: UploadFile, fn, *args) -> dict:
+    """Speichert den Upload und führt fn(tmp_path, *args) im Worker-Pool aus."""
     # 4. Dateiendung validieren
     filename = (file.filename or "").strip()
     if not filename.lower().endswith(".knxproj"):
         raise HTTPException(status_code=400, detail="Nur .knxproj-Dateien sind erlaubt.")
 
-    # 1. Dateigröße begrenzen
-    data = await file.read(MAX_UPLOAD_BYTES + 1)
-    if len(data) > MAX_UPLOAD_BYTES:
-        raise HTTPException(status_code=413, detail="Datei zu groß (max. 50 MB).")
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".knxproj", mode="wb") as tmp:
-        tmp.write(data)
-        tmp_path = tmp.name
+    # 1. Dateigröße begrenzen (schon beim Empfang, siehe UploadLimitMiddleware)
+    tmp_path = await _save_upload(file)
 
     try:
-        kwargs: dict = {"path": tmp_path}
-        if password:
-            kwargs["password"] = password
-        if language:
-            kwargs["language"] = language
-
-        project = XKNXProj(**kwargs).parse()
-        project["_security"] = _extract_security_data(tmp_path, password, project)
-        return JSONResponse(content=project)
+        return await _run_in_pool(fn, tmp_path, *args)
+    except HTTPException:
+        raise
     except InvalidPasswordException as exc:
         raise HTTPException(status_code=422, detail=f"Invalid password: {exc}") from exc
     except XknxProjectException as exc:
@@ -253,3 +410,29 @@ async def parse_project(
         raise HTTPException(status_code=500, detail=f"Parsing failed: {exc}") from exc
     finally:
         os.unlink(tmp_path)
+
+
+@app.post("/api/parse")
+@limiter.limit("5/minute")
+async def parse_project(
+    request: Request,
+    file: UploadFile = File(...),
+    password: str = Form(default=""),
+    language: str = Form(default="de-DE"),
+):
+    # Sicherheitsdaten (Tool Keys usw.) nur auf Anfrage, siehe /api/parse/security
+    return JSONResponse(content=await _parse_upload(file, _parse_project_file, password, language))
+
+
+@app.post("/api/parse/security")
+@limiter.limit("5/minute")
+async def parse_project_security(
+    request: Request,
+    file: UploadFile = File(...),
+    password: str = Form(default=""),
+):
+    """KNX-Security-Daten derselben Datei; der Server speichert keine Uploads, daher erneut hochladen.
+
+    Liest nur 0.xml (Streaming) und die Zertifikate, das Projekt selbst wird nicht geparst.
+    """
+    return JSONResponse(content=await _parse_upload(file, _security_from_file, password))
@@ -33,6 +33,40 @@ def reset_server_state():
             "remote_gateway_token": "",
             "remote_gateway_ws": None,
             "remote_gateway_connected": False,
+            "remote_link": server._new_remote_link(),
+            "remote_gateways": {},
+            "remote_ga_gateway": {},
+            "pa_scan_running": False,
+            "pa_scan_cancel": False,
+            "pa_scan": None,
+            "ga_scan_running": False,
+            "ga_scan_cancel": False,
+            "ga_scan": None,
+            "device_cache": None,
+            "inventory_job": None,
+            "mgmt_max_tunnels": 0,  # tests never open real tunnels unless they opt in
+            "mgmt_pool": [],
+            "mgmt_lock": None,
+            "mgmt_retry_at": 0.0,
+            "mgmt_reaper": None,
+            "outbound": None,
+            "outbound_rate": 20.0,
+            "bus_rx": collections.deque(maxlen=server.BUS_LOAD_WINDOW + 1),
+            "read_waiters": {},
+            "read_all_job": None,
+            "read_inflight": {},
+            "polling": None,
+            "polling_schedules": [],
+            "polling_max_bus_load": server.POLL_MAX_BUS_LOAD,
+            "parse_slots": None,  # bound to the test's event loop; the pool is kept
+            "parse_timeout": server.PARSE_TIMEOUT,
+            "parse_jobs": {},
+            "parse_cache_max_mb": server.PARSE_CACHE_MAX_MB,
+            "max_upload_mb": server.MAX_UPLOAD_MB,
+            "project_slug": None,
+            "security_inflight": {},
+            "project_responses": collections.OrderedDict(),
+            "project_diffs": collections.OrderedDict(),
             # WireGuard
             "wireguard_enabled": False,
             "wireguard_peer_connected": False,
@@ -52,6 +86,13 @@ def patched_paths(tmp_path, monkeypatch):
     monkeypatch.setattr(server, "ANNOTATIONS_PATH", tmp_path / "annotations.json")
     monkeypatch.setattr(server, "LOG_PATH", tmp_path / "knx_bus.log")
     monkeypatch.setattr(server, "LAST_PROJECT_PATH", tmp_path / "last_project.json")
+    monkeypatch.setattr(server, "PA_SCAN_PATH", tmp_path / "pa_scan.json")
+    monkeypatch.setattr(server, "GA_SCAN_PATH", tmp_path / "ga_scan.json")
+    monkeypatch.setattr(server, "DEVICE_CACHE_PATH", tmp_path / "device_cache.json")
+    monkeypatch.setattr(server, "RECENT_PROJECTS_PATH", tmp_path / "recent_projects.json")
+    monkeypatch.setattr(server, "PROJECTS_DIR", tmp_path / "projects")
+    monkeypatch.setattr(server, "PARSE_CACHE_DIR", tmp_path / "parse_cache")
+    monkeypatch.setattr(server, "PARSE_CACHE_SECRET_PATH", tmp_path / "parse_cache.key")
     return tmp_path
 
 
@@ -78,3 +119,6 @@ KNXPROJ_DIR = Path(__file__).parent.parent.parent / "xknxproject" / "test" / "re
 KNXPROJ_ETS6 = KNXPROJ_DIR / "ets6_free.knxproj"
 KNXPROJ_ETS6_FUNCS = KNXPROJ_DIR / "testprojekt-ets6-functions.knxproj"
 KNXPROJ_NOPASS = KNXPROJ_DIR / "xknx_test_project_no_password.knxproj"
+
+# Small demo project shipped with the repository
+DEMO_PROJECT = Path(__file__).parent.parent / "demo.knxproj"
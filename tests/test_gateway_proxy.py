@@ -0,0 +1,293 @@
+"""Tests für knx_gateway_proxy.py (Filter, Serialisierung)."""
+import json
+
+import pytest
+
+import knx_gateway_proxy as proxy
+from xknx.dpt import DPTArray, DPTBinary
+from xknx.telegram import Telegram
+from xknx.telegram.address import GroupAddress, IndividualAddress
+from xknx.telegram.apci import GroupValueRead, GroupValueResponse, GroupValueWrite
+
+
+@pytest.fixture(autouse=True)
+def reset_proxy_state():
+    proxy.set_filter({})
+    proxy._value_cache.clear()
+    proxy._outbox.clear()
+    yield
+    proxy.set_filter({})
+    proxy._value_cache.clear()
+    proxy._outbox.clear()
+
+
+def _tg(ga="1/2/3", src="1.1.1", payload=None):
+    return Telegram(
+        destination_address=GroupAddress(ga),
+        source_address=IndividualAddress(src),
+        payload=payload or GroupValueWrite(DPTBinary(1)),
+    )
+
+
+# ── Adressbereiche ────────────────────────────────────────────────────────────
+
+def test_address_bounds_single_ga():
+    raw = GroupAddress("1/2/3").raw
+    assert proxy._address_bounds("1/2/3", False) == (raw, raw)
+
+
+def test_address_bounds_wildcard_ga():
+    lo, hi = proxy._address_bounds("1/2/*", False)
+    assert lo == GroupAddress("1/2/0").raw
+    assert hi == GroupAddress("1/2/255").raw
+    lo, hi = proxy._address_bounds("3/*", False)
+    assert (lo, hi) == (GroupAddress("3/0/0").raw, GroupAddress("3/7/255").raw)
+
+
+def test_address_bounds_range_and_individual():
+    lo, hi = proxy._address_bounds("1/0/10-1/1/5", False)
+    assert (lo, hi) == (GroupAddress("1/0/10").raw, GroupAddress("1/1/5").raw)
+    lo, hi = proxy._address_bounds("1.1.*", True)
+    assert (lo, hi) == (IndividualAddress("1.1.0").raw, IndividualAddress("1.1.255").raw)
+
+
+@pytest.mark.parametrize("spec", ["1/2", "1/*/3", "32/0/0", "1/2/3-1/2/1", "x/1/1", "1/2/3/*", "1/2/3/4"])
+def test_address_bounds_invalid(spec):
+    with pytest.raises(ValueError):
+        proxy._address_bounds(spec, False)
+
+
+def test_address_bounds_individual_too_many_parts():
+    with pytest.raises(ValueError):
+        proxy._address_bounds("1.1.1.*", True)
+
+
+# ── Filter ────────────────────────────────────────────────────────────────────
+
+def test_no_filter_forwards_everything():
+    assert proxy._passes_filter(_tg())
+
+
+def test_ga_allow_and_deny():
+    proxy.set_filter({"ga_allow": ["1/*"], "ga_deny": ["1/2/*"]})
+    assert proxy._passes_filter(_tg(ga="1/0/1"))
+    assert not proxy._passes_filter(_tg(ga="1/2/3"))
+    assert not proxy._passes_filter(_tg(ga="2/0/1"))
+
+
+def test_source_filters():
+    proxy.set_filter({"src_deny": ["1.1.10-1.1.20"]})
+    assert proxy._passes_filter(_tg(src="1.1.9"))
+    assert not proxy._passes_filter(_tg(src="1.1.15"))
+    proxy.set_filter({"src_allow": ["2.*"]})
+    assert not proxy._passes_filter(_tg(src="1.1.1"))
+    assert proxy._passes_filter(_tg(src="2.3.4"))
+
+
+def test_on_change_suppresses_repeated_values():
+    proxy.set_filter({"on_change": ["5/*"], "max_age_s": 60})
+    meter = GroupValueWrite(DPTArray((0x0C, 0x1A)))
+    assert proxy._passes_filter(_tg(ga="5/0/1", payload=meter))
+    assert not proxy._passes_filter(_tg(ga="5/0/1", payload=GroupValueWrite(DPTArray((0x0C, 0x1A)))))
+    assert proxy._passes_filter(_tg(ga="5/0/1", payload=GroupValueWrite(DPTArray((0x0C, 0x1B)))))
+
+
+def test_on_change_heartbeat_after_max_age(monkeypatch):
+    proxy.set_filter({"on_change": ["5/*"], "max_age_s": 10})
+    now = [1000.0]
+    monkeypatch.setattr(proxy.time, "monotonic", lambda: now[0])
+    assert proxy._passes_filter(_tg(ga="5/0/1"))
+    now[0] += 5
+    assert not proxy._passes_filter(_tg(ga="5/0/1"))
+    now[0] += 6
+    assert proxy._passes_filter(_tg(ga="5/0/1"))
+
+
+def test_on_change_never_suppresses_responses_or_reads():
+    proxy.set_filter({"on_change": ["5/*"]})
+    resp = GroupValueResponse(DPTBinary(1))
+    assert proxy._passes_filter(_tg(ga="5/0/1", payload=resp))
+    assert proxy._passes_filter(_tg(ga="5/0/1", payload=resp))
+    assert proxy._passes_filter(_tg(ga="5/0/1", payload=GroupValueRead()))
+    assert proxy._passes_filter(_tg(ga="5/0/1", payload=GroupValueRead()))
+
+
+async def test_filter_message_applied_without_knx_connection():
+    proxy._xknx_instances.clear()
+    await proxy.handle_server_message({"type": "filter", "ga_deny": ["0/*"]})
+    assert not proxy._passes_filter(_tg(ga="0/0/1"))
+
+
+# ── Letzte-Werte-Cache / Snapshot ─────────────────────────────────────────────
+
+def test_cache_keeps_last_value_per_ga():
+    proxy._cache_telegram(_tg(ga="1/2/3", payload=GroupValueWrite(DPTBinary(0))))
+    proxy._cache_telegram(_tg(ga="1/2/3", payload=GroupValueResponse(DPTBinary(1))))
+    proxy._cache_telegram(_tg(ga="1/2/4", payload=GroupValueRead()))
+    snapshot = proxy._snapshot_message()
+    assert snapshot["type"] == "snapshot"
+    assert len(snapshot["telegrams"]) == 1
+    item = snapshot["telegrams"][0]
+    assert item["ga"] == "1/2/3"
+    assert item["apci"] == "GroupValueResponse"
+    assert item["payload_value"] == 1
+    assert item["ts"]
+
+
+async def test_cache_includes_filtered_telegrams():
+    proxy.set_filter({"ga_deny": ["1/*"]})
+    telegram = _tg(ga="1/2/3")
+    proxy.telegram_received_cb(telegram)
+    assert not proxy._passes_filter(telegram)
+    assert len(proxy._snapshot_message()["telegrams"]) == 1
+
+
+async def test_snapshot_request_answered_over_ws():
+    sent = []
+
+    class _WS:
+        async def send(self, data):
+            sent.append(json.loads(data))
+
+    proxy._cache_telegram(_tg(ga="2/0/1", payload=GroupValueWrite(DPTArray((0x0C, 0x1A)))))
+    proxy._ws_conn = _WS()
+    try:
+        await proxy.handle_server_message({"type": "snapshot_request"})
+    finally:
+        proxy._ws_conn = None
+    assert sent[0]["type"] == "snapshot"
+    assert sent[0]["telegrams"][0]["payload_value"] == [12, 26]
+
+
+# ── Link-Telemetrie ───────────────────────────────────────────────────────────
+
+async def test_ping_answered_with_pong_and_stats():
+    sent = []
+
+    class _WS:
+        transport = None
+
+        async def send(self, data):
+            sent.append(json.loads(data))
+
+    proxy._ws_conn = _WS()
+    try:
+        await proxy.handle_server_message({"type": "ping", "seq": 7, "ts": 123.5})
+    finally:
+        proxy._ws_conn = None
+    pong = sent[0]
+    assert pong["type"] == "pong"
+    assert pong["seq"] == 7
+    assert pong["ts"] == 123.5
+    assert {"reconnects", "pending", "queued_bytes", "tx_bytes"} <= set(pong["stats"])
+
+
+# ── Mehrere Gateways ──────────────────────────────────────────────────────────
+
+def test_gateway_list_single_from_knx_ip():
+    gateways = proxy._gateway_list({"knx_ip": "192.168.1.100", "knx_port": 3672})
+    assert gateways == [{"knx_ip": "192.168.1.100", "knx_port": 3672,
+                         "knx_type": "ip", "id": "192.168.1.100"}]
+
+
+def test_gateway_list_multi_and_duplicate_ids():
+    gateways = proxy._gateway_list({"gateways": [
+        {"id": "eg", "knx_ip": "10.0.0.1"},
+        {"knx_ip": "10.0.0.2"},
+    ]})
+    assert [g["id"] for g in gateways] == ["eg", "10.0.0.2"]
+    assert gateways[0]["knx_port"] == 3671
+    with pytest.raises(ValueError):
+        proxy._gateway_list({"gateways": [{"id": "a", "knx_ip": "1"}, {"id": "a", "knx_ip": "2"}]})
+
+
+def test_serialized_telegram_carries_gateway_id():
+    assert proxy._serialize_telegram(_tg(), "eg")["gw"] == "eg"
+    assert "gw" not in proxy._serialize_telegram(_tg())
+
+
+def test_cache_and_on_change_are_per_gateway():
+    proxy.set_filter({"on_change": ["1/*"]})
+    assert proxy._passes_filter(_tg(), "eg")
+    assert proxy._passes_filter(_tg(), "og")
+    assert not proxy._passes_filter(_tg(), "eg")
+    proxy._cache_telegram(_tg(), "eg")
+    proxy._cache_telegram(_tg(), "og")
+    assert sorted(t["gw"] for t in proxy._snapshot_message()["telegrams"]) == ["eg", "og"]
+
+
+async def test_server_message_routed_to_gateway(monkeypatch):
+    class _Queue:
+        def __init__(self):
+            self.items = []
+
+        async def put(self, item):
+            self.items.append(item)
+
+    class _XKNX:
+        def __init__(self):
+            self.telegrams = _Queue()
+
+    eg, og = _XKNX(), _XKNX()
+    monkeypatch.setattr(proxy, "_xknx_instances", {"eg": eg, "og": og})
+    monkeypatch.setattr(proxy, "_default_gateway", "eg")
+    await proxy.handle_server_message({"type": "read", "ga": "1/2/3", "gw": "og"})
+    await proxy.handle_server_message({"type": "read", "ga": "1/2/4"})
+    await proxy.handle_server_message({"type": "read", "ga": "1/2/5", "gw": "unbekannt"})
+    assert [str(t.destination_address) for t in og.telegrams.items] == ["1/2/3"]
+    assert [str(t.destination_address) for t in eg.telegrams.items] == ["1/2/4"]
+
+
+# ── Ausgang / Batches ─────────────────────────────────────────────────────────
+
+def test_received_telegrams_queued_with_timestamp():
+    proxy.set_filter({"ga_deny": ["7/*"]})
+    proxy.telegram_received_cb(_tg(ga="1/2/3"), "eg")
+    proxy.telegram_received_cb(_tg(ga="7/0/1"), "eg")
+    assert len(proxy._outbox) == 1
+    item = proxy._outbox[0]
+    assert "type" not in item
+    assert item["ga"] == "1/2/3"
+    assert item["gw"] == "eg"
+    assert item["ts"]
+
+
+def test_outbox_bounded(monkeypatch):
+    monkeypatch.setattr(proxy, "OUTBOX_MAX", 3)
+    for i in range(5):
+        proxy.telegram_received_cb(_tg(ga=f"1/2/{i}"))
+    assert [m["ga"] for m in proxy._outbox] == ["1/2/2", "1/2/3", "1/2/4"]
+
+
+async def test_outbox_sender_sends_batches(monkeypatch):
+    import asyncio
+
+    sent = []
+
+    class _WS:
+        async def send(self, data):
+            sent.append(json.loads(data))
+
+    monkeypatch.setattr(proxy, "BATCH_MAX", 2)
+    monkeypatch.setattr(proxy, "_ws_conn", _WS())
+    for i in range(3):
+        proxy.telegram_received_cb(_tg(ga=f"1/2/{i}"))
+    task = asyncio.create_task(proxy._outbox_sender())
+    for _ in range(10):
+        await asyncio.sleep(0)
+    task.cancel()
+    assert [len(m["items"]) for m in sent] == [2, 1]
+    assert all(m["type"] == "telegrams" for m in sent)
+    assert not proxy._outbox
+
+
+async def test_outbox_keeps_batch_when_send_fails(monkeypatch):
+    class _WS:
+        async def send(self, data):
+            raise ConnectionError("weg")
+
+    monkeypatch.setattr(proxy, "_ws_conn", _WS())
+    proxy.telegram_received_cb(_tg(ga="1/2/3"))
+    with pytest.raises(ConnectionError):
+        await proxy._outbox_sender()
+    assert len(proxy._outbox) == 1
@@ -1,9 +1,12 @@
 """Unit tests for server.py helper functions (pure filesystem logic)."""
+import io
 import json
+import zipfile
 
 import pytest
 
 import server
+import server_public
 
 
 class TestLoadConfig:
@@ -151,3 +154,71 @@ class TestLoadLastProject:
         # Must not raise — error is logged and state stays clean
         server.load_last_project()
         assert server.state["project_data"] is None
+
+
+SECURITY_XML = b"""<?xml version="1.0" encoding="utf-8"?>
+<KNX xmlns="http://knx.org/xml/project/23"><Project><Installations><Installation>
+<Topology>
+  <Area Address="1"><Line Address="1"><Segment>
+    <DeviceInstance Address="5" Name="Router">
+      <IPConfig IPAddress="10.0.0.5" MACAddress="00:11:22:33:44:55"/>
+      <BusInterfaces><BusInterface RefId="BI-1" Password="tunnel1"/></BusInterfaces>
+      <Security ToolKey="AA" SequenceNumber="7"/>
+    </DeviceInstance>
+    <DeviceInstance Address="6" Name="Plain"><Security SequenceNumber="0"/></DeviceInstance>
+  </Segment></Line></Area>
+  <UnassignedDevices><DeviceInstance Address="0" Name="Lose"><Security ToolKey="BB"/></DeviceInstance></UnassignedDevices>
+</Topology>
+<GroupAddresses><GroupRanges><GroupRange>
+  <GroupAddress Address="2305" Key="K1"/><GroupAddress Address="2306"/>
+</GroupRange></GroupRanges></GroupAddresses>
+</Installation></Installations></Project></KNX>"""
+
+
+@pytest.mark.parametrize("module", [server, server_public])
+def test_extract_security_data_streams_project_xml(module, tmp_path):
+    archive = tmp_path / "p.knxproj"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("cert.certificate", 'Serial="ABC" Name="Test"')
+
+    class Contents:
+        root = zipfile.ZipFile(archive)
+
+        def open_project_0(self):
+            return io.BytesIO(SECURITY_XML)
+
+    project = {
+        "group_addresses": {"a": {"raw_address": 2305, "address": "1/1/1"}},
+        "devices": {"1.1.5": {"name": "IP-Router"}},
+    }
+    result = module._extract_security_data(Contents(), project)
+    assert result["devices"] == [{
+        "address": "1.1.5",
+        "name": "IP-Router",
+        "ip_address": "10.0.0.5",
+        "mac_address": "00:11:22:33:44:55",
+        "tool_key": "AA",
+        "device_auth_code": None,
+        "device_mgmt_password": None,
+        "sequence_number": "7",
+        "bus_interfaces": [{"ref_id": "BI-1", "password": "tunnel1"}],
+    }]
+    assert result["ga_keys"] == {"1/1/1": "K1"}
+    assert result["ets_certificates"] == [{"Serial": "ABC", "Name": "Test"}]
+
+
+def test_public_security_data_formats_ga_without_parsed_project(tmp_path):
+    archive = tmp_path / "p.knxproj"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("x.txt", "")
+
+    class Contents:
+        root = zipfile.ZipFile(archive)
+
+        def open_project_0(self):
+            return io.BytesIO(SECURITY_XML)
+
+    style = server_public.GroupAddressStyle.THREELEVEL
+    result = server_public._extract_security_data(Contents(), {}, style)
+    assert result["ga_keys"] == {"1/1/1": "K1"}
+    assert result["devices"][0]["name"] == "Router"
@@ -0,0 +1,213 @@
+"""Tests für Management-Zugriffe: Geräte-Inventur, Property-Cache und Management-Tunnel."""
+import asyncio
+import contextlib
+import json
+import time
+
+import pytest
+
+import server
+
+
+def _props(addr: str) -> dict:
+    return {
+        "address": addr,
+        "descriptor": "0x07B0",
+        "manufacturer_id": 2,
+        "properties": {"PID_SERIAL_NUMBER": "0002DEADBEEF"},
+        "read_at": "2024-01-01T00:00:00",
+        "read_ts": time.time(),
+    }
+
+
+@pytest.fixture
+def fake_reads(monkeypatch):
+    calls = []
+    state = {"in_flight": 0, "peak": 0}
+
+    async def fake_read(addr, priority=server.OUTBOUND_INTERACTIVE):
+        calls.append(addr)
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        if addr == "1.1.13":
+            raise server.HTTPException(status_code=503, detail="Verbindung fehlgeschlagen")
+        return _props(addr)
+
+    monkeypatch.setattr(server, "_read_device_properties", fake_read)
+    server.state["connected"] = True
+    return calls, state
+
+
+async def _wait_inventory():
+    for _ in range(200):
+        if server.state["inventory_job"]["status"] != "running":
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_inventory_reads_project_devices_concurrently(server_client, patched_paths, fake_reads):
+    calls, stats = fake_reads
+    server.state["project_data"] = {"devices": {f"1.1.{d}": {} for d in range(1, 21)}}
+
+    resp = await server_client.post("/api/device/inventory", json={"window": 4})
+    assert resp.json()["count"] == 20
+    await _wait_inventory()
+
+    report = (await server_client.get("/api/device/inventory")).json()
+    assert report["job"]["done"] == 20
+    assert report["job"]["failed_devices"] == {"1.1.13": "Verbindung fehlgeschlagen"}
+    assert len(report["devices"]) == 19
+    assert stats["peak"] == 4
+    saved = json.loads((patched_paths / "device_cache.json").read_text())
+    assert set(saved) == set(report["devices"])
+
+    # Second run only reads what is not cached yet
+    calls.clear()
+    await server_client.post("/api/device/inventory")
+    await _wait_inventory()
+    assert calls == ["1.1.13"]
+    assert server.state["inventory_job"]["cached"] == 19
+
+
+async def test_properties_served_from_cache_until_refresh(server_client, patched_paths, fake_reads):
+    calls, _ = fake_reads
+    first = (await server_client.get("/api/device/1.1.5/properties")).json()
+    assert first["cached"] is False
+    again = (await server_client.get("/api/device/1.1.5/properties")).json()
+    assert again["cached"] is True
+    assert calls == ["1.1.5"]
+
+    server.state["connected"] = False
+    cached_offline = await server_client.get("/api/device/1.1.5/properties")
+    assert cached_offline.status_code == 200
+    server.state["connected"] = True
+
+    await server_client.get("/api/device/1.1.5/properties", params={"refresh": True})
+    assert calls == ["1.1.5", "1.1.5"]
+
+
+async def test_stale_cache_entry_is_read_again(server_client, patched_paths, fake_reads):
+    calls, _ = fake_reads
+    stale = {**_props("1.1.5"), "read_ts": time.time() - server.DEVICE_CACHE_TTL - 1}
+    server.state["device_cache"] = {"1.1.5": stale}
+    resp = await server_client.get("/api/device/1.1.5/properties")
+    assert resp.json()["cached"] is False
+    assert calls == ["1.1.5"]
+
+
+async def test_inventory_rejects_invalid_address(server_client, fake_reads):
+    resp = await server_client.post("/api/device/inventory", json={"addresses": ["1.1"]})
+    assert resp.status_code == 422
+
+
+async def test_unreachable_device_is_not_cached(server_client, patched_paths, monkeypatch):
+    class Conn:
+        async def request(self, payload, expected):
+            raise asyncio.TimeoutError
+
+    class Management:
+        @contextlib.asynccontextmanager
+        async def connection(self, ia):
+            yield Conn()
+
+    @contextlib.asynccontextmanager
+    async def fake_tunnel():
+        yield type("XKNX", (), {"management": Management()})()
+
+    monkeypatch.setattr(server, "_management_tunnel", fake_tunnel)
+    server.state["connected"] = True
+    resp = await server_client.get("/api/device/1.1.5/properties")
+    assert resp.status_code == 504
+    assert "1.1.5" not in server._device_cache()
+
+    # The inventory records it as failed, so the next run tries again
+    await server_client.post("/api/device/inventory", json={"addresses": ["1.1.5"]})
+    await _wait_inventory()
+    report = (await server_client.get("/api/device/inventory")).json()
+    assert report["job"]["failed_devices"] == {"1.1.5": "Gerät 1.1.5 antwortet nicht"}
+    assert report["devices"] == {}
+
+
+# ── Management-Tunnel ─────────────────────────────────────────────────────────
+
+class _FakeTunnel:
+    def __init__(self):
+        self.connection_manager = type("CM", (), {"connected": asyncio.Event()})()
+        self.connection_manager.connected.set()
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def tunnels(monkeypatch):
+    opened = []
+
+    async def fake_open():
+        tunnel = _FakeTunnel()
+        opened.append(tunnel)
+        return tunnel
+
+    monkeypatch.setattr(server, "_open_management_tunnel", fake_open)
+    server.state["mgmt_max_tunnels"] = 2
+    server.state["xknx"] = "monitor"
+    yield opened
+    if server.state["mgmt_reaper"]:
+        server.state["mgmt_reaper"].cancel()
+
+
+async def test_management_uses_separate_tunnels(tunnels):
+    async with server._management_tunnel() as first:
+        async with server._management_tunnel() as second:
+            async with server._management_tunnel() as third:
+                assert first is tunnels[0] and second is tunnels[1]
+                assert third in tunnels  # pool full: shares a tunnel
+                assert server._management_summary() == {
+                    "max_tunnels": 2, "open_tunnels": 2, "active_operations": 3,
+                }
+    async with server._management_tunnel() as again:
+        assert again in tunnels[:2]
+    assert len(tunnels) == 2
+
+
+async def test_management_falls_back_without_free_slot(tunnels, monkeypatch):
+    calls = []
+
+    async def no_slot():
+        calls.append(1)
+        return None
+
+    monkeypatch.setattr(server, "_open_management_tunnel", no_slot)
+    async with server._management_tunnel() as xknx:
+        assert xknx == "monitor"
+    async with server._management_tunnel() as xknx:
+        assert xknx == "monitor"
+    assert calls == [1]  # no retry before MGMT_RETRY_DELAY
+
+
+async def test_idle_management_tunnel_is_closed(tunnels, monkeypatch):
+    monkeypatch.setattr(server, "MGMT_IDLE_TIMEOUT", 0.01)
+    async with server._management_tunnel():
+        pass
+    for _ in range(50):
+        if not server.state["mgmt_pool"]:
+            break
+        await asyncio.sleep(0.01)
+    assert server.state["mgmt_pool"] == []
+    assert tunnels[0].stopped
+
+
+def test_description_parses_tunnelling_slots():
+    header = bytes([0x06, 0x10, 0x02, 0x04, 0x00, 0x12])
+    dib = bytes([0x0C, 0x07, 0x00, 0xF8,
+                 0x11, 0x0A, 0x00, 0x05,   # 1.1.10 usable, free
+                 0x11, 0x0B, 0x00, 0x04])  # 1.1.11 usable, occupied
+    info = server._parse_knxip_description(header + dib)["tunnelling"]
+    assert info["max_apdu_length"] == 248
+    assert info["slots"] == [
+        {"address": "1.1.10", "usable": True, "authorized": False, "free": True},
+        {"address": "1.1.11", "usable": True, "authorized": False, "free": False},
+    ]
@@ -0,0 +1,579 @@
+"""Tests für den Outbound-Scheduler (Priorisierung, Budget, Buslast)."""
+import asyncio
+import json
+import time
+from itertools import islice
+from unittest.mock import AsyncMock
+
+import pytest
+from xknx.telegram import Telegram
+from xknx.telegram.address import GroupAddress
+from xknx.telegram.apci import GroupValueRead
+
+import server
+
+
+class _FakeXknx:
+    def __init__(self):
+        self.sent = []
+        self.telegrams = self
+
+    async def put(self, telegram):
+        self.sent.append(str(telegram.destination_address))
+
+
+def _read(ga: str) -> Telegram:
+    return Telegram(destination_address=GroupAddress(ga), payload=GroupValueRead())
+
+
+@pytest.fixture
+def fake_xknx():
+    xknx = _FakeXknx()
+    server.state["xknx"] = xknx
+    server.state["connected"] = True
+    server.state["outbound_rate"] = 50.0
+    yield xknx
+    if server.state["outbound"]:
+        server.state["outbound"]["task"].cancel()
+
+
+async def test_interactive_overtakes_queued_bulk(fake_xknx):
+    bulk = [
+        asyncio.create_task(server._bus_send(_read(f"1/0/{i}"), server.OUTBOUND_BULK))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    await server._bus_send(_read("2/0/0"), server.OUTBOUND_INTERACTIVE)
+    await asyncio.gather(*bulk)
+    assert fake_xknx.sent == ["2/0/0", "1/0/0", "1/0/1", "1/0/2"]
+    assert server._outbound_summary()["sent"] == {
+        "interactive": 1, "batch": 0, "polling": 0, "bulk": 3,
+    }
+
+
+async def test_bulk_interval_yields_to_bus_load():
+    server.state["outbound_rate"] = 20.0
+    assert server._outbound_interval(server.OUTBOUND_BULK) == pytest.approx(0.05)
+    server._note_bus_traffic(75)  # 15 telegrams/s over the window
+    assert server._bus_load() == pytest.approx(15)
+    assert server._outbound_interval(server.OUTBOUND_BULK) == pytest.approx(0.2)
+    assert server._outbound_interval(server.OUTBOUND_BATCH) == pytest.approx(0.2)
+    assert server._outbound_interval(server.OUTBOUND_INTERACTIVE) == pytest.approx(0.05)
+    server._note_bus_traffic(1000)
+    assert server._outbound_interval(server.OUTBOUND_BULK) == pytest.approx(1 / server.OUTBOUND_MIN_RATE)
+
+
+async def test_cancelled_caller_is_skipped(fake_xknx):
+    first = asyncio.create_task(server._bus_send(_read("1/0/0"), server.OUTBOUND_BULK))
+    dropped = asyncio.create_task(server._bus_send(_read("1/0/1"), server.OUTBOUND_BULK))
+    await first
+    dropped.cancel()
+    await server._bus_send(_read("1/0/2"), server.OUTBOUND_BULK)
+    assert fake_xknx.sent == ["1/0/0", "1/0/2"]
+
+
+async def test_dispatch_without_gateway_raises_503():
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as exc:
+        await server._bus_send(_read("1/0/0"))
+    assert exc.value.status_code == 503
+    server.state["outbound"]["task"].cancel()
+
+
+async def test_ga_scan_uses_proxy_in_remote_mode(server_client, monkeypatch):
+    monkeypatch.setattr(server, "GA_SCAN_SETTLE", 0)
+    gw_ws = AsyncMock()
+    server.state.update(
+        connected=True, connection_type="remote_gateway", remote_gateway_ws=gw_ws,
+        outbound_rate=1000.0,
+    )
+    resp = await server_client.post(
+        "/api/ga/scan", json={"start": "1/0/0", "end": "1/0/2", "delay_ms": 50}
+    )
+    assert resp.status_code == 200
+    for _ in range(100):
+        if not server.state["ga_scan_running"]:
+            break
+        await asyncio.sleep(0.01)
+    sent = [json.loads(c[0][0]) for c in gw_ws.send_text.call_args_list]
+    sent = [m for m in sent if m["type"] == "read"]
+    assert [m["ga"] for m in sent] == ["1/0/0", "1/0/1", "1/0/2"]
+    server.state["outbound"]["task"].cancel()
+
+
+# ── Alle lesen als Job ────────────────────────────────────────────────────────
+
+def _co(ga: str, read: bool) -> dict:
+    return {
+        "flags": {"read": read, "communication": True},
+        "group_address_links": [ga],
+    }
+
+
+def _response_entry(ga: str) -> dict:
+    return {
+        "ts": "2024-01-01 00:00:00.000", "src": "1.1.5", "device": "", "ga": ga,
+        "ga_name": "", "value": "Ein", "apci": "GroupValueResponse",
+    }
+
+
+async def test_read_all_correlates_responses_and_retries(server_client, fake_xknx, monkeypatch):
+    monkeypatch.setattr(server, "READ_ALL_BACKOFF", 0.01)
+    server.state["ga_dpt_map"] = {ga: {"main": 1, "sub": 1} for ga in ("1/0/0", "1/0/1", "1/0/2")}
+    server.state["project_data"] = {
+        "group_addresses": {},
+        "communication_objects": {
+            "a": _co("1/0/0", True), "b": _co("1/0/1", True), "c": _co("1/0/2", False),
+        },
+    }
+    answer = fake_xknx.put
+
+    async def put(telegram):
+        await answer(telegram)
+        if str(telegram.destination_address) == "1/0/0":
+            asyncio.get_running_loop().call_soon(
+                server._store_entries, [_response_entry("1/0/0")]
+            )
+
+    fake_xknx.put = put
+    resp = await server_client.post("/api/ga/read-all", json={"timeout": 0.1, "retries": 1})
+    assert resp.json()["count"] == 2
+    assert resp.json()["skipped"] == 1
+    busy = await server_client.post("/api/ga/read-all")
+    assert busy.status_code == 409
+
+    for _ in range(100):
+        if server.state["read_all_job"]["status"] != "running":
+            break
+        await asyncio.sleep(0.02)
+    report = (await server_client.get("/api/ga/read-all")).json()
+    assert report["status"] == "done"
+    assert report["answered"] == 1 and report["timeout"] == 1
+    assert report["skipped_gas"] == ["1/0/2"]
+    assert report["results"]["1/0/0"]["attempts"] == 1
+    assert report["results"]["1/0/0"]["latency_ms"] is not None
+    assert report["results"]["1/0/1"]["attempts"] == 2
+    assert fake_xknx.sent == ["1/0/0", "1/0/1", "1/0/1"]
+    assert server.state["read_waiters"] == {}
+
+
+async def test_read_all_report_404_before_first_run(server_client):
+    resp = await server_client.get("/api/ga/read-all")
+    assert resp.status_code == 404
+
+
+# ── Stapel-Schreiben ──────────────────────────────────────────────────────────
+
+async def test_write_batch_encodes_once_and_reports_per_item(server_client, fake_xknx, monkeypatch):
+    server.state["outbound_rate"] = 5000.0
+    server.state["ga_dpt_map"] = {
+        **{f"1/0/{i}": {"main": 1, "sub": 1} for i in range(200)},
+        "2/0/0": {"main": 9, "sub": 1},
+    }
+    parses = []
+    original = server.DPTBase.parse_transcoder
+    monkeypatch.setattr(
+        server.DPTBase, "parse_transcoder", lambda dpt: parses.append(dpt) or original(dpt)
+    )
+    items = [{"ga": f"1/0/{i}", "value": "ein"} for i in range(200)]
+    items += [{"ga": "2/0/0", "value": "21.5"}, {"ga": "2/0/0", "value": "warm"}, {"ga": "3/0/0", "value": 1}]
+
+    resp = await server_client.post("/api/ga/write-batch", json={"items": items})
+    body = resp.json()
+    assert resp.status_code == 200
+    assert body["sent"] == 201 and body["ok"] is False
+    assert body["results"][200] == {"ga": "2/0/0", "ok": True, "value": "21.50 °C"}
+    assert not body["results"][201]["ok"] and not body["results"][202]["ok"]
+    assert fake_xknx.sent == [f"1/0/{i}" for i in range(200)] + ["2/0/0"]
+    assert len(parses) == 201  # one transcoder per GA, compiled with the index
+    assert server.state["current_values"]["2/0/0"]["value"] == "21.50 °C"
+    assert server._outbound_summary()["sent"]["batch"] == 201  # paced by bus load
+
+    fake_xknx.sent.clear()
+    resp = await server_client.post(
+        "/api/ga/write-batch", json={"items": items, "all_or_nothing": True}
+    )
+    assert resp.status_code == 422
+    assert fake_xknx.sent == []
+    assert len(parses) == 201
+
+
+# ── Synchrones Lesen ──────────────────────────────────────────────────────────
+
+async def test_ga_value_coalesces_concurrent_reads(server_client, fake_xknx):
+    answer = fake_xknx.put
+
+    async def put(telegram):
+        await answer(telegram)
+        asyncio.get_running_loop().call_later(
+            0.02, server._store_entries, [_response_entry(str(telegram.destination_address))]
+        )
+
+    fake_xknx.put = put
+    responses = await asyncio.gather(
+        *(server_client.get("/api/ga/value", params={"ga": "1/0/0"}) for _ in range(5))
+    )
+    assert [r.json()["value"] for r in responses] == ["Ein"] * 5
+    assert fake_xknx.sent == ["1/0/0"]
+    assert server.state["read_inflight"] == {}
+
+
+async def test_ga_value_shared_read_waits_for_the_longest_timeout(server_client, fake_xknx):
+    answer = fake_xknx.put
+
+    async def put(telegram):
+        await answer(telegram)
+        asyncio.get_running_loop().call_later(
+            0.3, server._store_entries, [_response_entry(str(telegram.destination_address))]
+        )
+
+    fake_xknx.put = put
+    short, long = await asyncio.gather(
+        server_client.get("/api/ga/value", params={"ga": "1/0/0", "timeout": 0.1}),
+        server_client.get("/api/ga/value", params={"ga": "1/0/0", "timeout": 2}),
+    )
+    assert short.status_code == 504
+    assert long.json()["value"] == "Ein"
+    assert fake_xknx.sent == ["1/0/0"]
+    # /api/ga/read sees the shared read under any spelling of the GA
+    fake_xknx.sent.clear()
+    server.state["read_inflight"]["1/0/0"] = {"deadline": 0}
+    resp = await server_client.post("/api/ga/read", json={"ga": "2048"})
+    assert resp.json() == {"ok": True, "coalesced": True} and fake_xknx.sent == []
+    server.state["read_inflight"].clear()
+
+
+async def test_ga_value_answers_from_fresh_cache(server_client):
+    ts = server.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    server.state["current_values"]["1/0/0"] = {"value": "21.00 °C", "ts": ts}
+    resp = await server_client.get("/api/ga/value", params={"ga": "1/0/0", "max_age": 60})
+    assert resp.json() == {"ga": "1/0/0", "value": "21.00 °C", "ts": ts, "cached": True}
+    # Other spellings of the same GA hit the same cache entry
+    resp = await server_client.get("/api/ga/value", params={"ga": "2048", "max_age": 60})
+    assert resp.json()["ga"] == "1/0/0" and resp.json()["cached"]
+    # Too old for max_age → needs the bus, which is not connected
+    resp = await server_client.get("/api/ga/value", params={"ga": "1/0/0", "max_age": 0})
+    assert resp.status_code == 503
+
+
+async def test_ga_value_timeout_returns_504(server_client, fake_xknx):
+    resp = await server_client.get("/api/ga/value", params={"ga": "1/0/0", "timeout": 0.1})
+    assert resp.status_code == 504
+    assert server.state["read_waiters"] == {}
+    bad = await server_client.get("/api/ga/value", params={"ga": "kein/ga"})
+    assert bad.status_code == 422
+
+
+# ── PA-Scan ───────────────────────────────────────────────────────────────────
+
+async def test_management_turns_share_the_outbound_budget():
+    server.state["outbound_rate"] = 40.0
+    start = time.monotonic()
+    await asyncio.gather(*(server._bus_turn(server.OUTBOUND_BULK, cost=4) for _ in range(3)))
+    # each PA check holds the line for 4 telegram intervals (0.1 s at 40/s)
+    assert time.monotonic() - start >= 0.2
+    assert server._outbound_summary()["sent"]["bulk"] == 12
+
+
+async def _wait_pa_scan():
+    for _ in range(200):
+        if not server.state["pa_scan_running"]:
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_pa_scan_runs_checks_concurrently(server_client, monkeypatch):
+    import xknx.management.procedures as procedures
+
+    in_flight = 0
+    peak = 0
+
+    async def fake_check(_xknx, address):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return address.raw % 50 == 7
+
+    monkeypatch.setattr(procedures, "nm_individual_address_check", fake_check)
+    server.state["connected"] = True
+    server.state["outbound_rate"] = 5000.0  # checks take turns in the outbound queue
+    client_ws = AsyncMock()
+    server.state["ws_clients"] = {client_ws}
+
+    resp = await server_client.post(
+        "/api/bus/scan", json={"area": 1, "line": 1, "window": 4}
+    )
+    assert resp.json()["count"] == 255
+    await _wait_pa_scan()
+
+    assert peak == 4
+    complete = client_ws.send_json.call_args_list[-1][0][0]
+    assert complete["type"] == "scan_pa_complete"
+    assert complete["found"] == [
+        a for a in (f"1.1.{d}" for d in range(1, 256))
+        if server.IndividualAddress(a).raw % 50 == 7
+    ]
+
+
+def test_pa_scan_timeout_adapts_to_answer_times():
+    assert server._pa_scan_timeout([120, 130], 1.5) == 1.5
+    assert server._pa_scan_timeout([120, 130, 150], 1.5) == pytest.approx(0.6)
+    assert server._pa_scan_timeout([20, 30, 25], 1.5) == server.PA_SCAN_MIN_TIMEOUT
+    assert server._pa_scan_timeout([900, 800, 1000], 1.5) == 1.5
+
+
+_TOPO_PROJECT = {
+    "info": {"name": "Demo"},
+    "devices": {"1.1.5": {}, "1.1.9": {}, "2.3.1": {}},
+    "topology": {
+        "1": {"lines": {"1": {"devices": ["1.1.5", "1.1.9"]}, "2": {"devices": []}}},
+        "2": {"lines": {"3": {"devices": ["2.3.1"]}}},
+    },
+}
+
+
+def _pa_params(**kw):
+    return {
+        "area": None, "line": None, "device": None, "guided": True,
+        "skip_unpopulated": False, **kw,
+    }
+
+
+def test_pa_scan_order_probes_known_devices_and_populated_lines_first():
+    order = server._pa_scan_order(_pa_params(area=1), _TOPO_PROJECT)
+    head = list(islice(order, 5))
+    assert head == ["1.1.5", "1.1.9", "1.1.1", "1.1.2", "1.1.3"]
+    full = list(server._pa_scan_order(_pa_params(area=1), _TOPO_PROJECT))
+    assert len(full) == len(set(full)) == 15 * 255
+    assert full.index("1.2.1") > full.index("1.1.255")
+
+    only_populated = list(
+        server._pa_scan_order(_pa_params(skip_unpopulated=True), _TOPO_PROJECT)
+    )
+    assert len(only_populated) == 2 * 255
+    assert {a.rsplit(".", 1)[0] for a in only_populated} == {"1.1", "2.3"}
+
+
+async def test_pa_scan_resumes_and_reports_diff(server_client, monkeypatch):
+    import xknx.management.procedures as procedures
+
+    checked = []
+
+    async def fake_check(_xknx, address):
+        checked.append(str(address))
+        if len(checked) == 40:
+            server.state["pa_scan_cancel"] = True
+        return str(address) in ("1.1.5", "1.1.77")
+
+    monkeypatch.setattr(procedures, "nm_individual_address_check", fake_check)
+    server.state["connected"] = True
+    server.state["outbound_rate"] = 5000.0  # checks take turns in the outbound queue
+    server.state["project_data"] = _TOPO_PROJECT
+
+    body = {"area": 1, "line": 1, "window": 1}
+    assert (await server_client.post("/api/bus/scan", json=body)).json()["count"] == 255
+    await _wait_pa_scan()
+    report = (await server_client.get("/api/bus/scan")).json()
+    assert report["cancelled"] and not report["complete"]
+    assert report["position"] == 40
+
+    server.state["pa_scan"] = None  # as after a restart: only the file is left
+    resp = await server_client.post("/api/bus/scan", json={"resume": True})
+    assert resp.json()["remaining"] == 215
+    await _wait_pa_scan()
+    assert len(checked) == 255 and len(set(checked)) == 255
+
+    report = (await server_client.get("/api/bus/scan")).json()
+    assert report["complete"]
+    assert report["found"] == ["1.1.5", "1.1.77"]
+    assert report["diff"] == {"missing": ["1.1.9"], "unexpected": ["1.1.77"]}
+
+    again = await server_client.post("/api/bus/scan", json={"resume": True})
+    assert again.status_code == 404
+
+
+async def test_pa_scan_resume_skips_checks_done_past_the_position(server_client, monkeypatch):
+    import xknx.management.procedures as procedures
+
+    checked = []
+
+    async def fake_check(_xknx, address):
+        checked.append(str(address))
+        if len(checked) == 3:
+            server.state["pa_scan_cancel"] = True
+        return str(address) == "1.1.4"
+
+    monkeypatch.setattr(procedures, "nm_individual_address_check", fake_check)
+    server.state["connected"] = True
+    server.state["outbound_rate"] = 5000.0  # checks take turns in the outbound queue
+    server.state["project_data"] = _TOPO_PROJECT
+    await server_client.post("/api/bus/scan", json={"area": 1, "line": 1, "window": 1})
+    await _wait_pa_scan()
+
+    # Checkpoint of a scan that was killed while index 5 (1.1.4) and 6 had
+    # already been checked, but 3 and 4 had not
+    scan = json.loads(server.PA_SCAN_PATH.read_text())
+    scan.update(finished=[5, 6], found=["1.1.4"])
+    server.PA_SCAN_PATH.write_text(json.dumps(scan))
+    server.state["pa_scan"] = None
+    resp = await server_client.post("/api/bus/scan", json={"resume": True})
+    assert resp.json()["remaining"] == 250
+    await _wait_pa_scan()
+    assert len(checked) == 3 + 250 and "1.1.4" not in checked[3:]
+    report = (await server_client.get("/api/bus/scan")).json()
+    assert report["complete"] and report["found"] == ["1.1.4"]
+
+
+async def test_pa_scan_failed_checks_stay_open_for_resume(server_client, monkeypatch):
+    import xknx.management.procedures as procedures
+
+    checked = []
+    broken = {"1.1.1"}
+
+    async def fake_check(_xknx, address):
+        checked.append(str(address))
+        if str(address) in broken:
+            raise ConnectionError("gateway gone")
+        return str(address) == "1.1.1"
+
+    monkeypatch.setattr(procedures, "nm_individual_address_check", fake_check)
+    server.state["connected"] = True
+    server.state["outbound_rate"] = 5000.0  # checks take turns in the outbound queue
+    server.state["project_data"] = _TOPO_PROJECT
+    await server_client.post("/api/bus/scan", json={"area": 1, "line": 1, "window": 4})
+    await _wait_pa_scan()
+    report = (await server_client.get("/api/bus/scan")).json()
+    assert not report["complete"] and report["position"] == 2  # 1.1.1 is index 2
+    assert report["found"] == []
+
+    broken.clear()
+    checked.clear()
+    server.state["pa_scan"] = None
+    resp = await server_client.post("/api/bus/scan", json={"resume": True})
+    assert resp.json()["remaining"] == 1
+    await _wait_pa_scan()
+    assert checked == ["1.1.1"]
+    report = (await server_client.get("/api/bus/scan")).json()
+    assert report["complete"] and report["found"] == ["1.1.1"]
+
+
+async def _wait_ga_scan():
+    for _ in range(200):
+        if not server.state["ga_scan_running"]:
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_ga_scan_collects_responses_skips_known_and_resumes(
+    server_client, fake_xknx, monkeypatch
+):
+    monkeypatch.setattr(server, "GA_SCAN_SETTLE", 0.05)
+    server.state["outbound_rate"] = 5000.0
+    fake_xknx.put_orig = fake_xknx.put
+    interrupted = []
+
+    async def put(telegram):
+        await fake_xknx.put_orig(telegram)
+        ga = str(telegram.destination_address)
+        if ga in ("1/0/3", "1/0/250"):
+            asyncio.get_running_loop().call_soon(
+                server._store_entries, [_response_entry(ga)]
+            )
+        if len(fake_xknx.sent) == 100 and not interrupted:
+            interrupted.append(ga)
+            server.state["ga_scan_cancel"] = True  # interrupt the first run once
+
+    fake_xknx.put = put
+    server.state["ga_dpt_map"] = {"1/0/5": {"main": 1, "sub": 1}}
+    resp = await server_client.post(
+        "/api/ga/scan", json={"start": "1/0/0", "end": "1/1/255", "skip_known": True}
+    )
+    assert resp.json()["count"] == 512
+    await _wait_ga_scan()
+    report = (await server_client.get("/api/ga/scan")).json()
+    assert report["cancelled"] and not report["complete"]
+    assert "1/0/5" not in fake_xknx.sent
+    assert list(report["responded"]) == ["1/0/3"]
+
+    server.state["ga_scan"] = None  # restart: only the checkpoint file is left
+    resp = await server_client.post("/api/ga/scan", json={"resume": True})
+    assert resp.json()["remaining"] == 512 - 101
+    await _wait_ga_scan()
+    report = (await server_client.get("/api/ga/scan")).json()
+    assert report["complete"]
+    assert sorted(report["responded"]) == ["1/0/250", "1/0/3"]
+    assert len(fake_xknx.sent) == len(set(fake_xknx.sent)) == 511
+
+    # A follow-up scan can skip everything that already answered
+    fake_xknx.sent.clear()
+    await server_client.post(
+        "/api/ga/scan", json={"start": "1/0/0", "end": "1/0/255", "skip_answered": True}
+    )
+    await _wait_ga_scan()
+    assert "1/0/3" not in fake_xknx.sent and "1/0/250" not in fake_xknx.sent
+    assert len(fake_xknx.sent) == 254
+    report = (await server_client.get("/api/ga/scan")).json()
+    assert report["responded"] == {}  # earlier answers are not results of this scan
+    assert report["answered_before"] == ["1/0/3", "1/0/250"]
+
+
+async def test_ga_scan_rejects_reversed_range(server_client):
+    server.state["connected"] = True
+    resp = await server_client.post("/api/ga/scan", json={"start": "2/0/0", "end": "1/0/0"})
+    assert resp.status_code == 422
+
+
+# ── Zyklisches Abfragen ───────────────────────────────────────────────────────
+
+@pytest.fixture
+def polling(fake_xknx, monkeypatch):
+    monkeypatch.setattr(server, "POLL_MIN_INTERVAL", 0.01)
+    server.state["outbound_rate"] = 5000.0
+    yield fake_xknx
+    if server.state["polling"]:
+        server.state["polling"]["task"].cancel()
+
+
+async def test_polling_spreads_reads_over_interval(server_client, polling, patched_paths):
+    gas = ["1/0/0", "1/0/1", "1/0/2", "1/0/3"]
+    resp = await server_client.post(
+        "/api/polling", json={"name": "Zähler", "gas": gas, "interval_s": 0.2}
+    )
+    sched = resp.json()
+    saved = json.loads((patched_paths / "config.json").read_text())
+    assert saved["polling_schedules"] == [sched]
+
+    await asyncio.sleep(0.09)
+    assert polling.sent == ["1/0/0", "1/0/1"]  # one read every 50 ms, not a burst
+    await asyncio.sleep(0.22)
+    assert polling.sent[:6] == gas + ["1/0/0", "1/0/1"]
+    stats = (await server_client.get("/api/polling")).json()["schedules"][0]["stats"]
+    assert stats["sent"] == len(polling.sent)
+
+    await server_client.delete(f"/api/polling/{sched['id']}")
+    polling.sent.clear()
+    await asyncio.sleep(0.1)
+    assert polling.sent == []
+
+
+async def test_polling_defers_while_bus_is_busy(server_client, polling):
+    server._note_bus_traffic(1000)
+    await server_client.post("/api/polling", json={"id": "p1", "gas": ["1/0/0"], "interval_s": 5})
+    await asyncio.sleep(0.05)
+    assert polling.sent == []
+    assert server._polling_summary()["schedules"][0]["stats"]["deferred"] == 1
+
+
+async def test_polling_rejects_invalid_schedules(server_client, patched_paths):
+    for body in (
+        {"gas": []},
+        {"gas": ["1/0/0"], "interval_s": 0.5},
+        {"gas": ["1/0/0"], "interval_s": 10, "jitter_s": 20},
+        {"gas": ["kein/ga"]},
+    ):
+        resp = await server_client.post("/api/polling", json=body)
+        assert resp.status_code == 422, body
+    assert (await server_client.delete("/api/polling/nope")).status_code == 404
@@ -4,7 +4,7 @@ from pathlib import Path
 import pytest
 import server_public
 
-from tests.conftest import KNXPROJ_ETS6, KNXPROJ_NOPASS
+from tests.conftest import DEMO_PROJECT, KNXPROJ_ETS6, KNXPROJ_NOPASS
 
 
 # ---------------------------------------------------------------------------
@@ -136,6 +136,44 @@ async def test_demo_result_is_cached(public_client, monkeypatch):
     assert server_public._demo_cache is not None
 
 
+@pytest.mark.skipif(not DEMO_PROJECT.exists(), reason="Demo project not available")
+async def test_parse_runs_in_worker_process(public_client, monkeypatch):
+    monkeypatch.setattr(server_public.limiter, "enabled", False)
+    server_public._stop_parse_pool()
+    monkeypatch.setattr(server_public, "PARSE_TIMEOUT", 0.001)
+    with open(DEMO_PROJECT, "rb") as f:
+        r = await public_client.post(
+            "/api/parse", files={"file": ("demo.knxproj", f, "application/zip")}
+        )
+    assert r.status_code == 504
+    assert server_public._parse_pool == []  # stuck worker was killed
+    monkeypatch.setattr(server_public, "PARSE_TIMEOUT", 60.0)
+    with open(DEMO_PROJECT, "rb") as f:
+        r = await public_client.post(
+            "/api/parse", files={"file": ("demo.knxproj", f, "application/zip")}
+        )
+    assert r.status_code == 200
+    assert "_security" not in r.json()
+    with open(DEMO_PROJECT, "rb") as f:
+        r = await public_client.post(
+            "/api/parse/security", files={"file": ("demo.knxproj", f, "application/zip")}
+        )
+    assert r.status_code == 200
+    assert set(r.json()) == {"devices", "ga_keys", "ets_certificates"}
+
+
+async def test_parse_rejects_oversized_upload(public_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(server_public.limiter, "enabled", False)
+    monkeypatch.setattr(server_public.tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(server_public, "MAX_UPLOAD_BYTES", 1024)
+    for size in (2048, server_public.UPLOAD_FORM_SLACK + 4096):
+        r = await public_client.post(
+            "/api/parse", files={"file": ("gross.knxproj", b"x" * size, "application/zip")}
+        )
+        assert r.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
 async def test_parse_invalid_file_returns_error(public_client):
     r = await public_client.post(
         "/api/parse",
@@ -4,6 +4,7 @@ import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastapi import WebSocketDisconnect
 from httpx import ASGITransport, AsyncClient
 
 import server
@@ -117,8 +118,8 @@ async def test_ga_write_remote_sends_to_ws(client, patched_paths):
 
     resp = await client.post("/api/ga/write", json={"ga": "1/2/3", "value": "1"})
     assert resp.status_code == 200
-    mock_ws.send_json.assert_called_once()
-    call_arg = mock_ws.send_json.call_args[0][0]
+    mock_ws.send_text.assert_called_once()
+    call_arg = json.loads(mock_ws.send_text.call_args[0][0])
     assert call_arg["type"] == "write"
     assert call_arg["ga"] == "1/2/3"
 
@@ -173,3 +174,274 @@ async def test_remote_gateway_ws_wrong_mode(patched_paths):
 
     mock_ws.close.assert_called_once_with(code=4002)
     mock_ws.accept.assert_not_called()
+
+
+# ── Test 7: Proxy-Filter ──────────────────────────────────────────────────────
+
+async def test_remote_filter_roundtrip(client, patched_paths):
+    resp = await client.post("/api/gateway/remote-filter", json={
+        "ga_deny": ["5/*"], "on_change": "3/1/* 3/2/0-3/2/10", "max_age_s": 300,
+    })
+    assert resp.status_code == 200
+    assert resp.json()["pushed"] is False
+    data = (await client.get("/api/gateway/remote-filter")).json()
+    assert data["ga_deny"] == ["5/*"]
+    assert data["on_change"] == ["3/1/*", "3/2/0-3/2/10"]
+    assert data["max_age_s"] == 300
+
+
+@pytest.mark.parametrize("body", [
+    {"ga_allow": ["1/*/3"]},
+    {"ga_deny": ["1/2/3/*"]},
+    {"src_allow": ["1.1.1.1"]},
+])
+async def test_remote_filter_invalid_returns_422(client, patched_paths, body):
+    resp = await client.post("/api/gateway/remote-filter", json=body)
+    assert resp.status_code == 422
+
+
+async def test_remote_filter_pushed_to_connected_proxy(client, patched_paths):
+    mock_ws = AsyncMock()
+    server.state["remote_gateway_ws"] = mock_ws
+    resp = await client.post("/api/gateway/remote-filter", json={"src_deny": ["1.1.*"]})
+    assert resp.json()["pushed"] is True
+    sent = json.loads(mock_ws.send_text.call_args[0][0])
+    assert sent["type"] == "filter"
+    assert sent["src_deny"] == ["1.1.*"]
+
+
+async def test_remote_gateway_sends_filter_on_connect(patched_paths):
+    token = str(uuid.uuid4())
+    server.state["connection_type"] = "remote_gateway"
+    mock_ws = AsyncMock()
+    mock_ws.receive_text.side_effect = WebSocketDisconnect()
+    with patch.object(server, "load_config", return_value={
+        "connection_type": "remote_gateway",
+        "remote_gateway_token": token,
+        "remote_gateway_filter": {"ga_deny": ["5/*"]},
+    }):
+        await remote_gateway_endpoint(mock_ws, token=token)
+
+    first, second = [json.loads(c[0][0]) for c in mock_ws.send_text.call_args_list[:2]]
+    assert first == {"type": "filter", "ga_deny": ["5/*"]}
+    assert second == {"type": "snapshot_request"}
+
+
+# ── Test 8: Snapshot vom Proxy ────────────────────────────────────────────────
+
+async def test_remote_snapshot_fills_current_values():
+    server.state["current_values"] = {
+        "1/1/1": {"value": "neu", "ts": "2030-01-01 00:00:00.000"},
+    }
+    updated = await server._apply_remote_snapshot([
+        {"apci": "GroupValueWrite", "src": "1.1.1", "ga": "1/1/1",
+         "payload_type": "binary", "payload_value": 0, "ts": "2024-01-01 00:00:00.000"},
+        {"apci": "GroupValueResponse", "src": "1.1.2", "ga": "1/1/2",
+         "payload_type": "array", "payload_value": [12, 26], "ts": "2024-01-01 00:00:00.000"},
+        {"apci": "Unsinn", "ga": "1/1/3"},
+    ])
+    assert updated == 1
+    assert server.state["current_values"]["1/1/1"]["value"] == "neu"
+    assert server.state["current_values"]["1/1/2"]["ts"] == "2024-01-01 00:00:00.000"
+    assert "1/1/3" not in server.state["current_values"]
+
+
+async def test_remote_snapshot_broadcast_to_clients():
+    client_ws = AsyncMock()
+    server.state["ws_clients"] = {client_ws}
+    await server._apply_remote_snapshot([
+        {"apci": "GroupValueWrite", "src": "1.1.1", "ga": "1/1/1",
+         "payload_type": "binary", "payload_value": 1, "ts": "2024-01-01 00:00:00.000"},
+    ])
+    msg = client_ws.send_json.call_args[0][0]
+    assert msg["type"] == "snapshot"
+    assert "1/1/1" in msg["values"]
+
+
+async def test_remote_snapshot_endpoint(client, patched_paths):
+    resp = await client.post("/api/gateway/remote-snapshot")
+    assert resp.status_code == 503
+    mock_ws = AsyncMock()
+    server.state["remote_gateway_ws"] = mock_ws
+    resp = await client.post("/api/gateway/remote-snapshot")
+    assert resp.status_code == 200
+    mock_ws.send_text.assert_called_once_with(json.dumps({"type": "snapshot_request"}))
+
+
+# ── Test 9: Link-Telemetrie ───────────────────────────────────────────────────
+
+def test_percentile():
+    assert server._percentile([], 50) is None
+    assert server._percentile([10, 20, 30, 40, 50], 50) == 30
+    assert server._percentile([10, 20, 30, 40, 50], 99) == 50
+
+
+def test_record_pong_updates_rtt_and_proxy_stats():
+    now = server.time.monotonic()
+    server._record_pong({"type": "pong", "seq": 1, "ts": now - 0.05,
+                         "stats": {"reconnects": 2, "queued_bytes": 128, "pending": 3}})
+    summary = server._remote_link_summary()
+    assert summary["rtt_ms"]["samples"] == 1
+    assert 40 <= summary["rtt_ms"]["last"] < 1000
+    assert summary["proxy_reconnects"] == 2
+    assert summary["proxy_queued_bytes"] == 128
+
+
+def test_record_pong_ignores_malformed():
+    server._record_pong({"type": "pong"})
+    assert server._remote_link_summary()["rtt_ms"]["samples"] == 0
+
+
+def test_bulk_read_delay_scales_with_link_quality():
+    assert server._bulk_read_delay() == 0.05
+    server.state["connection_type"] = "remote_gateway"
+    assert server._bulk_read_delay() == 0.05
+    server.state["remote_link"]["rtt_ms"].extend([400.0] * 10)
+    assert server._bulk_read_delay() == pytest.approx(0.2)
+    server.state["remote_link"]["proxy"] = {"queued_bytes": 100_000}
+    assert server._bulk_read_delay() == pytest.approx(0.8)
+
+
+async def test_gateway_exposes_link_telemetry(client, patched_paths):
+    data = (await client.get("/api/gateway")).json()
+    assert data["remote_link"]["connects"] == 0
+    assert data["remote_link"]["rtt_ms"]["p50"] is None
+
+
+async def test_remote_gateway_pong_broadcasts_link_status(patched_paths):
+    token = str(uuid.uuid4())
+    server.state["connection_type"] = "remote_gateway"
+    client_ws = AsyncMock()
+    server.state["ws_clients"] = {client_ws}
+    pong = json.dumps({"type": "pong", "seq": 1, "ts": server.time.monotonic(), "stats": {}})
+    mock_ws = AsyncMock()
+    mock_ws.receive_text.side_effect = [pong, WebSocketDisconnect()]
+    with patch.object(server, "load_config", return_value={
+        "connection_type": "remote_gateway",
+        "remote_gateway_token": token,
+    }):
+        await remote_gateway_endpoint(mock_ws, token=token)
+
+    sent = [c[0][0] for c in client_ws.send_json.call_args_list]
+    link = next(m for m in sent if m["type"] == "link_status")
+    assert link["connects"] == 1
+    assert link["rtt_ms"]["samples"] == 1
+    assert server.state["remote_link"]["rx_bytes"] == len(pong)
+    assert server.state["remote_link"]["tx_msgs"] == 2  # filter + snapshot_request
+
+
+# ── Test 10: Mehrere Gateways hinter einem Proxy ──────────────────────────────
+
+async def test_remote_multi_gateway_status_and_routing(client, patched_paths):
+    token = str(uuid.uuid4())
+    server.state["connection_type"] = "remote_gateway"
+    frames = [
+        {"type": "status", "connected": True, "gw": "eg"},
+        {"type": "status", "connected": False, "gw": "og"},
+        {"type": "telegram", "gw": "og", "src": "1.1.1", "ga": "2/0/1",
+         "apci": "GroupValueWrite", "payload_type": "binary", "payload_value": 1},
+    ]
+    seen_states = []
+
+    async def receive_text():
+        if frames:
+            return json.dumps(frames.pop(0))
+        seen_states.append(dict(server.state["remote_gateways"]))
+        raise WebSocketDisconnect()
+
+    mock_ws = AsyncMock()
+    mock_ws.receive_text.side_effect = receive_text
+    with patch.object(server, "load_config", return_value={
+        "connection_type": "remote_gateway",
+        "remote_gateway_token": token,
+    }):
+        await remote_gateway_endpoint(mock_ws, token=token)
+
+    assert seen_states == [{"eg": True, "og": False}]
+    assert server.state["remote_ga_gateway"]["2/0/1"] == "og"
+
+    gw_ws = AsyncMock()
+    server.state["connected"] = True
+    server.state["remote_gateway_ws"] = gw_ws
+    resp = await client.post("/api/ga/read", json={"ga": "2/0/1"})
+    assert resp.status_code == 200
+    assert json.loads(gw_ws.send_text.call_args[0][0]) == {"type": "read", "ga": "2/0/1", "gw": "og"}
+    await client.post("/api/ga/read", json={"ga": "2/0/1", "gateway": "eg"})
+    assert json.loads(gw_ws.send_text.call_args[0][0])["gw"] == "eg"
+
+
+# ── Test 11: Batch-Ingestion ──────────────────────────────────────────────────
+
+def _item(ga="1/2/3", **kw):
+    return {"src": "1.1.1", "ga": ga, "apci": "GroupValueWrite",
+            "payload_type": "array", "payload_value": [0x0C, 0x1A],
+            "ts": "2024-01-01 00:00:00.000", **kw}
+
+
+def test_remote_entry_decodes_with_project_dpt():
+    server.state["project_data"] = {
+        "devices": {"1.1.1": {"name": "Wetterstation"}},
+        "group_addresses": {"ga1": {"address": "1/2/3", "name": "Außentemperatur"}},
+    }
+    server.state["ga_dpt_map"] = {"1/2/3": {"main": 9, "sub": 1}}
+    entry = server._remote_entry(_item(), server._project_index()["transcoders"])
+    assert entry["value"] == "21.00 °C"
+    assert entry["dpt"] == "9.001"
+    assert entry["device"] == "Wetterstation"
+    assert entry["ga_name"] == "Außentemperatur"
+    assert entry["ts"] == "2024-01-01 00:00:00.000"
+
+
+def test_remote_entry_without_dpt_uses_raw_and_estimate():
+    entry = server._remote_entry(_item(), {})
+    assert entry["value"] == entry["raw"] == '<DPTArray value="[0xc,0x1a]" />'
+    assert entry["dpt_estimate"] == "9.x/7.x/8.x"
+    read = server._remote_entry(_item(apci="GroupValueRead", payload_type="none"), {})
+    assert read["apci"] == "GroupValueRead"
+
+
+def test_project_index_rebuilt_when_project_replaced():
+    server.state["project_data"] = {"group_addresses": {"a": {"address": "1/1/1", "name": "Alt"}}}
+    assert server._ga_name("1/1/1") == "Alt"
+    server.state["project_data"] = {"group_addresses": {"a": {"address": "1/1/1", "name": "Neu"}}}
+    assert server._ga_name("1/1/1") == "Neu"
+
+
+async def test_ingest_batch_stores_and_broadcasts_once():
+    client_ws = AsyncMock()
+    server.state["ws_clients"] = {client_ws}
+    count = await server._ingest_remote_batch([
+        _item(ga="1/2/3"), _item(ga="1/2/4", gw="og"), {"ga": "kaputt"},
+    ])
+    assert count == 2
+    assert len(server.state["telegram_buffer"]) == 2
+    assert set(server.state["current_values"]) == {"1/2/3", "1/2/4"}
+    assert server.state["remote_ga_gateway"] == {"1/2/4": "og"}
+    client_ws.send_json.assert_called_once()
+    msg = client_ws.send_json.call_args[0][0]
+    assert msg["type"] == "telegram_batch"
+    assert [e["ga"] for e in msg["entries"]] == ["1/2/3", "1/2/4"]
+
+
+async def test_remote_gateway_accepts_telegram_batches(patched_paths):
+    token = str(uuid.uuid4())
+    server.state["connection_type"] = "remote_gateway"
+    mock_ws = AsyncMock()
+    mock_ws.receive_text.side_effect = [
+        json.dumps({"type": "telegrams", "items": [_item(ga=f"1/2/{i}") for i in range(50)]}),
+        WebSocketDisconnect(),
+    ]
+    with patch.object(server, "load_config", return_value={
+        "connection_type": "remote_gateway",
+        "remote_gateway_token": token,
+    }):
+        await remote_gateway_endpoint(mock_ws, token=token)
+    assert len(server.state["current_values"]) == 50
+
+
+async def test_failed_ping_closes_the_link(monkeypatch):
+    monkeypatch.setattr(server, "REMOTE_PING_INTERVAL", 0)
+    mock_ws = AsyncMock()
+    mock_ws.send_text.side_effect = RuntimeError("socket gone")
+    await server._remote_ping_loop(mock_ws)  # ends instead of dying unnoticed
+    mock_ws.close.assert_awaited_once_with(code=1011)
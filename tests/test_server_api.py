@@ -1,10 +1,16 @@
 """API tests for the private server (server.py)."""
+import asyncio
+import hashlib
 import json
+import subprocess
+import sys
+import time
+from unittest.mock import AsyncMock
 
 import pytest
 
 import server
-from tests.conftest import KNXPROJ_ETS6, KNXPROJ_NOPASS
+from tests.conftest import DEMO_PROJECT, KNXPROJ_ETS6, KNXPROJ_NOPASS
 
 
 # ---------------------------------------------------------------------------
@@ -127,6 +133,197 @@ async def test_last_project_data_with_state(server_client):
     assert "devices" in r.json()
 
 
+async def test_last_project_data_is_encoded_once(server_client, monkeypatch):
+    server.state["project_data"] = {"devices": {"1.1.1": {"name": "Aktor"}}, "group_addresses": {}}
+    encodes = []
+    encode = server._encode_project_body
+    monkeypatch.setattr(server, "_encode_project_body", lambda body: encodes.append(1) or encode(body))
+
+    r = await server_client.get("/api/last-project/data", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.json() == server.state["project_data"]
+    etag = r.headers["etag"]
+    r = await server_client.get("/api/last-project/data", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    r = await server_client.get("/api/last-project/data", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers and r.json()["devices"]
+    assert encodes == [1]
+
+    # Another project (e.g. re-parsed) gets a new payload and ETag
+    server.state["project_data"] = {"devices": {}, "group_addresses": {}}
+    r = await server_client.get("/api/last-project/data", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["etag"] != etag
+    assert encodes == [1, 1]
+
+
+async def test_recent_project_data_served_from_cache(server_client, patched_paths):
+    project = {"info": {"name": "Haus"}, "devices": {}, "group_addresses": {}}
+    server._add_to_recent_projects("haus.knxproj", project)
+    r = await server_client.get("/api/recent-projects/haus.knxproj/data")
+    assert r.json() == project
+    assert server.state["project_data"] == project
+    etag = r.headers["etag"]
+    r = await server_client.get("/api/recent-projects/haus.knxproj/raw", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    # The current-project alias shares the file entry's bytes and is not counted twice
+    assert server.state["project_responses"][("current",)]["size"] == 0
+    # Loading the same project again keeps the current project object
+    current = server.state["project_data"]
+    await server_client.get("/api/recent-projects/haus.knxproj/data")
+    assert server.state["project_data"] is current
+
+    server._add_to_recent_projects("haus.knxproj", {**project, "info": {"name": "Neu"}})
+    assert ("file", "haus.knxproj") not in server.state["project_responses"]
+    r = await server_client.get("/api/recent-projects/haus.knxproj/raw", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.json()["info"]["name"] == "Neu"
+
+
+def test_project_response_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(server, "PROJECT_RESPONSE_CACHE_MB", 1)
+    for key in ("a", "b", "c"):
+        server._cache_project_response(("file", key), {"size": 400 * 1024})
+    assert list(server.state["project_responses"]) == [("file", "b"), ("file", "c")]
+
+
+def test_current_alias_takes_over_size_of_evicted_file_entry(monkeypatch):
+    monkeypatch.setattr(server, "PROJECT_RESPONSE_CACHE_MB", 1)
+    server._cache_project_response(("file", "a"), {"size": 400 * 1024})
+    server._cache_project_response(("current",), {"size": 0, "shares": ("file", "a")})
+    cache = server.state["project_responses"]
+    server._cache_project_response(("file", "b"), {"size": 400 * 1024})
+    cache.move_to_end(("current",))  # in use
+    server._cache_project_response(("file", "c"), {"size": 400 * 1024})
+    assert list(cache) == [("current",), ("file", "c")]
+    assert cache[("current",)]["size"] == 400 * 1024  # its bytes are still held
+    # ... and count against the budget: the next entry evicts it
+    server._cache_project_response(("file", "d"), {"size": 400 * 1024})
+    assert list(cache) == [("file", "c"), ("file", "d")]
+
+
+def _sectioned_project() -> dict:
+    gas = {
+        f"{m}/{s}/{n}": {"address": f"{m}/{s}/{n}", "name": f"GA {m}-{s}-{n}", "dpt": {"main": 1, "sub": 1}}
+        for m in (1, 2) for s in (1, 2, 10) for n in (3, 20)
+    }
+    gas["2/10/20"]["name"] = "Licht Küche"
+    return {
+        "info": {"name": "Haus"},
+        "group_addresses": gas,
+        "devices": {"1.1.2": {"individual_address": "1.1.2", "name": "Aktor"},
+                    "1.1.10": {"individual_address": "1.1.10", "name": "Taster"}},
+        "topology": {"1": {"name": "Bereich"}},
+    }
+
+
+async def test_project_section_filters_and_pages(server_client):
+    assert (await server_client.get("/api/project/devices")).status_code == 404
+    server.state["project_data"] = _sectioned_project()
+
+    r = await server_client.get(
+        "/api/project/group-addresses", params={"range": "1/*", "fields": "address,name", "limit": 3}
+    )
+    body = r.json()
+    assert body["total"] == 6
+    assert [i["address"] for i in body["items"]] == ["1/1/3", "1/1/20", "1/2/3"]
+    assert body["items"][0] == {"id": "1/1/3", "address": "1/1/3", "name": "GA 1-1-3"}
+    r = await server_client.get("/api/project/group-addresses", params={"range": "1/*", "offset": 3})
+    assert [i["id"] for i in r.json()["items"]] == ["1/2/20", "1/10/3", "1/10/20"]
+
+    r = await server_client.get("/api/project/group-addresses", params={"range": "*/10/20"})
+    assert [i["id"] for i in r.json()["items"]] == ["1/10/20", "2/10/20"]
+    r = await server_client.get("/api/project/group-addresses", params={"q": "küche"})
+    assert [i["id"] for i in r.json()["items"]] == ["2/10/20"]
+    r = await server_client.get("/api/project/devices", params={"sort": "-address"})
+    assert [i["id"] for i in r.json()["items"]] == ["1.1.10", "1.1.2"]
+    r = await server_client.get("/api/project/devices", params={"sort": "name"})
+    assert [i["name"] for i in r.json()["items"]] == ["Aktor", "Taster"]
+
+    assert (await server_client.get("/api/project/topology")).json() == {"1": {"name": "Bereich"}}
+    assert (await server_client.get("/api/project/functions")).json()["total"] == 0
+    assert (await server_client.get("/api/project/nope")).status_code == 404
+    bad = await server_client.get("/api/project/group-addresses", params={"range": "1/x"})
+    assert bad.status_code == 422
+    assert (await server_client.get("/api/project/devices", params={"limit": 0})).status_code == 422
+
+
+async def test_project_section_rows_follow_loaded_project(server_client):
+    server.state["project_data"] = _sectioned_project()
+    await server_client.get("/api/project/devices")
+    rows = server._project_index()["sections"]["devices"]
+    await server_client.get("/api/project/devices", params={"q": "aktor"})
+    assert server._project_index()["sections"]["devices"] is rows  # compiled once
+    server.state["project_data"] = {"devices": {}}
+    assert (await server_client.get("/api/project/devices")).json()["total"] == 0
+
+
+def _diff_project(name: str, gas: dict, devices: dict, links: dict) -> dict:
+    return {
+        "info": {"name": name},
+        "group_addresses": {
+            addr: {"address": addr, "name": ga_name, "dpt": dpt} for addr, (ga_name, dpt) in gas.items()
+        },
+        "devices": {ia: {"individual_address": ia, "name": dev_name} for ia, dev_name in devices.items()},
+        "communication_objects": {
+            f"{ia}/O-{i}": {"device_address": ia, "group_address_links": [ga]}
+            for ia, gas_linked in links.items() for i, ga in enumerate(gas_linked)
+        },
+    }
+
+
+async def test_projects_diff_is_computed_once_per_pair(server_client, patched_paths, monkeypatch):
+    switch, temp = {"main": 1, "sub": 1}, {"main": 9, "sub": 1}
+    server._add_to_recent_projects("alt.knxproj", _diff_project(
+        "Alt", {"1/1/1": ("Licht", switch), "1/1/2": ("Temp", temp), "1/1/3": ("Alt", None)},
+        {"1.1.1": "Aktor", "1.1.2": "Sensor"}, {"1.1.1": ["1/1/1"], "1.1.2": ["1/1/2"]},
+    ))
+    server._add_to_recent_projects("neu.knxproj", _diff_project(
+        "Neu", {"1/1/1": ("Licht Küche", switch), "1/1/2": ("Temp", switch), "1/1/10": ("Neu", None)},
+        {"1.1.1": "Aktor", "1.1.3": "Taster"}, {"1.1.1": ["1/1/1", "1/1/10"]},
+    ))
+    server.state["project_slug"] = "alt.knxproj"
+    calls = []
+    compute = server._compute_project_diff
+    monkeypatch.setattr(server, "_compute_project_diff", lambda a, b: calls.append(1) or compute(a, b))
+
+    diff = (await server_client.get("/api/projects/diff", params={"b": "neu.knxproj"})).json()
+    assert (diff["name_a"], diff["name_b"]) == ("Alt", "Neu")
+    assert [g["address"] for g in diff["ga"]["added"]] == ["1/1/10"]
+    assert [g["address"] for g in diff["ga"]["removed"]] == ["1/1/3"]
+    assert diff["ga"]["changed"] == [
+        {"address": "1/1/1", "nameA": "Licht", "nameB": "Licht Küche",
+         "dptA": "1.001", "dptB": "1.001", "critical": False},
+        {"address": "1/1/2", "nameA": "Temp", "nameB": "Temp",
+         "dptA": "9.001", "dptB": "1.001", "critical": True},
+    ]
+    assert diff["devices"]["added"] == [{"individual_address": "1.1.3", "name": "Taster"}]
+    assert diff["devices"]["removed"] == [{"individual_address": "1.1.2", "name": "Sensor"}]
+    assert diff["devices"]["changed"] == [{
+        "individual_address": "1.1.1", "nameA": "Aktor", "nameB": "Aktor",
+        "links_added": ["1/1/10"], "links_removed": [],
+    }]
+    assert "1/1/2: DPT 9.001 → 1.001 [KRITISCH]" in diff["diff_text"]
+    assert "1.1.1: GA-Verknüpfungen +1/1/10" in diff["diff_text"]
+
+    again = await server_client.get("/api/projects/diff", params={"a": "alt.knxproj", "b": "neu.knxproj"})
+    assert again.json() == diff
+    assert calls == [1]
+    reverse = (await server_client.get("/api/projects/diff", params={"a": "neu.knxproj", "b": "alt.knxproj"})).json()
+    assert [g["address"] for g in reverse["ga"]["added"]] == ["1/1/3"]
+    assert calls == [1, 1]
+    # A copy with identical content still reports its own slug
+    neu = json.loads((patched_paths / "projects" / "neu.knxproj.json").read_text())
+    server._add_to_recent_projects("kopie.knxproj", neu)
+    copy = (await server_client.get("/api/projects/diff", params={"b": "kopie.knxproj"})).json()
+    assert copy["b"] == "kopie.knxproj" and copy["ga"] == diff["ga"]
+    missing = await server_client.get("/api/projects/diff", params={"b": "weg.knxproj"})
+    assert missing.status_code == 404
+    (patched_paths / "config.json").write_text("[]")
+    for slug in ("../config", "..\\config", "a/../../config"):
+        outside = await server_client.get("/api/projects/diff", params={"b": slug})
+        assert outside.status_code == 404
+    assert ("file", "../config") not in server.state["project_responses"]
+
+
 # ---------------------------------------------------------------------------
 # Annotations
 # ---------------------------------------------------------------------------
@@ -290,3 +487,277 @@ async def test_parse_invalid_file_returns_error(server_client):
         data={"password": ""},
     )
     assert r.status_code in (422, 500)
+
+
+@pytest.mark.skipif(not DEMO_PROJECT.exists(), reason="Demo project not available")
+async def test_parse_does_not_block_event_loop(server_client, patched_paths):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    start = time.monotonic()
+    with open(DEMO_PROJECT, "rb") as f:
+        r = await server_client.post(
+            "/api/parse", files={"file": ("demo.knxproj", f, "application/zip")}
+        )
+    elapsed = time.monotonic() - start
+    task.cancel()
+    assert r.status_code == 200
+    assert "_security" not in r.json()  # loaded separately, see /api/project/security
+    assert ticks >= elapsed / 0.01 / 2  # the loop kept running during the parse
+
+
+@pytest.mark.skipif(not DEMO_PROJECT.exists(), reason="Demo project not available")
+async def test_parse_timeout_returns_504(server_client, patched_paths):
+    server._stop_parse_pool()
+    server.state["parse_timeout"] = 0.001
+    with open(DEMO_PROJECT, "rb") as f:
+        r = await server_client.post(
+            "/api/parse", files={"file": ("demo.knxproj", f, "application/zip")}
+        )
+    assert r.status_code == 504
+    assert server.state["parse_pool"] == []  # stuck worker was killed
+    assert server.state["project_data"] is None
+
+
+async def test_parse_worker_kill_spares_other_parses():
+    server._stop_parse_pool()
+    stuck = asyncio.create_task(server._run_in_parse_pool(time.sleep, 30))
+    other = asyncio.create_task(server._run_in_parse_pool(time.sleep, 1))
+    while sum(w["busy"] for w in server.state["parse_pool"]) < 2:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)
+    stuck.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await stuck
+    assert await other is None  # finished in its own worker
+    assert len(server.state["parse_pool"]) == 1
+    server._stop_parse_pool()
+
+
+def test_importing_the_servers_opens_no_log_files():
+    # What a parse worker does; only the server process writes (and rotates) logs
+    code = (
+        "import logging, server, server_public;"
+        "print(len(logging.getLogger('knx_bus').handlers), len(server_public.access_log.handlers))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["0", "0"]
+
+
+async def test_parse_rejects_oversized_upload(server_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(server.tempfile, "tempdir", str(tmp_path))
+    server.state["max_upload_mb"] = 1 / 1024  # 1 KiB
+
+    async def post(content):
+        return await server_client.post(
+            "/api/parse/jobs", files={"file": ("gross.knxproj", content, "application/zip")}
+        )
+
+    # Below the transport slack, so the file copy has to stop it
+    r = await post(b"x" * 2048)
+    assert r.status_code == 413
+    assert r.json()["detail"].startswith("Datei zu groß")
+    # Announced Content-Length above the limit: refused before reading
+    r = await post(b"x" * (server.UPLOAD_FORM_SLACK + 4096))
+    assert r.status_code == 413
+
+    # Chunked body without Content-Length is counted while it arrives
+    async def chunks():
+        yield b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"g.knxproj\"\r\n\r\n"
+        for _ in range(100):
+            yield b"x" * 4096
+
+    r = await server_client.post(
+        "/api/parse/jobs", content=chunks(),
+        headers={"content-type": "multipart/form-data; boundary=b"},
+    )
+    assert r.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+    assert server.state["parse_jobs"] == {}
+
+
+async def _wait_parse_job(client, job_id):
+    for _ in range(500):
+        job = (await client.get(f"/api/parse/jobs/{job_id}")).json()
+        if job["finished"]:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError("parse job did not finish")
+
+
+@pytest.mark.skipif(not DEMO_PROJECT.exists(), reason="Demo project not available")
+async def test_parse_job_reports_stages(server_client, patched_paths):
+    client_ws = AsyncMock()
+    server.state["ws_clients"] = {client_ws}
+    with open(DEMO_PROJECT, "rb") as f:
+        r = await server_client.post(
+            "/api/parse/jobs", files={"file": ("demo.knxproj", f, "application/zip")}
+        )
+    assert r.json()["status"] in ("queued", "running")
+    job = await _wait_parse_job(server_client, r.json()["id"])
+    assert job["status"] == "done" and job["filename"] == "demo.knxproj"
+
+    result = await server_client.get(f"/api/parse/jobs/{job['id']}/result")
+    assert "group_addresses" in result.json()
+    assert server.state["project_data"] == result.json()
+    msgs = [c[0][0] for c in client_ws.send_json.call_args_list]
+    stages = [m["stage"] for m in msgs if m["type"] == "parse_progress"]
+    assert stages == ["extracting", "parsing", "persisting"]
+    assert msgs[-1]["type"] == "parse_complete"
+
+
+@pytest.mark.skipif(not DEMO_PROJECT.exists(), reason="Demo project not available")
+async def test_parse_job_cancel_leaves_other_jobs_running(server_client, patched_paths):
+    ids = []
+    for _ in range(2):
+        with open(DEMO_PROJECT, "rb") as f:
+            r = await server_client.post(
+                "/api/parse/jobs", files={"file": ("demo.knxproj", f, "application/zip")}
+            )
+        ids.append(r.json()["id"])
+    await asyncio.sleep(0.05)
+    await server_client.post(f"/api/parse/jobs/{ids[0]}/cancel")
+
+    assert (await _wait_parse_job(server_client, ids[0]))["status"] == "cancelled"
+    assert (await _wait_parse_job(server_client, ids[1]))["status"] == "done"
+    r = await server_client.get(f"/api/parse/jobs/{ids[0]}/result")
+    assert r.status_code == 409
+
+
+async def test_parse_job_unknown_returns_404(server_client):
+    assert (await server_client.get("/api/parse/jobs/nope")).status_code == 404
+
+
+@pytest.mark.skipif(not DEMO_PROJECT.exists(), reason="Demo project not available")
+async def test_parse_reuses_cached_result_for_same_upload(server_client, patched_paths, monkeypatch):
+    async def upload(**data):
+        with open(DEMO_PROJECT, "rb") as f:
+            r = await server_client.post(
+                "/api/parse/jobs",
+                files={"file": ("andere.knxproj", f, "application/zip")},
+                data=data,
+            )
+        return await _wait_parse_job(server_client, r.json()["id"])
+
+    first = await upload()
+    assert first["status"] == "done" and not first["cached"]
+    assert len(list((patched_paths / "parse_cache").glob("*.json"))) == 1
+
+    async def no_parse(*args):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(server, "_parse_in_pool", no_parse)
+    second = await upload()
+    assert second["status"] == "done" and second["cached"]
+    result = await server_client.get(f"/api/parse/jobs/{second['id']}/result")
+    assert result.json()["info"] == server.state["project_data"]["info"]
+
+    # A different language is a different cache entry
+    assert (await upload(language="en-US"))["status"] == "error"
+
+
+@pytest.mark.skipif(not DEMO_PROJECT.exists(), reason="Demo project not available")
+async def test_project_security_is_extracted_once(server_client, patched_paths, monkeypatch):
+    assert (await server_client.post("/api/project/security")).status_code == 404
+    with open(DEMO_PROJECT, "rb") as f:
+        await server_client.post(
+            "/api/parse", files={"file": ("demo.knxproj", f, "application/zip")}
+        )
+    calls = []
+    run = server._run_in_parse_pool
+
+    async def counting(fn, *args, **kwargs):
+        calls.append(fn)
+        return await run(fn, *args, **kwargs)
+
+    monkeypatch.setattr(server, "_run_in_parse_pool", counting)
+    first, second = await asyncio.gather(
+        server_client.post("/api/project/security"), server_client.post("/api/project/security")
+    )
+    assert first.status_code == second.status_code == 200
+    assert set(first.json()) == {"devices", "ga_keys", "ets_certificates"}
+    assert second.json() == first.json()
+    assert (patched_paths / "projects" / "demo.knxproj.security.json").exists()
+    again = await server_client.post("/api/project/security", json={})
+    assert again.json() == first.json()
+    assert calls == [server._security_from_file]  # shared and then cached
+
+    # A new upload under the same name drops the cached data
+    with open(DEMO_PROJECT, "rb") as f:
+        await server_client.post(
+            "/api/parse", files={"file": ("demo.knxproj", f, "application/zip")}
+        )
+    assert not (patched_paths / "projects" / "demo.knxproj.security.json").exists()
+
+
+async def test_protected_project_security_is_not_stored(server_client, patched_paths, monkeypatch):
+    project = {"info": {"name": "Geheim"}, "devices": {}, "group_addresses": {}}
+    server._add_to_recent_projects("geheim.knxproj", project)
+    (patched_paths / "projects" / "geheim.knxproj.knxproj").write_bytes(b"")
+    server.state["project_data"] = project
+    server.state["project_slug"] = "geheim.knxproj"
+    security = {"devices": [{"tool_key": "AA"}], "ga_keys": {}, "ets_certificates": []}
+
+    async def fake_run(fn, path, password, refs):
+        if password != "pw":
+            raise server.InvalidPasswordException()
+        return security
+
+    monkeypatch.setattr(server, "_run_in_parse_pool", fake_run)
+    r = await server_client.post("/api/project/security", json={"password": "pw"})
+    assert r.json() == security
+    assert not (patched_paths / "projects" / "geheim.knxproj.security.json").exists()
+    r = await server_client.post("/api/project/security")
+    assert r.status_code == 422  # the keys still need the password
+
+
+async def test_legacy_security_is_moved_out_of_the_payload(server_client, patched_paths):
+    security = {"devices": [{"tool_key": "AA"}], "ga_keys": {}, "ets_certificates": []}
+    project = {"info": {"name": "Alt"}, "devices": {}, "group_addresses": {}, "_security": security}
+    server._add_to_recent_projects("alt.knxproj", project)
+    r = await server_client.get("/api/recent-projects/alt.knxproj/data")
+    assert "_security" not in r.json()
+    stored = json.loads((patched_paths / "projects" / "alt.knxproj.json").read_text())
+    assert "_security" not in stored
+    r = await server_client.post("/api/project/security")
+    assert r.json() == security
+
+    # last_project.json of an older version is cleaned up on startup as well
+    (patched_paths / "last_project.json").write_text(json.dumps(project))
+    server.save_config({**server.load_config(), "last_project_filename": "alt.knxproj"})
+    server.load_last_project()
+    assert "_security" not in server.state["project_data"]
+    assert "_security" not in json.loads((patched_paths / "last_project.json").read_text())
+
+
+def test_parse_cache_evicts_least_recently_used(patched_paths):
+    server.state["parse_cache_max_mb"] = 2.5 / 1024  # room for two 1 KiB entries
+    blob = {"data": "x" * 1000}
+    for key in ("a", "b"):
+        server._parse_cache_put(key, blob)
+        time.sleep(0.01)
+    assert server._parse_cache_get("a") == blob  # "a" is now the most recent
+    time.sleep(0.01)
+    server._parse_cache_put("c", blob)
+    names = sorted(p.stem for p in (patched_paths / "parse_cache").glob("*.json"))
+    assert names == ["a", "c"]
+    assert server._parse_cache_key("h", "geheim", "de-DE") != server._parse_cache_key("h", "", "de-DE")
+
+
+def test_parse_cache_key_is_keyed_per_install(patched_paths):
+    cache = patched_paths / "parse_cache"
+    cache.mkdir()
+    (cache / "unkeyed.json").write_text("{}")  # named by the old plain hash
+    key = server._parse_cache_key("h", "geheim", "de-DE")
+    assert not (cache / "unkeyed.json").exists()
+    material = "\0".join((str(server.PARSE_CACHE_FORMAT), server.xknxproject_version, "h", "de-DE", "geheim"))
+    assert key != hashlib.sha256(material.encode()).hexdigest()
+    assert server._parse_cache_key("h", "geheim", "de-DE") == key  # stable
+    (patched_paths / "parse_cache.key").unlink()  # another install
+    assert server._parse_cache_key("h", "geheim", "de-DE") != key